@@ -0,0 +1,466 @@
+"""
+Shell ingest benchmark: how fast output from a child process gets through
+ShellRunner (pipe and PTY modes) and through ShellScene into TextRenderer.
+
+A synthetic producer (this file, run with --produce) is started as the shell
+command and writes one workload: plain lines, ANSI-colored lines, long lines
+without breaks, \\r progress bars, or multi-byte UTF-8 written in odd-sized
+chunks so characters are split across reads. Every --mark-every bytes it
+writes a marker line stamped with time.monotonic(), a clock shared by all
+processes, so the consumer can measure the latency from the child's write to
+the line being read (runner path) or to the end of the first frame that drew it
+(scene path; the frame is drawn headless into the overlay surface, without the
+GPU CRT pass).
+
+Each case runs in its own process so its peak RSS can be reported.
+
+Run from project root:
+    python scripts/bench_shell_ingest.py                     # all cases, table
+    python scripts/bench_shell_ingest.py --json results.json # also machine-readable
+    python scripts/bench_shell_ingest.py --paths runner --modes pipe --workloads plain,utf8
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+SCHEMA_VERSION = 1
+WORKLOADS = ("plain", "ansi", "long", "progress", "utf8")
+MODES = ("pipe", "pty")
+PATHS = ("runner", "scene")
+MARK = "@@MARK "
+MARK_END = " @@"  # a marker shown before its line was complete lacks this
+END = "@@END "  # followed by the number of markers written
+BLOCK_BYTES = 16384  # producer write size between markers' checks
+UTF8_CHUNK = 1021  # odd write size for the utf8 workload, so sequences straddle writes
+
+
+# --- producer (child process) ---------------------------------------------
+
+def _workload_lines(workload, count):
+    """Yields the workload's output as byte strings, each ending in \\n or \\r."""
+    words = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india")
+    if workload == "plain":
+        for i in range(count):
+            yield f"{i:08d} {' '.join(words)} {i * 7919 % 100000:05d}\n".encode()
+    elif workload == "ansi":
+        for i in range(count):
+            colored = " ".join(f"\x1b[{31 + (i + j) % 7};1m{w}\x1b[0m" for j, w in enumerate(words))
+            yield f"\x1b[2m{i:08d}\x1b[22m {colored} \x1b[38;5;{i % 256}mend\x1b[m\n".encode()
+    elif workload == "long":
+        body = "".join(words) * 600
+        for i in range(count):
+            yield f"{i:08d}{body}\n".encode()
+    elif workload == "progress":
+        for i in range(count):
+            done = i % 101
+            bar = "#" * (done // 2) + "." * (50 - done // 2)
+            yield f"\rstep {i // 101:6d} [{bar}] {done:3d}%".encode()
+            if done == 100:
+                yield b"\n"
+    elif workload == "utf8":
+        sample = "Grüße, Ωmega — 日本語テキスト 🙂 𝄞 naïve café "
+        for i in range(count):
+            yield f"{i:08d} {sample * 3}\n".encode()
+    else:
+        raise ValueError(f"unknown workload: {workload}")
+
+
+def produce(workload, total_bytes, mark_every):
+    """Writes about total_bytes of the workload to stdout with marker lines, then END."""
+    out = sys.stdout.fileno()
+    chunk = UTF8_CHUNK if workload == "utf8" else BLOCK_BYTES
+    written = 0
+    since_mark = 0
+    marks = 0
+    block = bytearray()
+
+    def flush():
+        view = memoryview(bytes(block))
+        for i in range(0, len(view), chunk):
+            os.write(out, view[i:i + chunk])
+        block.clear()
+
+    for data in _workload_lines(workload, 1 << 62):
+        block += data
+        written += len(data)
+        since_mark += len(data)
+        at_line_start = data.endswith(b"\n")
+        if len(block) >= BLOCK_BYTES and at_line_start:
+            flush()
+        if since_mark >= mark_every and at_line_start:
+            flush()
+            os.write(out, f"{MARK}{time.monotonic():.6f}{MARK_END}\n".encode())
+            since_mark = 0
+            marks += 1
+        if written >= total_bytes and at_line_start:
+            break
+    flush()
+    os.write(out, f"{END}{marks}\n".encode())
+    return 0
+
+
+# --- consumer (one case per process) --------------------------------------
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(values[-1] * 1000, 3)}
+
+
+def _marker_time(text):
+    """The stamp of a complete marker line, else None."""
+    if not (text.startswith(MARK) and text.endswith(MARK_END)):
+        return None
+    try:
+        return float(text[len(MARK):-len(MARK_END)])
+    except ValueError:
+        return None
+
+
+class _HeadlessScreen:
+    """The part of TerminalScreen that TextRenderer draws on, over a plain
+    surface: no window, no OpenGL, no CRT pass.
+    """
+
+    def __init__(self, width, height):
+        import pygame
+
+        self.width = width
+        self.height = height
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.reveal_mask = None
+        self.cell_layer = None
+
+    def clear(self):
+        self.overlay.fill((0, 0, 0, 255))
+        self.reveal_mask = None
+        self.cell_layer = None
+
+    def blit(self, source, dest):
+        self.overlay.blit(source, dest)
+
+    def submit_cell_grid(self, grid, origin, color):
+        self.cell_layer = (grid, origin, color)
+
+    def mark_overlay_dirty(self):
+        pass
+
+    def set_reveal_mask(self, x, top, bottom):
+        self.reveal_mask = (x, top, bottom)
+
+    def clear_reveal_mask(self):
+        self.reveal_mask = None
+
+
+class _InputLine:
+    """Stands in for TerminalInputHandler: the benchmark types nothing."""
+
+    enter_pressed = False
+
+    def __init__(self):
+        self._text = ""
+
+    def update(self):
+        pass
+
+    def reset(self):
+        self._text = ""
+
+    def get_user_input(self):
+        return self._text
+
+    def set_user_input(self, text):
+        self._text = text
+
+    def handle_event(self, event):
+        pass
+
+
+def _producer_argv(args, workload):
+    return [sys.executable, os.path.abspath(__file__), "--produce", workload,
+            "--bytes", str(args.bytes), "--mark-every", str(args.mark_every)]
+
+
+def _new_pool(args, mode, workload):
+    from src.shell.session_pool import SessionPool
+    from src.shell.shell_runner import ShellRunner
+
+    argv = _producer_argv(args, workload)
+    return SessionPool(lambda reactor: ShellRunner(
+        argv, use_pty=(mode == "pty"), read_size=args.read_size, reactor=reactor))
+
+
+def run_runner_case(args, mode, workload):
+    """Polls ShellRunner.read_since the way a frame loop would, but without drawing."""
+    rss_before = _peak_rss_mb()
+    pool = _new_pool(args, mode, workload)
+    runner = pool.foreground.runner
+    latencies = []
+    cursor = 0
+    lines = 0
+    marks_sent = None
+    first = None
+    done = False
+    deadline = time.monotonic() + args.timeout
+    try:
+        while not done and time.monotonic() < deadline:
+            new_lines, _pending, cursor = runner.read_since(cursor)
+            now = time.monotonic()
+            if not new_lines:
+                time.sleep(args.poll_interval)
+                continue
+            if first is None:
+                first = now
+            lines += len(new_lines)
+            for line in new_lines:
+                text = str(line)
+                stamp = _marker_time(text)
+                if stamp is not None:
+                    latencies.append(now - stamp)
+                elif text.startswith(END):
+                    marks_sent = int(text[len(END):])
+                    done = True
+        elapsed = time.monotonic() - first if first is not None else 0.0
+    finally:
+        pool.close_all()
+    return _result("runner", mode, workload, args, done, elapsed, lines, latencies, marks_sent, rss_before)
+
+
+def run_scene_case(args, mode, workload):
+    """Runs ShellScene frames (update, clear, render) against the producer at --fps."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import types
+
+    import pygame
+
+    from src.app.config import Config
+    from src.app.factories import FontLoaderFactory, TextRendererFactory
+    from src.scenes.shell_scene import ShellScene
+
+    pygame.init()
+    config = Config()
+    config.text_backend = args.text_backend
+    screen = _HeadlessScreen(config.screen_width, config.screen_height)
+    font = FontLoaderFactory.create_font_loader(config).load()
+    renderer = TextRendererFactory.create_text_renderer(screen, font, config)
+    app = types.SimpleNamespace(text_renderer=renderer, input_handler=_InputLine(), is_rendering=False,
+                                state_transition=False, set_scene=lambda name: None)
+    rss_before = _peak_rss_mb()
+    pool = _new_pool(args, mode, workload)
+    scene = ShellScene(app, pool)
+
+    # Lines are seen when the scene hands them to the renderer (a pending line
+    # is completed in place) and count as visible once the frame that drew
+    # them is finished.
+    appended = []
+    append_lines_instant = renderer.append_lines_instant
+    replace_last_line = renderer.replace_last_line
+
+    def observe_append(lines, *a, **kw):
+        appended.extend(lines)
+        return append_lines_instant(lines, *a, **kw)
+
+    def observe_replace(line, *a, **kw):
+        appended.append(line)
+        return replace_last_line(line, *a, **kw)
+
+    renderer.append_lines_instant = observe_append
+    renderer.replace_last_line = observe_replace
+    scene.enter()
+    latencies = []
+    stamps_seen = set()
+    frame_times = []
+    lines = 0
+    marks_sent = None
+    first = None
+    done = False
+    clock = pygame.time.Clock()
+    deadline = time.monotonic() + args.timeout
+    try:
+        while not done and time.monotonic() < deadline:
+            start = time.perf_counter()
+            scene.update()
+            screen.clear()
+            scene.render()
+            frame_times.append(time.perf_counter() - start)
+            now = time.monotonic()
+            if appended:
+                if first is None:
+                    first = now
+                lines += len(appended)
+                for line in appended:
+                    text = str(line)
+                    stamp = _marker_time(text)
+                    if stamp is not None and stamp not in stamps_seen:
+                        stamps_seen.add(stamp)
+                        latencies.append(now - stamp)
+                    elif text.startswith(END) and text[len(END):].isdigit():
+                        marks_sent = int(text[len(END):])
+                        done = True
+                appended.clear()
+            if args.fps:
+                clock.tick(args.fps)
+        elapsed = time.monotonic() - first if first is not None else 0.0
+    finally:
+        pool.close_all()
+        pygame.quit()
+    result = _result("scene", mode, workload, args, done, elapsed, lines, latencies, marks_sent, rss_before)
+    result["frames"] = len(frame_times)
+    result["frame_ms"] = _percentiles(frame_times)
+    result["fps_target"] = args.fps
+    result["text_backend"] = args.text_backend
+    return result
+
+
+def _result(path, mode, workload, args, done, elapsed, lines, latencies, marks_sent, rss_before):
+    peak = _peak_rss_mb()
+    return {
+        "path": path,
+        "mode": mode,
+        "workload": workload,
+        "completed": done,
+        "bytes": args.bytes,
+        "seconds": round(elapsed, 4),
+        "bytes_per_sec": round(args.bytes / elapsed) if done and elapsed > 0 else None,
+        "lines": lines,
+        "lines_per_sec": round(lines / elapsed) if done and elapsed > 0 else None,
+        "latency_ms": _percentiles(latencies),
+        "marks_seen": len(latencies),
+        "marks_sent": marks_sent,
+        "peak_rss_mb": peak,
+        "rss_growth_mb": round(peak - rss_before, 1) if peak is not None and rss_before is not None else None,
+    }
+
+
+# --- driver -----------------------------------------------------------------
+
+def _run_case_in_child(args, path, mode, workload):
+    argv = [sys.executable, os.path.abspath(__file__), "--case", f"{path}:{mode}:{workload}",
+            "--bytes", str(args.bytes), "--mark-every", str(args.mark_every), "--fps", str(args.fps),
+            "--timeout", str(args.timeout), "--poll-interval", str(args.poll_interval),
+            "--text-backend", args.text_backend]
+    if args.read_size:
+        argv += ["--read-size", str(args.read_size)]
+    # Asset paths are relative to the project root, as when the app runs.
+    proc = subprocess.run(argv, cwd=_root, capture_output=True, text=True, timeout=args.timeout + 30)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"path": path, "mode": mode, "workload": workload, "completed": False,
+            "error": (proc.stderr.strip().splitlines() or ["no result"])[-1]}
+
+
+def _metadata(args):
+    meta = {
+        "schema": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "bytes_per_case": args.bytes,
+        "mark_every": args.mark_every,
+        "fps": args.fps,
+    }
+    try:
+        meta["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_root,
+                                        capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        meta["commit"] = None
+    return meta
+
+
+def _print_table(results):
+    print(f"{'path':<7}{'mode':<6}{'workload':<10}{'MB/s':>9}{'lines/s':>11}"
+          f"{'lat p50':>9}{'p95':>8}{'max':>8}{'marks':>10}{'peak MB':>9}")
+    for r in results:
+        if not r.get("completed"):
+            print(f"{r['path']:<7}{r['mode']:<6}{r['workload']:<10}  FAILED {r.get('error', 'timed out')}")
+            continue
+        lat = r["latency_ms"] or {}
+        print(f"{r['path']:<7}{r['mode']:<6}{r['workload']:<10}"
+              f"{r['bytes_per_sec'] / 1e6:>9.2f}{r['lines_per_sec']:>11}"
+              f"{lat.get('p50', 0):>9.1f}{lat.get('p95', 0):>8.1f}{lat.get('max', 0):>8.1f}"
+              f"{str(r['marks_seen']) + '/' + str(r['marks_sent']):>10}{r['peak_rss_mb'] or 0:>9.1f}")
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", default=",".join(PATHS), help="comma-separated: runner, scene")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated: pipe, pty")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated: " + ", ".join(WORKLOADS))
+    parser.add_argument("--bytes", type=int, default=4 << 20, help="output bytes per case (default 4 MiB)")
+    parser.add_argument("--mark-every", type=int, default=64 << 10, help="bytes between latency markers")
+    parser.add_argument("--fps", type=int, default=60, help="scene frame cap, 0 = uncapped (default 60, as the app)")
+    parser.add_argument("--text-backend", default="surface", help="TextRenderer backend for the scene path")
+    parser.add_argument("--read-size", type=int, default=None, help="ShellRunner read size")
+    parser.add_argument("--poll-interval", type=float, default=0.0005, help="runner path sleep when idle (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per case")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--produce", metavar="WORKLOAD", help=argparse.SUPPRESS)
+    parser.add_argument("--case", metavar="PATH:MODE:WORKLOAD", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.produce:
+        return produce(args.produce, args.bytes, args.mark_every)
+    if args.case:
+        path, mode, workload = args.case.split(":")
+        run = run_scene_case if path == "scene" else run_runner_case
+        print(json.dumps(run(args, mode, workload)))
+        return 0
+
+    cases = [(p, m, w) for p in args.paths.split(",") for m in args.modes.split(",")
+             for w in args.workloads.split(",")]
+    for name, allowed in (("path", PATHS), ("mode", MODES), ("workload", WORKLOADS)):
+        index = ("path", "mode", "workload").index(name)
+        unknown = {case[index] for case in cases} - set(allowed)
+        if unknown:
+            print(f"unknown {name}: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+    results = []
+    for path, mode, workload in cases:
+        if args.json != "-":
+            print(f"running {path}/{mode}/{workload} ...", file=sys.stderr)
+        results.append(_run_case_in_child(args, path, mode, workload))
+    document = {"meta": _metadata(args), "results": results}
+    if args.json == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+    return 0 if all(r.get("completed") for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Startup import budget: fails when importing the app gets slower than a budget
+or pulls in a module that is meant to load lazily.
+
+Runs `python -X importtime -c "import src.app.main"` a few times in fresh
+interpreters and keeps the fastest run (the others mostly add disk and
+scheduler noise). Only imports made after the interpreter's own start-up are
+counted. The provider SDKs, requests, fuzzywuzzy and tkinter are loaded on
+first use (conversational mode, the error dialog), so any of them showing up
+here is a regression even when the total is still under budget.
+
+Run from project root:
+    python scripts/check_import_budget.py                  # default budget
+    python scripts/check_import_budget.py --budget-ms 800 --runs 5
+    python scripts/check_import_budget.py --json -         # machine-readable
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+TARGET = "src.app.main"
+DEFAULT_BUDGET_MS = 1500
+# Top-level packages that must not be imported at startup.
+DEFERRED = ("openai", "anthropic", "httpx", "requests", "fuzzywuzzy", "tkinter")
+START = "@@import-budget-start"
+
+
+def _measure(target):
+    """
+    Imports `target` in a fresh interpreter with -X importtime.
+
+    Returns:
+        List of (name, self_us, cumulative_us, depth) for the imports made by
+        `target`, in the order the interpreter reported them.
+    """
+    code = (
+        "import sys; sys.stderr.write(%r + '\\n'); sys.stderr.flush(); import %s"
+        % (START, target)
+    )
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"))
+    env.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_root, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-4000:]}")
+    lines = proc.stderr.splitlines()
+    if START not in lines:
+        raise RuntimeError("no -X importtime output")
+    imports = []
+    for line in lines[lines.index(START) + 1:]:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def _summary(imports):
+    """Total wall time of the import and the deferred modules it loaded."""
+    # Nested imports are included in the cumulative time of the top-level
+    # import that triggered them.
+    total_us = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+    deferred = sorted({
+        name for name, _, _, _ in imports if name.split(".")[0] in DEFERRED
+    })
+    return total_us, deferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the startup import budget.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"maximum import time of {TARGET} (default {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=3, help="runs; the fastest counts (default 3)")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list (default 15)")
+    parser.add_argument("--json", metavar="PATH", help="write the result as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        imports = _measure(TARGET)
+        total_us, deferred = _summary(imports)
+        if best is None or total_us < best[1]:
+            best = (imports, total_us, deferred)
+    imports, total_us, deferred = best
+    slowest = sorted(imports, key=lambda entry: entry[1], reverse=True)[:args.top]
+    ok = not deferred and total_us <= args.budget_ms * 1000
+
+    if args.json:
+        result = {
+            "target": TARGET,
+            "ok": ok,
+            "total_ms": round(total_us / 1000, 1),
+            "budget_ms": args.budget_ms,
+            "deferred_imported": deferred,
+            "slowest": [
+                {"module": name, "self_ms": round(self_us / 1000, 2),
+                 "cumulative_ms": round(cumulative_us / 1000, 2)}
+                for name, self_us, cumulative_us, _ in slowest
+            ],
+        }
+        text = json.dumps(result, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+    if args.json != "-":
+        print(f"import {TARGET}: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms, "
+              f"fastest of {max(1, args.runs)})")
+        print(f"{'self ms':>9} {'cumul. ms':>10}  module")
+        for name, self_us, cumulative_us, _ in slowest:
+            print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:10.1f}  {name}")
+        if deferred:
+            print("FAIL: imported at startup but meant to load on first use: " + ", ".join(deferred))
+        elif not ok:
+            print("FAIL: over budget")
+        else:
+            print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
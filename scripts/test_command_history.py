@@ -0,0 +1,75 @@
+"""
+CommandHistory test: re-entering commands and trimming to max_entries must keep
+the stored ids and postings proportional to the entries kept, with navigation
+and search unchanged.
+Run from project root:  python scripts/test_command_history.py
+(or set PYTHONPATH to project root)
+"""
+import os
+import sys
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from src.shell.command_history import CommandHistory
+
+LIMIT = 100
+TOTAL = 200000
+
+
+def _command(i):
+    return "git status" if i % 3 == 0 else f"make test-{i % 150}"
+
+
+def _posting_count(history):
+    return sum(len(ids) for ids in history._postings.values())
+
+
+def test_storage_stays_bounded():
+    history = CommandHistory(max_entries=LIMIT)
+    for i in range(TOTAL):
+        history.add(_command(i))
+    assert len(history) == LIMIT
+    assert len(history._by_id) == LIMIT, len(history._by_id)
+    assert len(history._lowered) == LIMIT, len(history._lowered)
+
+    # The same entries added once, for comparison.
+    kept = []
+    entry_id = history.older()
+    while entry_id is not None:
+        kept.append(history.get(entry_id))
+        entry_id = history.older(entry_id)
+    kept.reverse()
+    fresh = CommandHistory(max_entries=LIMIT)
+    for command in kept:
+        fresh.add(command)
+    assert len(kept) == LIMIT
+    assert _posting_count(history) <= 2.5 * _posting_count(fresh), (
+        _posting_count(history), _posting_count(fresh))
+
+    newest = history.older()
+    assert history.get(newest) == _command(TOTAL - 1)
+    assert history.newer(history.older(newest)) == newest
+    assert history.search("git sta")[1] == "git status"
+    match = history.search("test-1")
+    assert match[1] == fresh.search("test-1")[1]
+    older = history.search("test-1", before=match[0])
+    assert older[1] == fresh.search("test-1", before=fresh.search("test-1")[0])[1]
+
+
+def main():
+    print("CommandHistory size test")
+    try:
+        test_storage_stays_bounded()
+    except AssertionError as e:
+        print(f"FAIL: test_storage_stays_bounded: {e}")
+        return 1
+    print("PASS: test_storage_stays_bounded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+ScrollbackIndex test: trimming the front over and over, as TextRenderer does
+with a scrollback limit, must keep the postings proportional to the rows held
+and searches correct.
+Run from project root:  python scripts/test_scrollback_index.py
+(or set PYTHONPATH to project root)
+"""
+import os
+import sys
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from src.rendering.scrollback_index import ScrollbackIndex
+
+LIMIT = 20000
+TRIM = LIMIT // 8  # about what TextRenderer drops at a time
+TOTAL = 200000
+
+
+def _row(i):
+    return f"{i:07d} build step {i % 97} finished in {i % 13}.{i % 7}s"
+
+
+def test_postings_stay_bounded():
+    index = ScrollbackIndex()
+    peak_rows = peak_postings = 0
+    for start in range(0, TOTAL, 500):
+        index.extend(_row(i) for i in range(start, start + 500))
+        index.index_pending()
+        if len(index) > LIMIT:
+            index.discard_before(index.next_id - LIMIT + TRIM)
+        peak_rows = max(peak_rows, len(index))
+        peak_postings = max(peak_postings, index.posting_count())
+    live = ScrollbackIndex()
+    live.extend(_row(i) for i in range(TOTAL - peak_rows, TOTAL))
+    live.index_pending()
+    # Stale ids are pruned once they outnumber the rows held: at most about twice the live postings.
+    assert peak_postings <= 2.5 * live.posting_count(), (peak_postings, live.posting_count())
+    hits = index.search("0199999 build")
+    assert hits == [index.next_id - 1], hits
+    assert index.search(_row(TOTAL - LIMIT - 1)[:7]) == []
+
+
+def main():
+    print("ScrollbackIndex trim test")
+    try:
+        test_postings_stay_bounded()
+    except AssertionError as e:
+        print(f"FAIL: test_postings_stay_bounded: {e}")
+        return 1
+    print("PASS: test_postings_stay_bounded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+ShellScene test: the row showing the shell's in-progress line (a prompt, a
+\r progress bar) must stay in sync with it when the line is erased and when
+Ctrl+C is pressed, without a shell or a window.
+Run from project root:  python scripts/test_shell_scene.py
+(or set PYTHONPATH to project root)
+"""
+import os
+import sys
+import types
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from src.rendering.text_renderer import TextRenderer
+from src.scenes.shell_scene import ShellScene
+
+
+class _Runner:
+    """Stands in for ShellRunner: output is set by the test."""
+
+    SCROLLBACK_LINES = 1000
+    log = None
+
+    def __init__(self):
+        self.lines = []
+        self.pending = ""
+        self.interrupts = 0
+
+    def setwinsize(self, rows, cols):
+        pass
+
+    def read_since(self, cursor):
+        return self.lines[cursor:], self.pending, len(self.lines)
+
+    def screen_active(self):
+        return False
+
+    def send_interrupt(self):
+        self.interrupts += 1
+
+
+class _InputHandler:
+    enter_pressed = False
+
+    def update(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def get_user_input(self):
+        return ""
+
+
+def _scene():
+    pygame.font.init()
+    renderer = TextRenderer(pygame.Surface((800, 600)), pygame.font.Font(None, 20), (0, 255, 0))
+    runner = _Runner()
+    sessions = types.SimpleNamespace(foreground=types.SimpleNamespace(runner=runner, number=1, view=None))
+    app = types.SimpleNamespace(text_renderer=renderer, input_handler=_InputHandler(),
+                                is_rendering=False, state_transition=False)
+    scene = ShellScene(app, sessions)
+    scene.enter()
+    return scene, runner, renderer
+
+
+def _rows(renderer):
+    return [str(row) for row in renderer.full_text_lines]
+
+
+def test_pending_erased_and_shown_again():
+    scene, runner, renderer = _scene()
+    runner.lines = ["first"]
+    runner.pending = "50%"
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "50%"], _rows(renderer)
+    runner.pending = ""
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first"], _rows(renderer)
+    runner.pending = "$ "
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "$ "], _rows(renderer)
+    runner.pending = "$ ls"
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "$ ls"], _rows(renderer)
+
+
+def test_ctrl_c_while_pending():
+    scene, runner, renderer = _scene()
+    runner.lines = ["first"]
+    runner.pending = "$ sleep 10"
+    scene.update()
+    scene.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_c, mod=pygame.KMOD_CTRL, unicode=""))
+    assert runner.interrupts == 1
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "^C", "$ sleep 10"], _rows(renderer)
+    runner.pending = "$ "
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "^C", "$ "], _rows(renderer)
+    runner.lines.append("$ sleep 10")
+    scene.update()
+    assert _rows(renderer) == ["Terminal ready.", "first", "^C", "$ sleep 10", "$ "], _rows(renderer)
+
+
+def main():
+    print("ShellScene pending line test")
+    failed = 0
+    for test in (test_pending_erased_and_shown_again, test_ctrl_c_while_pending):
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL: {test.__name__}: {e}")
+        else:
+            print(f"PASS: {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Shared line ring test: a reader racing a writer that keeps overtaking it must
+report the right sequence number for every line it returns. Lines may be
+skipped (overwritten before they were read) but never renumbered.
+Run from project root:  python scripts/test_shm_ring.py
+(or set PYTHONPATH to project root)
+"""
+import multiprocessing
+import os
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from src.shell.shm_ring import SharedLineReader, SharedLineRing, ring_size
+
+RING_BYTES = 8 << 10
+LINES = 200000
+RUNS = 5
+PAUSE_SEC = 0.002  # the reader pauses now and then, so the writer keeps overtaking it
+
+
+def _write(name, done):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        ring = SharedLineRing(shm.buf)
+        rng = random.Random(os.getpid())
+        n = 0
+        while n < LINES:
+            batch = min(LINES - n, rng.randint(1, 64))
+            ring.append([str(i) for i in range(n, n + batch)])
+            n += batch
+        del ring
+    finally:
+        done.set()
+        shm.close()
+
+
+def check_concurrent_read():
+    """Returns a list of problems found in one writer/reader run."""
+    shm = shared_memory.SharedMemory(create=True, size=ring_size(RING_BYTES))
+    problems = []
+    try:
+        reader = SharedLineReader(shm.buf)
+        done = multiprocessing.Event()
+        writer = multiprocessing.Process(target=_write, args=(shm.name, done))
+        writer.start()
+        rng = random.Random()
+        last = -1
+        while True:
+            if rng.random() < 0.3:
+                time.sleep(PAUSE_SEC)
+            finished = done.is_set()
+            lines, next_seq = reader.read()
+            for seq, line in enumerate(lines, next_seq - len(lines)):
+                if int(line) != seq:
+                    problems.append(f"line {line} reported as seq {seq}")
+                if seq <= last:
+                    problems.append(f"seq {seq} repeated")
+                last = seq
+            if finished and not lines:
+                break
+        writer.join()
+        if last != LINES - 1:
+            problems.append(f"last line read was {last}, not {LINES - 1}")
+        del reader
+    finally:
+        shm.close()
+        shm.unlink()
+    return problems
+
+
+def main():
+    print("SharedLineRing concurrent read test")
+    failed = 0
+    for run in range(RUNS):
+        problems = check_concurrent_read()
+        if problems:
+            failed += 1
+            print(f"FAIL: run {run + 1}: {len(problems)} problems, e.g. {problems[:3]}")
+        else:
+            print(f"PASS: run {run + 1}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+VTParser regression test: an oversized or malformed escape sequence must be
+dropped without losing the output that follows it.
+Run from project root:  python scripts/test_vt_parser.py
+(or set PYTHONPATH to project root)
+"""
+import os
+import sys
+
+# Allow importing src when run as script from project root or from scripts/
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from src.shell.ansi import DEFAULT_STYLE, Style, apply_sgr
+from src.shell.line_builder import LineBuilder
+from src.shell.vt_parser import MAX_PARAM_VALUE, MAX_PARAMS, VTHandler, VTParser
+from src.shell.vt_screen import AltScreenRouter, VTScreen
+
+
+class _Recorder(VTHandler):
+    def __init__(self):
+        self.csi = []
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        self.csi.append((final, params))
+
+
+class _Failing(VTHandler):
+    def __init__(self):
+        self.printed = []
+
+    def print(self, text):
+        self.printed.append(text)
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        raise RuntimeError("handler bug")
+
+
+def _shell_lines(*chunks):
+    """Feeds chunks through the same handler chain ShellRunner uses."""
+    builder = LineBuilder()
+    parser = VTParser(AltScreenRouter(builder, VTScreen()))
+    for chunk in chunks:
+        parser.feed(chunk)
+    builder.finish()
+    return [str(line) for line in builder.take_lines()]
+
+
+def test_oversized_param():
+    lines = _shell_lines("before\n\x1b[" + "1" * 5000 + "mafter\n")
+    assert lines == ["before", "after"], lines
+
+
+def test_oversized_param_split_across_reads():
+    chunks = ["\x1b["] + ["9" * 1000] * 10 + [";" * 10000, "m", "after\n"]
+    assert _shell_lines(*chunks) == ["after"]
+
+
+def test_param_limits():
+    recorder = _Recorder()
+    parser = VTParser(recorder)
+    parser.feed("\x1b[" + "7" * 5000 + "m")
+    parser.feed("\x1b[" + ";".join(["1"] * 1000) + "m")
+    parser.feed("\x1b[00012;;3:4m\x1b[m")
+    assert recorder.csi[0] == ("m", [MAX_PARAM_VALUE])
+    assert recorder.csi[1] == ("m", [1] * MAX_PARAMS)
+    assert recorder.csi[2] == ("m", [12, 0, 3])
+    assert recorder.csi[2][1][2].sub == (4,)
+    assert recorder.csi[3] == ("m", [])
+
+
+def test_subparams_stay_with_parent():
+    recorder = _Recorder()
+    parser = VTParser(recorder)
+    parser.feed("\x1b[38:2::10:20:30;1m\x1b[4:3m\x1b[48:5:208m\x1b[" + ":".join(["1"] * 1000) + "m")
+    params = [params for _, params in recorder.csi]
+    assert params[0] == [38, 1] and params[0][0].sub == (2, 0, 10, 20, 30), params[0]
+    assert params[1] == [4] and params[1][0].sub == (3,), params[1]
+    assert params[2] == [48] and params[2][0].sub == (5, 208), params[2]
+    assert params[3] == [1] and len(params[3][0].sub) == 8, params[3]
+    assert apply_sgr(DEFAULT_STYLE, params[0]) == Style((10, 20, 30), None, True, False)
+    assert apply_sgr(DEFAULT_STYLE, params[1]) == DEFAULT_STYLE  # 3 must not act as a parameter
+    assert apply_sgr(DEFAULT_STYLE, params[2]) == Style(None, 208, False, False)
+
+
+def test_subparam_colors_in_lines():
+    builder = LineBuilder()
+    parser = VTParser(AltScreenRouter(builder, VTScreen()))
+    parser.feed("\x1b[38:2:1:2:3ma\x1b[38;5;9mb\x1b[4:3mc\x1b[m\n")
+    builder.finish()
+    line = builder.take_lines()[0]
+    assert line == "abc"
+    styles = [style for _, style in line.iter_runs()]
+    assert styles == [Style((1, 2, 3), None, False, False), Style(9, None, False, False)], styles
+
+
+def test_handler_error_drops_sequence():
+    handler = _Failing()
+    parser = VTParser(handler)
+    parser.feed("a\x1b[1mb")
+    parser.feed("c")
+    assert "".join(handler.printed) == "abc", handler.printed
+
+
+def main():
+    print("VTParser regression test")
+    failed = 0
+    for test in (test_oversized_param, test_oversized_param_split_across_reads,
+                 test_param_limits, test_subparams_stay_with_parent, test_subparam_colors_in_lines,
+                 test_handler_error_drops_sequence):
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL: {test.__name__}: {e}")
+        else:
+            print(f"PASS: {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,62 @@
+import logging
 import os
 import pygame
 from pygame import mixer
 from src.scenes.scene_factory import SceneFactory
+from src.shell.command_history import CommandHistory
+from src.shell.session_log import new_log_path
+from src.shell.session_pool import SessionPool
+from src.shell.shell_host import RemoteShellRunner
 from src.shell.shell_runner import ShellRunner
 from src.app.crt_settings import CRTSettings
+from src.app.events import SHELL_OUTPUT, EventSignal
+from src.app.frame_profiler import FrameProfiler
+from src.app.timeline import timeline
+from src.app.tracer import tracer
+from src.app.warmup import boot_warmup
+from src.rendering.text_renderer import BACKEND_SURFACE
 import random
 import time  # Import time for calculating elapsed time
 
+logger = logging.getLogger(__name__)
+
+
 class Application:
+    FRAME_RATE = 60  # frames per second while something on screen changes
+    TIMELINE_REPORT_FILE = "robco-timeline.txt"  # Shift+F10 report when config sets no file
+
     def __init__(self, screen, text_renderer, input_handler, config):
         self.screen = screen
         self.text_renderer = text_renderer
         self.input_handler = input_handler
         self.config = config
+        trace_file = getattr(config, "trace_file", None)
+        if trace_file:
+            tracer.start(trace_file)
         self.crt_settings = CRTSettings.load()
-        self.shell_runner = ShellRunner(
-            config.shell_command, config.shell_cwd, config.shell_use_pty
-        )
+        self.prewarm_scenes = getattr(config, "prewarm_scenes", True)
+        self.boot_warmup = getattr(config, "boot_warmup", True)
+        self.warmup = None  # WarmupScheduler started by the boot scene
+        self.idle_fps = getattr(config, "idle_fps", 10)
+        self.idle_after_sec = getattr(config, "idle_after_sec", 1.0)
+        self.shell_output = EventSignal(SHELL_OUTPUT)  # posted by shell reader threads
+        self.frame_profiler = FrameProfiler(self)  # HUD toggled with F11
+        self.timeline_report_file = getattr(config, "timeline_report_file", None)
+        with timeline.span("load command history"):
+            self.shell_history = CommandHistory(
+                getattr(config, "shell_history_file", None), getattr(config, "shell_history_size", None))
+        with timeline.span("spawn shell"):
+            self.shell_sessions = SessionPool(
+                self._shell_runner_factory(config),
+                max_sessions=getattr(config, "shell_max_sessions", None),
+            )
         self.scenes = SceneFactory.create_scenes(self, config)
         self.active_scene = None
         self.previous_scene_name = "shell_scene"
         self.is_rendering = True
         self.state_transition = False
-        self.standard_sounds, self.enter_sounds, self.return_sound, self.poweron_sound, self.hum_sound, self.boot_scroll_sound, self.boot_type_sound, self.boot_wipe_sound = self._load_sounds()
+        with timeline.span("load sounds"):
+            self.standard_sounds, self.enter_sounds, self.return_sound, self.poweron_sound, self.hum_sound, self.boot_scroll_sound, self.boot_type_sound, self.boot_wipe_sound = self._load_sounds()
         self.text_renderer.on_output_added = self.play_return_sound
         self._last_return_sound_time = 0.0
         self._return_sound_debounce_sec = 0.15
@@ -30,39 +64,134 @@ class Application:
         self.start_time = time.time()  # Track the start time
 
     def run(self):
+        """
+        The main loop. It draws at FRAME_RATE while anything changes; once the
+        scene reports idle and no event arrived for idle_after_sec, it blocks in
+        pygame.event.wait and redraws (keeping the CRT effect alive) only
+        idle_fps times a second, or on events only when idle_fps is 0. Input,
+        SHELL_OUTPUT from the shell threads and timers wake it immediately.
+        F10 opens the settings; Shift+F10 writes the startup/scene timeline
+        report (see write_timeline_report); F11 toggles the frame profiler HUD.
+        """
         self._initialize()
         self._start_background_hum()
         self._play_poweron_sound()
         clock = pygame.time.Clock()
         done = False
+        last_activity = time.monotonic()
+        first_frame = True
+        profiler = self.frame_profiler
 
         while not done:
+            idle = (self.active_scene.is_idle()
+                    and time.monotonic() - last_activity >= self.idle_after_sec)
+            if idle:
+                with tracer.span("idle wait", "frame"):
+                    events = self._wait_events()
+            else:
+                events = pygame.event.get()
+            profiler.begin_frame()
+            if events:
+                last_activity = time.monotonic()
             current_time = time.time() - self.start_time  # Calculate elapsed time
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_F10:
-                        self.open_settings()
+            with tracer.span("events", "frame", count=len(events)):
+                for event in events:
+                    if event.type == SHELL_OUTPUT:
+                        self.shell_output.clear()
                         continue
-                    self._play_key_sound(event.key)
-                done |= self.active_scene.handle_event(event)
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_F10 and event.mod & pygame.KMOD_SHIFT:
+                            self.write_timeline_report()
+                            continue
+                        if event.key == pygame.K_F10:
+                            self.open_settings()
+                            continue
+                        if event.key == pygame.K_F11:
+                            profiler.toggle()
+                            continue
+                        self._play_key_sound(event.key)
+                    done |= self.active_scene.handle_event(event)
+            profiler.lap("events")
 
-            self.active_scene.update()
-            self.screen.clear()
-            self.active_scene.render()
-            self.screen.display(current_time, self.crt_settings)
-            clock.tick(60)
+            with tracer.span("update", "frame"):
+                self.active_scene.update()
+            profiler.lap("update")
+            with tracer.span("render", "frame"):
+                self.screen.clear()
+                self.active_scene.render()
+            profiler.lap("render")
+            with tracer.span("display", "frame"):
+                self.screen.display(current_time, self.crt_settings)
+            profiler.end_frame()
+            if first_frame:
+                timeline.mark("first frame shown")
+                first_frame = False
+            if idle:
+                clock.tick()  # the wait above paced this frame
+            else:
+                clock.tick(self.FRAME_RATE)
 
         self._stop_background_hum()
+        self.shell_sessions.close_all()
+        self.shell_history.close()
+        if self.timeline_report_file:
+            self.write_timeline_report()
+        tracer.stop()
         pygame.quit()
 
+    def _wait_events(self):
+        """Blocks until an event arrives or the next idle frame is due; returns the events."""
+        if self.idle_fps > 0:
+            event = pygame.event.wait(max(1, int(1000 / self.idle_fps)))
+        else:
+            event = pygame.event.wait()
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
     def _initialize(self):
         self.screen.initialize()
         self.set_scene(self.config.initial_scene)
 
     def set_scene(self, scene_name):
-        self.active_scene = self.scenes[scene_name]
+        """
+        Switches to a scene, building it first if needed. The build and enter()
+        are timed on the timeline; an enter() longer than one frame is flagged.
+        """
+        if self.scenes.is_built(scene_name):
+            self.active_scene = self.scenes[scene_name]
+        else:
+            with timeline.span(f"build {scene_name}", "scene"):
+                self.active_scene = self.scenes[scene_name]
         self.text_renderer.reset_previous_lines()
-        self.active_scene.enter()
+        self.text_renderer.set_backend(BACKEND_SURFACE)  # scenes opt in to the glyph grid in enter()
+        with timeline.span(f"enter {scene_name}", "scene", budget_sec=1.0 / self.FRAME_RATE):
+            self.active_scene.enter()
+        if self.prewarm_scenes:
+            self.scenes.prewarm_next(scene_name)
+
+    def start_warmup(self):
+        """
+        Starts the boot warm-up (see src.app.warmup) the first time it is called.
+
+        Returns:
+            WarmupScheduler: The running warm-up, or None when config.boot_warmup is off.
+        """
+        if self.warmup is None and self.boot_warmup:
+            self.warmup = boot_warmup(self)
+            self.warmup.start()
+        return self.warmup
+
+    def write_timeline_report(self):
+        """
+        Writes the timeline report to config.timeline_report_file, or to
+        TIMELINE_REPORT_FILE in the working directory when none is set.
+        """
+        path = self.timeline_report_file or self.TIMELINE_REPORT_FILE
+        try:
+            timeline.write_report(path)
+        except OSError:
+            logger.warning("could not write the timeline report to %s", path, exc_info=True)
 
     def open_settings(self):
         """Switch to settings scene; remember current scene to return to."""
@@ -72,8 +201,34 @@ class Application:
                 break
         self.set_scene("settings_scene")
 
+    def _shell_runner_factory(self, config):
+        """Returns the SessionPool's runner factory: shells parsed in this process,
+        or in helper processes when config.shell_out_of_process is set. All
+        sessions share one command history.
+        """
+        history = self.shell_history
+        on_output = self.shell_output.notify
+
+        def log_path():
+            if not getattr(config, "shell_session_log", False):
+                return None
+            return new_log_path(getattr(config, "shell_log_dir", None))
+
+        if getattr(config, "shell_out_of_process", False):
+            return lambda reactor: RemoteShellRunner(
+                config.shell_command, config.shell_cwd, config.shell_use_pty,
+                read_size=config.shell_read_size, log_path=log_path(), history=history,
+                on_output=on_output, ring_bytes=getattr(config, "shell_ring_bytes", None),
+            )
+        return lambda reactor: ShellRunner(
+            config.shell_command, config.shell_cwd, config.shell_use_pty,
+            read_size=config.shell_read_size, reactor=reactor, log_path=log_path(), history=history,
+            on_output=on_output,
+        )
+
     def _load_sounds(self):
-        mixer.init()
+        with timeline.span("mixer.init"):
+            mixer.init()
         mixer.set_num_channels(16)
 
         def _load(path):
@@ -90,18 +245,19 @@ class Application:
                     out.append(s)
             return out
 
-        standard_sounds = _load_list(self.config.standard_sound_files)
-        enter_sounds = _load_list(self.config.enter_sound_files)
-        if not standard_sounds:
-            standard_sounds = enter_sounds
-        if not enter_sounds:
-            enter_sounds = standard_sounds
-        return_sound = _load(getattr(self.config, "return_sound_file", None))
-        poweron_sound = _load(getattr(self.config, "poweron_sound_file", None))
-        hum_sound = _load(getattr(self.config, "hum_sound_file", None))
-        boot_scroll_sound = _load(getattr(self.config, "boot_scroll_sound_file", None))
-        boot_type_sound = _load(getattr(self.config, "boot_type_sound_file", None))
-        boot_wipe_sound = _load(getattr(self.config, "boot_wipe_sound_file", None))
+        with timeline.span("decode sounds"):
+            standard_sounds = _load_list(self.config.standard_sound_files)
+            enter_sounds = _load_list(self.config.enter_sound_files)
+            if not standard_sounds:
+                standard_sounds = enter_sounds
+            if not enter_sounds:
+                enter_sounds = standard_sounds
+            return_sound = _load(getattr(self.config, "return_sound_file", None))
+            poweron_sound = _load(getattr(self.config, "poweron_sound_file", None))
+            hum_sound = _load(getattr(self.config, "hum_sound_file", None))
+            boot_scroll_sound = _load(getattr(self.config, "boot_scroll_sound_file", None))
+            boot_type_sound = _load(getattr(self.config, "boot_type_sound_file", None))
+            boot_wipe_sound = _load(getattr(self.config, "boot_wipe_sound_file", None))
         return standard_sounds, enter_sounds, return_sound, poweron_sound, hum_sound, boot_scroll_sound, boot_type_sound, boot_wipe_sound
 
     def _play_key_sound(self, key):
@@ -4,15 +4,33 @@ from src.assets.file_loader import FileLoader
 class Config:
     def __init__(self):
         file_loader = FileLoader()
-        self.shell_command = "cmd.exe"
+        self.shell_command = None  # None = platform shell ($SHELL on Linux/macOS, cmd.exe on Windows)
         self.shell_cwd = None  # None = use current working directory when app runs
+        self.shell_read_size = 65536  # bytes per read from the shell pipe/PTY
         self.shell_use_pty = True  # Use PTY so SSH and other TTY programs work; fallback to pipes if unavailable
+        self.shell_max_sessions = 9  # shells open at once (Ctrl+Shift+T opens, Alt+1..9 switches)
+        self.shell_out_of_process = False  # parse shell output in a helper process (shared-memory ring) instead of UI threads
+        self.shell_ring_bytes = 8 * 1024 * 1024  # line storage of each helper's shared ring
+        self.shell_session_log = False  # opt-in: keep each session's output in an on-disk log that scrollback pages in (deleted on close)
+        self.shell_log_dir = None  # None = system temp directory
+        self.shell_history_file = "~/.robco_shell_history"  # commands kept across runs; None = this run only
+        self.shell_history_size = 50000  # commands kept in the history (duplicates are merged)
         self.font_path = file_loader.get_path("assets/fonts/Perfect DOS VGA 437 Win.ttf")
         self.screen_width = 1200   # 50% larger than 800
         self.screen_height = 900   # 50% larger than 600
         self.font_size = 20
+        self.idle_fps = 10  # redraw rate (CRT animation) while nothing changes; 0 = redraw only on events
+        self.idle_after_sec = 1.0  # seconds without input or output before dropping to idle_fps
+        self.smooth_scroll = False  # opt-in: pixel scrolling from a cached scroll strip instead of whole-line jumps
+        self.text_reveal_mode = "cpu"  # "cpu" = re-render substring per frame, "shader" = CRT pass masks untyped cells (opt-in)
+        self.text_backend = "surface"  # shell/narrative text: "surface" = pygame overlay, "glyph_grid" = instanced GPU cell grid (opt-in)
+        self.scrollback_limit = 20000  # wrapped rows kept in the text view; older rows are dropped
         self.initial_scene = "termlink_boot_scene"
         self.scene_after_boot = "shell_scene"
+        self.prewarm_scenes = True  # build the scenes likely to be entered next in the background
+        self.timeline_report_file = None  # write the startup/scene-switch timeline here at exit (.json = JSON, else text); None = only on Shift+F10
+        self.trace_file = None  # opt-in: write Chrome/Perfetto trace events (frames, shell I/O, LLM calls, scenes) here, e.g. "trace.json"
+        self.boot_warmup = True  # during the boot animation, build all scenes, the GPU text path and the LLM clients
         self.password = "password123"
         self.standard_sound_files = [
             file_loader.get_path("assets/sounds/single_keypress_01.wav"),
@@ -0,0 +1,48 @@
+"""
+Custom pygame events that wake the main loop while it waits idle.
+
+Background threads (shell readers, the out-of-process shell's wake thread)
+must not touch the scene, so they post an event instead; the loop then draws
+at full rate until things settle again.
+"""
+import threading
+
+import pygame
+
+SHELL_OUTPUT = pygame.event.custom_type()  # a shell wrote output or changed state
+
+
+class EventSignal:
+    """
+    Posts one event of a type from any thread. Further notify() calls are
+    dropped until the loop has taken the event and called clear(), so a burst
+    of output does not flood the event queue.
+    """
+
+    def __init__(self, event_type):
+        """
+        Initializes the EventSignal.
+
+        Args:
+            event_type: pygame event type to post.
+        """
+        self.event_type = event_type
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def notify(self):
+        """Posts the event unless one is already waiting."""
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+        try:
+            pygame.event.post(pygame.event.Event(self.event_type))
+        except pygame.error:  # display gone (shutting down)
+            with self._lock:
+                self._pending = False
+
+    def clear(self):
+        """Called by the loop when it takes the event."""
+        with self._lock:
+            self._pending = False
@@ -1,6 +1,6 @@
 from src.rendering.terminal_screen import TerminalScreen
 from src.assets.font_loader import FileFontLoader
-from src.rendering.text_renderer import TextRenderer
+from src.rendering.text_renderer import TextRenderer, REVEAL_MODE_CPU, BACKEND_SURFACE
 from src.handlers.input_handler import TerminalInputHandler
 from src.app.constants import BLACK, GREEN
 
@@ -16,11 +16,17 @@ class FontLoaderFactory:
 
 class TextRendererFactory:
     @staticmethod
-    def create_text_renderer(screen, font):
+    def create_text_renderer(screen, font, config=None):
         margin = (50, 50)
         max_width = screen.width - 2 * margin[0]
         max_height = screen.height - 2 * margin[1]
-        return TextRenderer(screen, font, GREEN, margin=margin, max_width=max_width, max_height=max_height)
+        reveal_mode = getattr(config, "text_reveal_mode", REVEAL_MODE_CPU)
+        smooth_scroll = getattr(config, "smooth_scroll", False)
+        text_backend = getattr(config, "text_backend", BACKEND_SURFACE)
+        scrollback_limit = getattr(config, "scrollback_limit", None)
+        return TextRenderer(screen, font, GREEN, margin=margin, max_width=max_width, max_height=max_height,
+                            reveal_mode=reveal_mode, smooth_scroll=smooth_scroll, text_backend=text_backend,
+                            scrollback_limit=scrollback_limit)
 
 class InputHandlerFactory:
     @staticmethod
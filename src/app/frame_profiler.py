@@ -0,0 +1,158 @@
+"""
+Per-frame profiler shown as a HUD (F11): frame time and its 1% low, a
+histogram of recent frame times, where each frame's time goes, and a few
+throughput counters.
+
+Application.run marks the end of each step with lap(); TerminalScreen
+records its own steps (glyph-grid cells, overlay upload, CRT pass, HUD,
+flip) in display_times. Nothing is recorded while the HUD is hidden. The HUD
+is drawn into a small surface REFRESH_SEC apart, not every frame, and the
+screen draws it after the CRT pass, so it adds one small upload four times a
+second and one textured quad per frame to what it measures (its own cost is
+listed as "hud").
+"""
+import time
+from collections import deque
+
+import pygame
+
+LAPS = ("events", "update", "render")
+DISPLAY_STEPS = ("cells", "upload", "crt", "hud", "flip")
+
+
+class FrameProfiler:
+    """
+    Collects frame timings while enabled and keeps the HUD surface up to date.
+    """
+
+    HISTORY = 600  # frames kept for the 1% low and the histogram (10 s at 60 fps)
+    REFRESH_SEC = 0.25  # HUD redraw interval
+    HISTOGRAM_BINS = 25
+    HISTOGRAM_BIN_MS = 2.0  # the last bin also holds everything slower
+    BACKGROUND = (0, 0, 0, 200)
+    MARGIN = 8
+
+    def __init__(self, app):
+        """
+        Initializes the FrameProfiler, hidden.
+
+        Args:
+            app: The Application; its screen, text renderer and shell sessions are read.
+        """
+        self.app = app
+        self.enabled = False
+        self._frame_times = deque(maxlen=self.HISTORY)  # seconds between frame starts
+        self._frame_start = None
+        self._lap_start = 0.0
+        self._sums = {}  # step -> seconds summed since the last HUD refresh
+        self._frames = 0  # frames since the last HUD refresh
+        self._refreshed = 0.0
+        self._counters = None  # (lines, cache hits, cache misses) at the last refresh
+
+    def toggle(self):
+        """Shows or hides the HUD."""
+        self.enabled = not self.enabled
+        self._frame_times.clear()
+        self._frame_start = None
+        self._reset_window(time.perf_counter())
+        if not self.enabled:
+            self.app.screen.set_hud(None)
+
+    def begin_frame(self):
+        """Called when a frame starts, after any idle wait."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._frame_times.append(now - self._frame_start)
+        self._frame_start = now
+        self._lap_start = now
+
+    def lap(self, step):
+        """Adds the time since the previous lap (or the frame start) to a step."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._sums[step] = self._sums.get(step, 0.0) + now - self._lap_start
+        self._lap_start = now
+
+    def end_frame(self):
+        """Called after the frame was displayed; redraws the HUD when it is due."""
+        if not self.enabled:
+            return
+        for step, seconds in self.app.screen.display_times.items():
+            self._sums[step] = self._sums.get(step, 0.0) + seconds
+        self._frames += 1
+        now = time.perf_counter()
+        if now - self._refreshed >= self.REFRESH_SEC:
+            self.app.screen.set_hud(self._draw(now), (self.MARGIN, self.MARGIN))
+            self._reset_window(now)
+
+    def _reset_window(self, now):
+        self._sums = {}
+        self._frames = 0
+        self._refreshed = now
+        self._counters = self._read_counters()
+
+    def _read_counters(self):
+        sessions = getattr(self.app, "shell_sessions", None)
+        lines = sum(session.runner.line_count for session in sessions.sessions) if sessions else 0
+        renderer = self.app.text_renderer
+        return lines, renderer.line_cache_hits, renderer.line_cache_misses
+
+    def _draw(self, now):
+        """Returns the HUD surface for the window since the last refresh."""
+        frames = max(1, self._frames)
+        elapsed = max(1e-6, now - self._refreshed)
+        lines, hits, misses = self._read_counters()
+        old_lines, old_hits, old_misses = self._counters
+        new_lookups = (hits - old_hits) + (misses - old_misses)
+        times = sorted(self._frame_times)
+        mean = sum(times) / len(times) if times else 0.0
+        low = times[min(len(times) - 1, int(len(times) * 0.99))] if times else 0.0
+
+        def ms(step):
+            return self._sums.get(step, 0.0) * 1000 / frames
+
+        rows = [
+            f"FRAME {mean * 1000:5.1f} ms  {1 / mean if mean else 0:5.1f} fps  "
+            f"1% LOW {1 / low if low else 0:5.1f} fps",
+            "  ".join(f"{step} {ms(step):.1f}" for step in LAPS),
+            "  ".join(f"{step} {ms(step):.1f}" for step in DISPLAY_STEPS),
+            f"SHELL {(lines - old_lines) / elapsed:7.0f} lines/s",
+            f"FONT.RENDER {(misses - old_misses) / frames:5.1f}/frame  LINE CACHE "
+            + (f"{100 * (hits - old_hits) / new_lookups:3.0f}% hit" if new_lookups else "idle"),
+        ]
+        font = self.app.text_renderer.font
+        color = self.app.text_renderer.color
+        line_height = font.get_linesize()
+        text = [font.render(row, True, color) for row in rows]
+        histogram_height = 3 * line_height
+        width = max(surface.get_width() for surface in text) + 2 * self.MARGIN
+        height = len(text) * line_height + histogram_height + 3 * self.MARGIN
+        hud = pygame.Surface((width, height), pygame.SRCALPHA)
+        hud.fill(self.BACKGROUND)
+        for i, surface in enumerate(text):
+            hud.blit(surface, (self.MARGIN, self.MARGIN + i * line_height))
+        top = 2 * self.MARGIN + len(text) * line_height
+        self._draw_histogram(hud, pygame.Rect(self.MARGIN, top, width - 2 * self.MARGIN, histogram_height),
+                             times, low, color)
+        return hud
+
+    def _draw_histogram(self, surface, rect, times, low, color):
+        """Frame-time histogram; the bin holding the 1% low is drawn solid, the others dimmed."""
+        bins = [0] * self.HISTOGRAM_BINS
+        for seconds in times:
+            bins[min(self.HISTOGRAM_BINS - 1, int(seconds * 1000 / self.HISTOGRAM_BIN_MS))] += 1
+        low_bin = min(self.HISTOGRAM_BINS - 1, int(low * 1000 / self.HISTOGRAM_BIN_MS))
+        peak = max(bins) or 1
+        bar_width = rect.width / self.HISTOGRAM_BINS
+        dim = tuple(channel // 3 for channel in color[:3])
+        for i, count in enumerate(bins):
+            bar_height = round(rect.height * count / peak)
+            if count and bar_height == 0:
+                bar_height = 1
+            bar = pygame.Rect(rect.x + round(i * bar_width), rect.bottom - bar_height,
+                              max(1, round(bar_width) - 1), bar_height)
+            surface.fill(color if i == low_bin and times else dim, bar)
+        pygame.draw.line(surface, dim, rect.bottomleft, rect.bottomright)
@@ -1,14 +1,17 @@
+from src.app.timeline import timeline  # first, so the timeline starts before the heavy imports
 import pygame
 from dotenv import load_dotenv
 from src.app.application import Application
 from src.app.factories import ScreenFactory, FontLoaderFactory, TextRendererFactory, InputHandlerFactory
 from src.app.config import Config
 from src.assets.file_loader import FileLoader
-import tkinter as tk
-from tkinter import scrolledtext
 import time
 
 def show_error_dialog(error_message):
+    # tkinter is only needed when something failed, so it is not imported at startup.
+    import tkinter as tk
+    from tkinter import scrolledtext
+
     root = tk.Tk()
     root.title("Error")
     
@@ -25,21 +28,25 @@ def show_error_dialog(error_message):
 
 def main():
     try:
+        timeline.mark("imports done")
         file_loader = FileLoader()
         dotenv_path = file_loader.get_path('.env')
         load_dotenv(dotenv_path)
 
-        pygame.init()
+        with timeline.span("pygame.init"):
+            pygame.init()
 
         config = Config()
         
         screen = ScreenFactory.create_screen(config)
         font_loader = FontLoaderFactory.create_font_loader(config)
-        font = font_loader.load()
-        text_renderer = TextRendererFactory.create_text_renderer(screen, font)
+        with timeline.span("load font"):
+            font = font_loader.load()
+        text_renderer = TextRendererFactory.create_text_renderer(screen, font, config)
         input_handler = InputHandlerFactory.create_input_handler()
 
-        app = Application(screen, text_renderer, input_handler, config)
+        with timeline.span("create application"):
+            app = Application(screen, text_renderer, input_handler, config)
         app.run()
 
         pygame.quit()
@@ -0,0 +1,152 @@
+"""
+Timeline of startup and scene switches: where the seconds before the first
+frame go (font, sounds, shaders, scene construction) and how long each
+scene.enter() takes.
+
+Code wraps a phase in `with timeline.span(name):`. A span costs two
+perf_counter() calls and one append, so the instrumentation stays in place
+in normal runs; per-frame work is not recorded here. Spans nest per thread
+(the depth indents the text report) and record the thread, so warm-up work
+on worker threads shows up next to the main thread's. A span given a budget
+that it overruns is logged as a warning when it ends and flagged in the
+report. The report is a text table or JSON, written on demand with
+write_report() (the app does it at exit and on Shift+F10). While the tracer
+runs, every span is also written to the trace.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from src.app.tracer import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed phase."""
+
+    __slots__ = ("name", "category", "start", "end", "thread", "depth", "budget")
+
+    def __init__(self, name, category, start, thread, depth, budget):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = None
+        self.thread = thread
+        self.depth = depth
+        self.budget = budget
+
+    @property
+    def duration(self):
+        """Seconds the span took, or None while it is open."""
+        return None if self.end is None else self.end - self.start
+
+    @property
+    def over_budget(self):
+        """True when the span had a budget and took longer."""
+        return self.budget is not None and self.end is not None and self.end - self.start > self.budget
+
+
+class Timeline:
+    """
+    Spans in the order they started, times relative to the Timeline's creation.
+    """
+
+    MAX_SPANS = 10000  # oldest spans are dropped beyond this (long sessions switch scenes a lot)
+
+    def __init__(self):
+        """Initializes the Timeline; time 0 is now."""
+        self.origin = time.perf_counter()
+        self.origin_wall = time.time()
+        self.spans = deque(maxlen=self.MAX_SPANS)
+        self._local = threading.local()  # per-thread nesting depth
+
+    @contextmanager
+    def span(self, name, category="startup", budget_sec=None):
+        """
+        Times the body of a with block.
+
+        Args:
+            name: What is being timed.
+            category: Group shown in the report ("startup", "scene", "warmup", ...).
+            budget_sec: Optional time the span should stay under.
+        """
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        record = Span(name, category, time.perf_counter() - self.origin,
+                      threading.current_thread().name, depth, budget_sec)
+        self.spans.append(record)
+        try:
+            yield record
+        finally:
+            record.end = time.perf_counter() - self.origin
+            self._local.depth = depth
+            if tracer.enabled:
+                tracer.complete(name, category, int((self.origin + record.start) * 1e6))
+            if record.over_budget:
+                logger.warning("%s took %.1f ms (budget %.1f ms)",
+                               name, record.duration * 1000, budget_sec * 1000)
+
+    def mark(self, name, category="startup"):
+        """Records an instant (a span of zero length), e.g. the first frame shown."""
+        now = time.perf_counter() - self.origin
+        record = Span(name, category, now, threading.current_thread().name,
+                      getattr(self._local, "depth", 0), None)
+        record.end = now
+        self.spans.append(record)
+
+    def over_budget(self):
+        """Returns the finished spans that overran their budget."""
+        return [span for span in list(self.spans) if span.over_budget]
+
+    def report_text(self):
+        """Returns the timeline as a text table, one row per span."""
+        spans = list(self.spans)
+        rows = [f"{'start ms':>10} {'dur ms':>9}  {'thread':<14} {'category':<9} span"]
+        for span in spans:
+            duration = "open" if span.end is None else f"{span.duration * 1000:.1f}"
+            flag = f"  << over {span.budget * 1000:.1f} ms budget" if span.over_budget else ""
+            rows.append(f"{span.start * 1000:10.1f} {duration:>9}  {span.thread[:14]:<14} "
+                        f"{span.category:<9} {'  ' * span.depth}{span.name}{flag}")
+        slow = [span for span in spans if span.over_budget]
+        rows.append(f"{len(spans)} spans, {len(slow)} over budget")
+        return "\n".join(rows)
+
+    def report_json(self):
+        """Returns the timeline as a JSON-serializable dict."""
+        return {
+            "origin_unix": self.origin_wall,
+            "spans": [
+                {
+                    "name": span.name,
+                    "category": span.category,
+                    "thread": span.thread,
+                    "depth": span.depth,
+                    "start_ms": round(span.start * 1000, 3),
+                    "duration_ms": None if span.end is None else round(span.duration * 1000, 3),
+                    "budget_ms": None if span.budget is None else round(span.budget * 1000, 3),
+                    "over_budget": span.over_budget,
+                }
+                for span in list(self.spans)
+            ],
+        }
+
+    def write_report(self, path):
+        """
+        Writes the report to a file: JSON when the path ends in .json, else the text table.
+
+        Args:
+            path: File to write (replaced).
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                json.dump(self.report_json(), f, indent=2)
+                f.write("\n")
+            else:
+                f.write(self.report_text() + "\n")
+
+
+timeline = Timeline()  # the process-wide timeline; created at first import, so early in main.py
@@ -0,0 +1,164 @@
+"""
+Opt-in Chrome trace-event export (config.trace_file): frame steps, shell
+reads, LLM calls and scene switches on one timeline per thread, for opening
+in chrome://tracing or ui.perfetto.dev to see which background work lines up
+with a stutter.
+
+Recording must not cause the stutters it is meant to find, so an event is a
+tuple appended to a deque owned by the recording thread: no lock, no
+formatting, no I/O. A flusher thread drains every thread's deque each
+FLUSH_INTERVAL_SEC (deque append and popleft are atomic, so the owner never
+waits for it), turns the tuples into JSON and appends them to the file. The
+file is a JSON array that is closed by stop(); a trace cut short by a crash
+still loads, since the viewers accept an unterminated array. While tracing
+is off every call returns after one attribute check.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    Records trace events per thread and writes them to a file in the background.
+    """
+
+    FLUSH_INTERVAL_SEC = 0.5
+
+    def __init__(self):
+        """Initializes the Tracer, off."""
+        self.enabled = False
+        self.pid = os.getpid()
+        self._local = threading.local()  # .events: this thread's deque
+        self._buffers = []  # (tid, deque) of every thread that recorded
+        self._lock = threading.Lock()  # guards _buffers and the file
+        self._file = None
+        self._first = True  # no event written yet (no separating comma)
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def start(self, path):
+        """
+        Starts tracing to a file (replaced). Does nothing if already tracing.
+
+        Args:
+            path: Trace file to write, e.g. "trace.json".
+        """
+        if self.enabled:
+            return
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._first = True
+        self._stop.clear()
+        self.enabled = True
+        self._flusher = threading.Thread(target=self._flush_loop, name="trace-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stops tracing, writes what is buffered and closes the file."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush()
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def now():
+        """Current trace time in microseconds."""
+        return time.perf_counter_ns() // 1000
+
+    def span(self, name, category, **args):
+        """
+        Records the body of a with block as one complete event.
+
+        Args:
+            name: Event name.
+            category: Event category ("frame", "shell", "llm", "scene", ...).
+            **args: Values shown with the event.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    @contextmanager
+    def _span(self, name, category, args):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, args)
+
+    def complete(self, name, category, start_us, args=None):
+        """
+        Records an event from start_us (from now()) until now.
+
+        Args:
+            name: Event name.
+            category: Event category.
+            start_us: When it started.
+            args: Optional dict of values shown with the event.
+        """
+        if self.enabled:
+            self._events().append(("X", name, category, start_us, self.now() - start_us, args))
+
+    def instant(self, name, category, args=None):
+        """Records a point in time."""
+        if self.enabled:
+            self._events().append(("i", name, category, self.now(), None, args))
+
+    def _events(self):
+        events = getattr(self._local, "events", None)
+        if events is None:
+            events = self._local.events = deque()
+            thread = threading.current_thread()
+            events.append(("M", "thread_name", None, 0, None, {"name": thread.name}))
+            with self._lock:
+                self._buffers.append((threading.get_native_id(), events))
+        return events
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.FLUSH_INTERVAL_SEC):
+            with self._lock:
+                self._flush()
+
+    def _flush(self):
+        """Drains every thread's buffer into the file. Called with _lock held."""
+        chunks = []
+        for tid, events in self._buffers:
+            while True:
+                try:
+                    phase, name, category, ts, dur, args = events.popleft()
+                except IndexError:
+                    break
+                event = {"ph": phase, "name": name, "pid": self.pid, "tid": tid, "ts": ts}
+                if category is not None:
+                    event["cat"] = category
+                if dur is not None:
+                    event["dur"] = dur
+                if phase == "i":
+                    event["s"] = "t"
+                if args:
+                    event["args"] = args
+                chunks.append(json.dumps(event, default=str))
+        if not chunks:
+            return
+        if not self._first:
+            self._file.write(",\n")
+        self._file.write(",\n".join(chunks))
+        self._file.flush()
+        self._first = False
+
+
+tracer = Tracer()  # the process-wide tracer; started by Application when config.trace_file is set
@@ -0,0 +1,126 @@
+"""
+Boot-time warm-up: work that would otherwise stall the first frames of the
+scene after boot, done while TermlinkBootScene plays its purely visual phases.
+
+Tasks that only touch Python state (building scenes, which parses the
+narrative YAML; importing the provider SDKs and building their clients) run
+on worker threads. Tasks that need the OpenGL context or the font (linking
+the glyph-grid shader, rasterizing and uploading the glyph atlas) must stay
+on the main thread, so the boot scene runs them in slices of MAIN_BUDGET_SEC
+per frame and runs whatever is left before it hands over. A scene lookup that
+races a worker waits for that build (see SceneRegistry) rather than building
+it twice, so nothing has to be finished for correctness, only for speed.
+"""
+import logging
+import queue
+import threading
+import time
+
+from src.app.timeline import timeline
+from src.handlers.openai_handler import get_client
+from src.rendering.text_renderer import BACKEND_GLYPH_GRID
+
+logger = logging.getLogger(__name__)
+
+BOOT_SCENES = ("termlink_boot_scene", "bootup_scene")
+
+
+class WarmupScheduler:
+    """
+    Runs named warm-up tasks: background tasks on worker threads, main-thread
+    tasks a slice at a time from run_main().
+    """
+
+    MAIN_BUDGET_SEC = 0.004  # per-frame time for main-thread tasks
+
+    def __init__(self, workers=1):
+        """
+        Initializes the WarmupScheduler. Nothing runs before start().
+
+        Args:
+            workers: Number of worker threads for background tasks.
+        """
+        self.workers = max(1, workers)
+        self.timings = {}  # task name -> seconds it took
+        self._queue = queue.Queue()
+        self._main = []  # (name, fn) waiting for run_main, in order
+        self._threads = []
+
+    def add(self, name, fn):
+        """Queues fn() to run on a worker thread."""
+        self._queue.put((name, fn))
+
+    def add_main(self, name, fn):
+        """Queues fn() to run on the main thread from run_main()."""
+        self._main.append((name, fn))
+
+    def start(self):
+        """Starts the worker threads."""
+        for i in range(self.workers):
+            self._queue.put(None)  # one stop marker per worker, after the tasks
+            thread = threading.Thread(target=self._worker_loop, name=f"warmup-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def run_main(self, budget_sec=MAIN_BUDGET_SEC):
+        """
+        Runs main-thread tasks until budget_sec has been spent. A task is never
+        split, so one slow task can overrun the budget.
+
+        Args:
+            budget_sec: Time to spend, or None to run every remaining task.
+
+        Returns:
+            bool: True when no main-thread task is left.
+        """
+        deadline = None if budget_sec is None else time.perf_counter() + budget_sec
+        while self._main:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._run(*self._main.pop(0))
+        return not self._main
+
+    def is_done(self):
+        """True when every task, background and main-thread, has finished."""
+        return not self._main and not any(thread.is_alive() for thread in self._threads)
+
+    def _worker_loop(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            self._run(*task)
+
+    def _run(self, name, fn):
+        start = time.perf_counter()
+        try:
+            with timeline.span(name, "warmup"):
+                fn()
+        except Exception:
+            # Done again (and the error raised) where the result is first used.
+            logger.debug("warm-up task %s failed", name, exc_info=True)
+        self.timings[name] = time.perf_counter() - start
+        logger.debug("warm-up task %s took %.1f ms", name, self.timings[name] * 1000)
+
+
+def boot_warmup(app):
+    """
+    Returns a WarmupScheduler, not yet started, holding the boot warm-up of an
+    Application.
+
+    Args:
+        app: The Application; its scenes, screen and text renderer are warmed.
+    """
+    scheduler = WarmupScheduler()
+    after_boot = app.config.scene_after_boot
+    names = [after_boot] + [name for name in app.scenes.names() if name != after_boot]
+    for name in names:
+        if name not in BOOT_SCENES:
+            scheduler.add(f"scene:{name}", lambda name=name: app.scenes[name])
+    scheduler.add("llm_clients", lambda: get_client("openai"))
+
+    text_renderer = app.text_renderer
+    if text_renderer.text_backend == BACKEND_GLYPH_GRID:
+        scheduler.add_main("glyph_grid", lambda: app.screen.prepare_glyph_grid(text_renderer.warm_up()))
+    return scheduler
+
@@ -1,12 +1,9 @@
-import openai
 import os
 import json
-import requests
-import yaml
-import anthropic
 import logging
-from fuzzywuzzy import process
+import threading
 from abc import ABC, abstractmethod
+from src.app.tracer import tracer
 from src.assets.file_loader import FileLoader
 from src.handlers.ai_tools.tools_builder import ToolsBuilder
 from src.handlers.ai_tools.tools_clients import (
@@ -16,30 +13,91 @@ from src.handlers.ai_tools.tools_clients import (
 )
 from src.handlers.ai_tools.tools_provider import LLMProviderHandler
 
-logging.basicConfig(
-    filename="robco-terminal-errors.log",
-    level=logging.ERROR,
-    format="%(asctime)s - %(message)s",
-)
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
-anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-nvidia_api_key = os.getenv("NVIDIA_API_KEY")
+# The provider SDKs (openai, anthropic), requests and fuzzywuzzy take seconds to
+# import and the clients are only needed in conversational mode, so they are
+# imported and built on first use (get_client / get_llm_handler), not here.
 
 NVIDIA_LLAMA3_70B_API_URL = os.getenv(
     "NVIDIA_LLAMA3_70B_API_URL", "https://integrate.api.nvidia.com/v1"
 )
 
-try:
-    client_openai = OpenAIClient(openai.OpenAI())
-    client_anthropic = AnthropicClient(anthropic.Anthropic(api_key=anthropic_api_key))
-    client_nvidia = NVIDIAClient(
-        openai.OpenAI(base_url=NVIDIA_LLAMA3_70B_API_URL, api_key=nvidia_api_key)
+_provider_clients = None  # provider -> client, built by _init_clients()
+_llm_handlers = None  # provider -> LLMProviderHandler
+_clients_lock = threading.Lock()
+
+
+def _init_clients():
+    """Imports the SDKs, configures the error log and builds one client per provider."""
+    global _provider_clients, _llm_handlers
+    import openai
+    import anthropic
+
+    logging.basicConfig(
+        filename="robco-terminal-errors.log",
+        level=logging.ERROR,
+        format="%(asctime)s - %(message)s",
     )
-except (openai.OpenAIError, anthropic.APIError, openai.OpenAIError):
-    client_openai = None
-    client_anthropic = None
-    client_nvidia = None
+    # Read here rather than at import, so keys loaded from .env by main() are seen.
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    try:
+        client_openai = OpenAIClient(openai.OpenAI())
+        client_anthropic = AnthropicClient(
+            anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        )
+        client_nvidia = NVIDIAClient(
+            openai.OpenAI(
+                base_url=NVIDIA_LLAMA3_70B_API_URL, api_key=os.getenv("NVIDIA_API_KEY")
+            )
+        )
+    except (openai.OpenAIError, anthropic.APIError):
+        client_openai = None
+        client_anthropic = None
+        client_nvidia = None
+    clients = {
+        "openai": client_openai,
+        "anthropic": client_anthropic,
+        "nvidia": client_nvidia,
+    }
+    _llm_handlers = {
+        provider: LLMProviderHandler(client)
+        for provider, client in clients.items()
+    }
+    _provider_clients = clients
+
+
+def _ensure_clients():
+    if _provider_clients is None:
+        with _clients_lock:
+            if _provider_clients is None:
+                _init_clients()
+
+
+def get_client(provider):
+    """Returns the client of a provider ("openai", "anthropic", "nvidia"), or None
+    if the clients could not be created. The first call imports the SDKs.
+    """
+    _ensure_clients()
+    return _provider_clients[provider]
+
+
+def get_llm_handler(provider):
+    """Returns the LLMProviderHandler of a provider, creating the clients on first use."""
+    _ensure_clients()
+    return _llm_handlers[provider]
+
+
+def warm_up_clients():
+    """Creates the clients on a background thread, so the first request does not wait for the imports."""
+    if _provider_clients is None:
+        threading.Thread(target=_ensure_clients, name="llm-clients", daemon=True).start()
+
+
+def _extract_one(query, choices):
+    """fuzzywuzzy's process.extractOne, imported on first use."""
+    from fuzzywuzzy import process
+
+    return process.extractOne(query, choices)
+
 
 CONTEXT_FOLDER = os.getenv("CONTEXT_FOLDER", "support")
 
@@ -66,17 +124,6 @@ def log_llm_interaction(provider, endpoint, request_data, response_data):
     logging.info(log_message)
 
 
-# Initialize provider handlers
-provider_clients = {
-    "openai": client_openai,
-    "anthropic": client_anthropic,
-    "nvidia": client_nvidia,
-}
-llm_handlers = {
-    provider: LLMProviderHandler(client)
-    for provider, client in provider_clients.items()
-}
-
 
 class ConversationAnalyzer:
     @staticmethod
@@ -105,14 +152,15 @@ class ConversationAnalyzer:
             },
         ]
 
-        response = client_openai.create(
-            model="gpt-4o",
-            messages=messages,
-            tools=[],
-            tool_choice="none",
-            max_tokens=1000,
-            temperature=0,
-        )
+        with tracer.span("llm analysis", "llm", provider="openai"):
+            response = get_client("openai").create(
+                model="gpt-4o",
+                messages=messages,
+                tools=[],
+                tool_choice="none",
+                max_tokens=1000,
+                temperature=0,
+            )
 
         response_content = response.choices[0].message.content
         print("Conversation analysis:", response_content)
@@ -209,8 +257,11 @@ def get_character_by_name(name):
     character_names = list(load_characters_data().keys())
     normalized_character_names = [normalize_name(c_name) for c_name in character_names]
 
-    # Find the closest match to the normalized name
-    closest_match, _ = process.extractOne(normalized_name, normalized_character_names)
+    # Find the closest match to the normalized name (names from the character file match exactly)
+    if normalized_name in normalized_character_names:
+        closest_match = normalized_name
+    else:
+        closest_match, _ = _extract_one(normalized_name, normalized_character_names)
 
     # Map back to the original names
     original_name = character_names[normalized_character_names.index(closest_match)]
@@ -326,8 +377,9 @@ def update_mindset_parameters(character, conversation_analysis, state_tracker):
         "max_tokens": 500,
     }
 
-    llm_handler = llm_handlers[UPDATE_MINDSET_PARAMETERS_PROVIDER]
-    response = llm_handler.create_tool_call(tools_builder.build(), context)
+    llm_handler = get_llm_handler(UPDATE_MINDSET_PARAMETERS_PROVIDER)
+    with tracer.span("llm mindset", "llm", provider=UPDATE_MINDSET_PARAMETERS_PROVIDER):
+        response = llm_handler.create_tool_call(tools_builder.build(), context)
 
     try:
         result = (
@@ -427,8 +479,9 @@ def update_state_tracker(character, conversation_analysis, state_tracker):
         "max_tokens": 500,
     }
 
-    llm_handler = llm_handlers[UPDATE_STATE_TRACKER_PROVIDER]
-    response = llm_handler.create_tool_call(tools_builder.build(), context)
+    llm_handler = get_llm_handler(UPDATE_STATE_TRACKER_PROVIDER)
+    with tracer.span("llm state", "llm", provider=UPDATE_STATE_TRACKER_PROVIDER):
+        response = llm_handler.create_tool_call(tools_builder.build(), context)
 
     try:
         result = (
@@ -439,7 +492,7 @@ def update_state_tracker(character, conversation_analysis, state_tracker):
         character_states = result["character_states"]
 
         for character_state in character_states:
-            matched_name, _ = process.extractOne(
+            matched_name, _ = _extract_one(
                 normalize_name(character_state["character_id"]),
                 normalized_character_names,
             )
@@ -526,8 +579,9 @@ def track_events(conversation_analysis, event_tracker):
         "max_tokens": 500,
     }
 
-    llm_handler = llm_handlers[TRACK_EVENTS_PROVIDER]
-    response = llm_handler.create_tool_call(tools_builder.build(), context)
+    llm_handler = get_llm_handler(TRACK_EVENTS_PROVIDER)
+    with tracer.span("llm events", "llm", provider=TRACK_EVENTS_PROVIDER):
+        response = llm_handler.create_tool_call(tools_builder.build(), context)
 
     try:
         result = (
@@ -652,104 +706,107 @@ def generate_response_helper(
     temperature = 0
 
     response_content = ""
-    if RESPONSE_PROVIDER == "openai":
-        response = client_openai.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": dynamic_mindset}]
-            + formatted_messages,
-            tools=[],
-            tool_choice="none",
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
-        response_content = response.choices[0].message.content
-        # Log the interaction
-        log_llm_interaction(
-            "openai",
-            "chat.completions.create",
-            {
-                "messages": [{"role": "system", "content": dynamic_mindset}]
-                + formatted_messages
-            },
-            response_content,
-        )
-    elif RESPONSE_PROVIDER == "anthropic":
-        response = client_anthropic.create(
-            model="claude-3-opus-20240229",
-            messages=[{"role": "system", "content": dynamic_mindset}]
-            + formatted_messages,
-            tools=[],
-            tool_choice="none",
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
-        response_content = response.content[0].text
-        # Log the interaction
-        log_llm_interaction(
-            "anthropic",
-            "messages.create",
-            {
-                "messages": [{"role": "system", "content": dynamic_mindset}]
-                + formatted_messages
-            },
-            response_content,
-        )
-    elif RESPONSE_PROVIDER == "ollama":
-        response = requests.post(
-            OLLAMA_LLAMA3_API_URL + "/api/chat",
-            json={
-                "model": "llama3",
-                "messages": [{"role": "system", "content": dynamic_mindset}]
+    with tracer.span("llm response", "llm", provider=RESPONSE_PROVIDER):
+        if RESPONSE_PROVIDER == "openai":
+            response = get_client("openai").create(
+                model="gpt-4o",
+                messages=[{"role": "system", "content": dynamic_mindset}]
                 + formatted_messages,
-                "options": {"num_predict": max_tokens, "temperature": temperature},
-                "stream": False,
-            },
-        ).json()
-        response_content = response["message"]["content"]
-        # Log the interaction
-        log_llm_interaction(
-            "ollama",
-            "/api/chat",
-            {
-                "model": "llama3",
-                "messages": [{"role": "system", "content": dynamic_mindset}]
+                tools=[],
+                tool_choice="none",
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            response_content = response.choices[0].message.content
+            # Log the interaction
+            log_llm_interaction(
+                "openai",
+                "chat.completions.create",
+                {
+                    "messages": [{"role": "system", "content": dynamic_mindset}]
+                    + formatted_messages
+                },
+                response_content,
+            )
+        elif RESPONSE_PROVIDER == "anthropic":
+            response = get_client("anthropic").create(
+                model="claude-3-opus-20240229",
+                messages=[{"role": "system", "content": dynamic_mindset}]
                 + formatted_messages,
-                "options": {"num_predict": max_tokens, "temperature": temperature},
-            },
-            response_content,
-        )
-    elif RESPONSE_PROVIDER == "nvidia":
-        # Formatting system and each message according to NVIDIA's required format
-        formatted_messages_nvidia = [
-            {
-                "role": "system",
-                "content": f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>{dynamic_mindset}<|eot_id|>",
-            }
-        ]
-        for msg in formatted_messages:
-            formatted_messages_nvidia.append(
+                tools=[],
+                tool_choice="none",
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            response_content = response.content[0].text
+            # Log the interaction
+            log_llm_interaction(
+                "anthropic",
+                "messages.create",
                 {
-                    "role": msg["role"],
-                    "content": f"<|start_header_id|>{msg['role']}<|end_header_id|>{msg['content']}<|eot_id|>",
+                    "messages": [{"role": "system", "content": dynamic_mindset}]
+                    + formatted_messages
+                },
+                response_content,
+            )
+        elif RESPONSE_PROVIDER == "ollama":
+            import requests
+
+            response = requests.post(
+                OLLAMA_LLAMA3_API_URL + "/api/chat",
+                json={
+                    "model": "llama3",
+                    "messages": [{"role": "system", "content": dynamic_mindset}]
+                    + formatted_messages,
+                    "options": {"num_predict": max_tokens, "temperature": temperature},
+                    "stream": False,
+                },
+            ).json()
+            response_content = response["message"]["content"]
+            # Log the interaction
+            log_llm_interaction(
+                "ollama",
+                "/api/chat",
+                {
+                    "model": "llama3",
+                    "messages": [{"role": "system", "content": dynamic_mindset}]
+                    + formatted_messages,
+                    "options": {"num_predict": max_tokens, "temperature": temperature},
+                },
+                response_content,
+            )
+        elif RESPONSE_PROVIDER == "nvidia":
+            # Formatting system and each message according to NVIDIA's required format
+            formatted_messages_nvidia = [
+                {
+                    "role": "system",
+                    "content": f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>{dynamic_mindset}<|eot_id|>",
                 }
+            ]
+            for msg in formatted_messages:
+                formatted_messages_nvidia.append(
+                    {
+                        "role": msg["role"],
+                        "content": f"<|start_header_id|>{msg['role']}<|end_header_id|>{msg['content']}<|eot_id|>",
+                    }
+                )
+
+            response = get_client("nvidia").create(
+                model="meta/llama3-70b-instruct",
+                messages=formatted_messages_nvidia,
+                tools=[],
+                tool_choice="none",
+                max_tokens=max_tokens,
+                temperature=0.5,
+            )
+            response_content = response.choices[0].message.content
+            # Log the interaction
+            log_llm_interaction(
+                "nvidia",
+                "chat.completions.create",
+                {"messages": formatted_messages_nvidia},
+                response_content,
             )
-
-        response = client_nvidia.create(
-            model="meta/llama3-70b-instruct",
-            messages=formatted_messages_nvidia,
-            tools=[],
-            tool_choice="none",
-            max_tokens=max_tokens,
-            temperature=0.5,
-        )
-        response_content = response.choices[0].message.content
-        # Log the interaction
-        log_llm_interaction(
-            "nvidia",
-            "chat.completions.create",
-            {"messages": formatted_messages_nvidia},
-            response_content,
-        )
 
     return response_content
 
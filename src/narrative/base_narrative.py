@@ -10,6 +10,7 @@ from src.handlers.openai_handler import (
     normalize_name,
     load_characters_data,
     EventTracker,
+    warm_up_clients,
 )
 
 class BaseNarrative(ABC):
@@ -60,6 +61,7 @@ class BaseNarrative(ABC):
                 if option["text"] == selection:
                     if option.get("conversational", False):
                         self.conversational_mode = True
+                        warm_up_clients()
                         self._initiate_conversational_mode(option["target"])
                     else:
                         self.conversational_mode = False
@@ -0,0 +1,139 @@
+import numpy as np
+
+from src.shell.ansi import DEFAULT_STYLE, PALETTE
+
+
+class CellGrid:
+    """
+    CPU side of the GPU glyph-grid text backend: a rows x cols grid of cells,
+    each holding (atlas slot, fg color code, bg color code, 0) as uint16.
+
+    Color codes 0-255 index the ANSI palette, DEFAULT_FG is the terminal text
+    color and DEFAULT_BG is the background (transparent behind text, black when
+    used as a foreground by inverse video). Rows are written as
+    "items" (column, line, highlight spans); a row whose items did not change
+    since the last frame is skipped, and changed rows are reported through
+    take_dirty_rows() so only they are uploaded to the GPU.
+    """
+
+    DEFAULT_FG = 256
+    DEFAULT_BG = 257
+
+    def __init__(self, rows, cols, atlas):
+        """
+        Initializes the CellGrid.
+
+        Args:
+            rows: Number of cell rows.
+            cols: Number of cell columns.
+            atlas: GlyphAtlas used to map characters to slots.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.atlas = atlas
+        self.cells = np.zeros((rows, cols, 4), dtype=np.uint16)
+        self.cells[:, :, 1] = self.DEFAULT_FG
+        self.cells[:, :, 2] = self.DEFAULT_BG
+        self._row_keys = [None] * rows
+        self._touched = set()
+        self._dirty_rows = set(range(rows))
+        self._nearest_color = {}
+
+    def begin_frame(self):
+        """
+        Starts a frame; rows not written before end_frame() are blanked.
+        """
+        self._touched = set()
+
+    def set_row(self, row, items):
+        """
+        Writes one row.
+
+        Args:
+            row: Row index; rows outside the grid are ignored.
+            items: Tuple of (column, line, highlights) where line is a str or a
+                StyledLine and highlights is a tuple of (start, length) spans drawn
+                in inverse video.
+        """
+        if not 0 <= row < self.rows:
+            return
+        self._touched.add(row)
+        key = tuple((col, line, getattr(line, "runs", None), highlights) for col, line, highlights in items)
+        if key == self._row_keys[row]:
+            return
+        self._row_keys[row] = key
+        cells = self.cells[row]
+        cells[:, 0] = 0
+        cells[:, 1] = self.DEFAULT_FG
+        cells[:, 2] = self.DEFAULT_BG
+        for col, line, highlights in items:
+            self._write_line(cells, col, line, highlights)
+        self._dirty_rows.add(row)
+
+    def end_frame(self):
+        """
+        Blanks rows that were not written this frame.
+        """
+        for row in range(self.rows):
+            if row not in self._touched and self._row_keys[row] != ():
+                self.set_row(row, ())
+
+    def take_dirty_rows(self):
+        """
+        Returns the sorted indices of rows changed since the last call.
+        """
+        dirty = sorted(self._dirty_rows)
+        self._dirty_rows = set()
+        return dirty
+
+    def _write_line(self, cells, col, line, highlights):
+        if hasattr(line, "iter_runs"):
+            segments = line.iter_runs()
+        else:
+            segments = ((line, DEFAULT_STYLE),)
+        slot_for = self.atlas.slot_for
+        x = col
+        for text, style in segments:
+            fg, bg = self._style_codes(style)
+            for ch in text:
+                if x >= self.cols:
+                    break
+                if x >= 0:
+                    cells[x, 0] = slot_for(ch)
+                    cells[x, 1] = fg
+                    cells[x, 2] = bg
+                x += 1
+        for start, length in highlights:
+            lo = max(0, col + start)
+            hi = min(self.cols, col + start + length)
+            if lo < hi:
+                cells[lo:hi, 1:3] = cells[lo:hi, 2:0:-1].copy()
+
+    def _style_codes(self, style):
+        """
+        Maps a Style to (fg code, bg code), resolving bold-bright and inverse.
+        """
+        fg = style.fg
+        if style.bold and isinstance(fg, int) and fg < 8:
+            fg += 8
+        fg = self.DEFAULT_FG if fg is None else self._color_code(fg)
+        bg = self.DEFAULT_BG if style.bg is None else self._color_code(style.bg)
+        if style.inverse:
+            fg, bg = bg, fg
+        return fg, bg
+
+    def _color_code(self, color):
+        """
+        Returns the palette index of a color; RGB colors snap to the nearest entry.
+        """
+        if isinstance(color, int):
+            return color % 256
+        code = self._nearest_color.get(color)
+        if code is None:
+            r, g, b = color
+            code = min(
+                range(256),
+                key=lambda i: (PALETTE[i][0] - r) ** 2 + (PALETTE[i][1] - g) ** 2 + (PALETTE[i][2] - b) ** 2,
+            )
+            self._nearest_color[color] = code
+        return code
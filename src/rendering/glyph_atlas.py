@@ -0,0 +1,73 @@
+import pygame
+
+
+class GlyphAtlas:
+    """
+    A fixed grid of pre-rasterized glyphs, one character cell each, used by the
+    GPU glyph-grid text backend.
+
+    Glyphs are rendered white on transparent so the shader can take coverage from
+    the alpha channel and apply any foreground/background color. Printable ASCII
+    and common box/block characters are rasterized up front; anything else is
+    added on first use until the atlas is full, after which "?" is substituted.
+    `version` changes whenever the atlas surface changes, so the GL side knows
+    when to re-upload it.
+    """
+
+    COLUMNS = 32
+    ROWS = 32
+    PRELOAD = "█▀▄▌▐░▒▓■─│┌┐└┘├┤┬┴┼═║╔╗╚╝╠╣╦╩╬"
+
+    def __init__(self, font, cell_width, cell_height):
+        """
+        Initializes the GlyphAtlas.
+
+        Args:
+            font: Font used to rasterize glyphs.
+            cell_width: Width of one character cell in pixels.
+            cell_height: Height of one character cell (the line height) in pixels.
+        """
+        self.font = font
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.surface = pygame.Surface(
+            (self.COLUMNS * cell_width, self.ROWS * cell_height), pygame.SRCALPHA
+        )
+        self.surface.fill((0, 0, 0, 0))
+        self.version = 0
+        self._slots = {}
+        self.slot_for(" ")  # slot 0 is the blank cell
+        for code in range(33, 127):
+            self.slot_for(chr(code))
+        for ch in self.PRELOAD:
+            self.slot_for(ch)
+
+    @property
+    def capacity(self):
+        """Number of glyph slots."""
+        return self.COLUMNS * self.ROWS
+
+    def slot_for(self, ch):
+        """
+        Returns the atlas slot of a character, rasterizing it on first use.
+
+        Args:
+            ch: A single character.
+
+        Returns:
+            int: Slot index (column + row * COLUMNS).
+        """
+        slot = self._slots.get(ch)
+        if slot is not None:
+            return slot
+        if len(self._slots) >= self.capacity or not ch.isprintable():
+            return self._slots.get("?", 0)
+        slot = len(self._slots)
+        self._slots[ch] = slot
+        if ch != " ":
+            glyph = self.font.render(ch, True, (255, 255, 255))
+            x = (slot % self.COLUMNS) * self.cell_width
+            y = (slot // self.COLUMNS) * self.cell_height
+            self.surface.blit(glyph, (x, y), pygame.Rect(0, 0, self.cell_width, self.cell_height))
+        self.version += 1
+        return slot
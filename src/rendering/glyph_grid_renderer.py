@@ -0,0 +1,151 @@
+import OpenGL.GL as gl
+import numpy as np
+import pygame
+
+from src.rendering.renderer import Renderer
+from src.rendering.shader_factory import ShaderFactory
+from src.shell.ansi import PALETTE
+
+
+class GlyphGridRenderer:
+    """
+    GPU text backend: draws a CellGrid with a single instanced draw call into a
+    texture that the CRT pass samples directly (see the CellLayer uniform).
+
+    The cell grid lives in an integer texture on the GPU and only rows reported
+    dirty by the grid are re-uploaded; the glyph atlas is re-uploaded only when
+    new glyphs were rasterized. No pygame surface is exported per frame.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes the GlyphGridRenderer. Requires a current OpenGL context.
+
+        Args:
+            width: Width of the output texture (the screen width).
+            height: Height of the output texture (the screen height).
+        """
+        self.width = width
+        self.height = height
+        self.program = ShaderFactory.create_glyph_grid_shader()
+        self.fbo, self.texture = Renderer.create_fbo(width, height)
+        self.vao = gl.glGenVertexArrays(1)
+        self._cell_texture = gl.glGenTextures(1)
+        self._cell_shape = None
+        self._atlas_texture = gl.glGenTextures(1)
+        self._atlas = None
+        self._atlas_version = -1
+        self._palette_texture = self._create_palette_texture()
+
+    def render(self, grid, origin, color):
+        """
+        Syncs the grid to the GPU and draws it.
+
+        Args:
+            grid: CellGrid to draw.
+            origin: (x, y) pixel position of the grid's top-left cell.
+            color: Default text color as an RGB tuple.
+
+        Returns:
+            int: The texture holding the rendered text layer.
+        """
+        previous_program = gl.glGetIntegerv(gl.GL_CURRENT_PROGRAM)
+        self._sync_atlas(grid.atlas)
+        self._sync_cells(grid)
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glViewport(0, 0, self.width, self.height)
+        gl.glClearColor(0.0, 0.0, 0.0, 0.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        gl.glDisable(gl.GL_BLEND)
+        gl.glUseProgram(self.program)
+        self._set_uniforms(grid, origin, color)
+        gl.glBindVertexArray(self.vao)
+        gl.glDrawArraysInstanced(gl.GL_TRIANGLE_STRIP, 0, 4, grid.rows * grid.cols)
+        gl.glBindVertexArray(0)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        gl.glUseProgram(int(previous_program))
+        return self.texture
+
+    def preload_atlas(self, atlas):
+        """
+        Uploads a glyph atlas ahead of the first render() that uses it.
+
+        Args:
+            atlas: GlyphAtlas to upload.
+        """
+        self._sync_atlas(atlas)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+    def _set_uniforms(self, grid, origin, color):
+        program = self.program
+        atlas = grid.atlas
+        gl.glUniform2i(gl.glGetUniformLocation(program, "GridSize"), grid.cols, grid.rows)
+        gl.glUniform2f(gl.glGetUniformLocation(program, "CellSize"), float(atlas.cell_width), float(atlas.cell_height))
+        gl.glUniform2f(gl.glGetUniformLocation(program, "Origin"), float(origin[0]), float(origin[1]))
+        gl.glUniform2f(gl.glGetUniformLocation(program, "Resolution"), float(self.width), float(self.height))
+        gl.glUniform1i(gl.glGetUniformLocation(program, "AtlasColumns"), atlas.COLUMNS)
+        gl.glUniform2f(gl.glGetUniformLocation(program, "AtlasCellUV"), 1.0 / atlas.COLUMNS, 1.0 / atlas.ROWS)
+        gl.glUniform4f(gl.glGetUniformLocation(program, "DefaultColor"),
+                       color[0] / 255.0, color[1] / 255.0, color[2] / 255.0, 1.0)
+        for unit, name, texture in (
+            (0, "Cells", self._cell_texture),
+            (1, "Atlas", self._atlas_texture),
+            (2, "Palette", self._palette_texture),
+        ):
+            gl.glActiveTexture(gl.GL_TEXTURE0 + unit)
+            gl.glBindTexture(gl.GL_TEXTURE_2D, texture)
+            gl.glUniform1i(gl.glGetUniformLocation(program, name), unit)
+
+    def _sync_cells(self, grid):
+        """
+        Uploads the dirty rows of the grid, or the whole grid when its size changed.
+        """
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._cell_texture)
+        dirty = grid.take_dirty_rows()
+        if self._cell_shape != (grid.rows, grid.cols):
+            self._cell_shape = (grid.rows, grid.cols)
+            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+            gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA16UI, grid.cols, grid.rows, 0,
+                            gl.GL_RGBA_INTEGER, gl.GL_UNSIGNED_SHORT, grid.cells)
+            return
+        # Upload contiguous runs of dirty rows, one call per run.
+        start = prev = None
+        for row in dirty + [None]:
+            if start is not None and row != prev + 1:
+                gl.glTexSubImage2D(gl.GL_TEXTURE_2D, 0, 0, start, grid.cols, prev - start + 1,
+                                   gl.GL_RGBA_INTEGER, gl.GL_UNSIGNED_SHORT,
+                                   np.ascontiguousarray(grid.cells[start:prev + 1]))
+                start = None
+            if start is None:
+                start = row
+            prev = row
+
+    def _sync_atlas(self, atlas):
+        """
+        Uploads the glyph atlas when it is new or has gained glyphs.
+        """
+        if atlas is self._atlas and atlas.version == self._atlas_version:
+            return
+        self._atlas = atlas
+        self._atlas_version = atlas.version
+        w, h = atlas.surface.get_size()
+        data = pygame.image.tostring(atlas.surface, "RGBA", False)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._atlas_texture)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, w, h, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, data)
+
+    @staticmethod
+    def _create_palette_texture():
+        data = np.array([rgb + (255,) for rgb in PALETTE], dtype=np.uint8)
+        texture = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, len(PALETTE), 1, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, data)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        return texture
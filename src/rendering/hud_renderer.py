@@ -0,0 +1,70 @@
+import OpenGL.GL as gl
+import pygame
+
+from src.rendering.shader_factory import ShaderFactory
+
+
+class HudRenderer:
+    """
+    Draws a pygame surface (the profiler HUD) on top of the finished frame,
+    after the CRT pass, so it is neither curved nor bloomed and costs one small
+    textured quad. The surface is uploaded only when a new one is set.
+    """
+
+    def __init__(self, width, height):
+        """
+        Initializes the HudRenderer. Requires a current OpenGL context.
+
+        Args:
+            width: Width of the screen in pixels.
+            height: Height of the screen in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.program = ShaderFactory.create_hud_shader()
+        self.vao = gl.glGenVertexArrays(1)
+        self._texture = gl.glGenTextures(1)
+        self._size = None
+
+    def set_surface(self, surface):
+        """
+        Uploads the surface to draw from now on.
+
+        Args:
+            surface: SRCALPHA pygame surface.
+        """
+        w, h = surface.get_size()
+        data = pygame.image.tostring(surface, "RGBA", False)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._texture)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, w, h, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, data)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        self._size = (w, h)
+
+    def render(self, x, y):
+        """
+        Draws the last uploaded surface to the default framebuffer.
+
+        Args:
+            x: Left edge in screen pixels.
+            y: Top edge in screen pixels.
+        """
+        if self._size is None:
+            return
+        previous_program = gl.glGetIntegerv(gl.GL_CURRENT_PROGRAM)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        gl.glViewport(0, 0, self.width, self.height)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glUseProgram(self.program)
+        gl.glUniform4f(gl.glGetUniformLocation(self.program, "Rect"), float(x), float(y), *map(float, self._size))
+        gl.glUniform2f(gl.glGetUniformLocation(self.program, "Resolution"), float(self.width), float(self.height))
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._texture)
+        gl.glUniform1i(gl.glGetUniformLocation(self.program, "Hud"), 0)
+        gl.glBindVertexArray(self.vao)
+        gl.glDrawArrays(gl.GL_TRIANGLE_STRIP, 0, 4)
+        gl.glBindVertexArray(0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glUseProgram(int(previous_program))
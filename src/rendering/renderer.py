@@ -22,13 +22,33 @@ class Renderer:
         gl.glUniform1f(gl.glGetUniformLocation(shader_program, "CurveIntensity"), settings.curve_intensity)
 
     @staticmethod
-    def render_texture(shader_program, time, width, height, overlay_texture_id, crt_settings=None):
+    def _apply_reveal_mask(shader_program, reveal_mask):
+        location = gl.glGetUniformLocation(shader_program, "RevealMask")
+        if reveal_mask is None:
+            gl.glUniform4f(location, 0.0, 0.0, 0.0, 0.0)
+        else:
+            x, top, bottom = reveal_mask
+            gl.glUniform4f(location, float(x), float(top), float(bottom), 1.0)
+
+    @staticmethod
+    def _apply_cell_layer(shader_program, cell_texture_id):
+        gl.glActiveTexture(gl.GL_TEXTURE1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, cell_texture_id or 0)
+        gl.glUniform1i(gl.glGetUniformLocation(shader_program, "CellLayer"), 1)
+        gl.glUniform1f(gl.glGetUniformLocation(shader_program, "UseCellLayer"), 1.0 if cell_texture_id else 0.0)
+
+    @staticmethod
+    def render_texture(shader_program, time, width, height, overlay_texture_id, crt_settings=None, reveal_mask=None,
+                       cell_texture_id=None):
         # Single pass: bloom samples the same texture (textureSampler) so glow is aligned, no ghosting
         gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
         gl.glViewport(0, 0, width, height)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
         gl.glUseProgram(shader_program)
         Renderer._apply_crt_settings(shader_program, crt_settings)
+        Renderer._apply_reveal_mask(shader_program, reveal_mask)
+        Renderer._apply_cell_layer(shader_program, cell_texture_id)
+        gl.glUniform2f(gl.glGetUniformLocation(shader_program, "Resolution"), float(width), float(height))
         gl.glActiveTexture(gl.GL_TEXTURE0)
         gl.glBindTexture(gl.GL_TEXTURE_2D, overlay_texture_id)
         gl.glUniform1i(gl.glGetUniformLocation(shader_program, "textureSampler"), 0)
@@ -0,0 +1,109 @@
+import pygame
+
+
+class ScrollStrip:
+    """
+    A pre-rendered strip of text rows, somewhat taller than the viewport, used for
+    smooth pixel scrolling.
+
+    Scrolling only changes the source offset into the strip. When the viewport
+    moves past the strip, its contents are shifted in place with Surface.scroll and
+    only the rows newly exposed at the leading edge are rendered. Each slot also
+    remembers the key of the row drawn into it, so rows whose content changed are
+    redrawn and everything else is reused.
+    """
+
+    def __init__(self, line_height, overscan_rows=4):
+        """
+        Initializes the ScrollStrip.
+
+        Args:
+            line_height: Height of each row in pixels.
+            overscan_rows: Extra rows kept rendered above and below the viewport.
+        """
+        self.line_height = line_height
+        self.overscan_rows = overscan_rows
+        self.surface = None
+        self.first_row = 0   # row index held in slot 0
+        self._slot_keys = []  # key of the row drawn in each slot, None = empty
+
+    def invalidate(self):
+        """
+        Forgets every rendered row (e.g. after a font or color change).
+        """
+        self._slot_keys = [None] * len(self._slot_keys)
+
+    def render(self, target, x, y, view_width, view_height, offset_px, row_count, row_key, draw_row):
+        """
+        Draws the rows visible at a pixel offset onto a target surface.
+
+        Args:
+            target: Surface to draw on.
+            x: Left edge of the viewport on the target.
+            y: Top edge of the viewport on the target.
+            view_width: Width of the viewport in pixels.
+            view_height: Height of the viewport in pixels.
+            offset_px: Content offset (pixels from the top of row 0) shown at y.
+                May be negative to leave space above row 0.
+            row_count: Number of rows that exist.
+            row_key: Callable(row) returning a value that changes whenever the row's
+                appearance changes.
+            draw_row: Callable(surface, row, y) that draws a row at y on the strip.
+        """
+        if offset_px < 0:
+            y -= offset_px
+            view_height += offset_px
+            offset_px = 0
+        if view_height <= 0 or view_width <= 0:
+            return
+        lh = self.line_height
+        self._ensure_surface(view_width, view_height)
+        top_row = int(offset_px // lh)
+        bottom_row = min(row_count, int((offset_px + view_height + lh - 1) // lh))
+        if top_row >= bottom_row:
+            return
+        capacity = len(self._slot_keys)
+        if top_row < self.first_row or bottom_row > self.first_row + capacity:
+            self._move_to(max(0, top_row - self.overscan_rows))
+
+        for row in range(top_row, bottom_row):
+            slot = row - self.first_row
+            key = row_key(row)
+            if self._slot_keys[slot] != key:
+                row_y = slot * lh
+                self.surface.fill((0, 0, 0, 0), (0, row_y, self.surface.get_width(), lh))
+                draw_row(self.surface, row, row_y)
+                self._slot_keys[slot] = key
+
+        src_y = int(offset_px) - self.first_row * lh
+        area = pygame.Rect(0, src_y, view_width, min(view_height, self.surface.get_height() - src_y))
+        target.blit(self.surface.subsurface(area), (x, y))
+
+    def _ensure_surface(self, view_width, view_height):
+        """
+        (Re)creates the strip when the viewport size changes.
+        """
+        rows = -(-view_height // self.line_height) + 1 + 2 * self.overscan_rows
+        size = (view_width, rows * self.line_height)
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 0))
+            self._slot_keys = [None] * rows
+
+    def _move_to(self, first_row):
+        """
+        Re-anchors the strip so slot 0 holds `first_row`, shifting already rendered
+        rows in place so only the leading edge has to be redrawn.
+        """
+        shift = first_row - self.first_row
+        capacity = len(self._slot_keys)
+        self.first_row = first_row
+        if abs(shift) >= capacity:
+            self.surface.fill((0, 0, 0, 0))
+            self._slot_keys = [None] * capacity
+            return
+        self.surface.scroll(0, -shift * self.line_height)
+        if shift > 0:
+            self._slot_keys = self._slot_keys[shift:] + [None] * shift
+        else:
+            self._slot_keys = [None] * -shift + self._slot_keys[:capacity + shift]
@@ -0,0 +1,259 @@
+import time
+from array import array
+from bisect import bisect_left
+
+
+class ScrollbackIndex:
+    """
+    Case-insensitive substring index over scrollback rows, maintained on append.
+
+    Every row is broken into trigrams and each trigram keeps a postings list of the
+    row ids containing it. A query takes the postings of its rarest trigram and
+    verifies the candidates with a plain substring test, so lookups cost
+    O(candidates) instead of O(scrollback). Row ids are absolute and only ever
+    grow, which lets the owner drop old rows from the front or the last rows from
+    the back without renumbering.
+
+    Appending only stores the row; postings are built in small time slices by
+    index_pending() (called once per frame), and search() scans the few rows not
+    indexed yet directly, so a burst of output never stalls a frame. Rows paged
+    back in before the oldest one (prepend) get lower ids and are scanned
+    directly too.
+    """
+
+    def __init__(self):
+        self._rows = []        # lowercased row text, self._rows[i] has id self._base + i
+        self._base = 0         # id of self._rows[0]
+        self._postings = {}    # trigram -> array of ascending row ids
+        self._indexed_upto = 0  # rows with an id below this are in the postings
+        self._head_end = 0  # rows with an id below this were prepended and are not in the postings
+        self._stale = 0  # indexed rows discarded since their ids were last pruned from the postings
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def first_id(self):
+        """Id of the oldest row still held."""
+        return self._base
+
+    @property
+    def next_id(self):
+        """Id the next appended row will get."""
+        return self._base + len(self._rows)
+
+    def clear(self):
+        """
+        Drops every row. Ids keep increasing so stale references never alias new rows.
+        """
+        self._base = self.next_id
+        self._rows = []
+        self._postings = {}
+        self._indexed_upto = self._base
+        self._head_end = self._base
+        self._stale = 0
+
+    def append(self, text):
+        """
+        Adds one row; it becomes searchable immediately and is indexed lazily.
+
+        Args:
+            text: Row text.
+
+        Returns:
+            int: The id assigned to the row.
+        """
+        self._rows.append(text.lower())
+        return self.next_id - 1
+
+    def extend(self, texts):
+        """
+        Adds several rows.
+
+        Args:
+            texts: Iterable of row texts.
+        """
+        self._rows.extend(text.lower() for text in texts)
+
+    def prepend(self, texts):
+        """
+        Adds rows before the oldest one (older scrollback paged back in). Their ids
+        continue downward from first_id; search() scans them without postings.
+
+        Args:
+            texts: Row texts, oldest first.
+        """
+        lowered = [text.lower() for text in texts]
+        if not lowered:
+            return
+        self._head_end = max(self._head_end, self._base)
+        self._rows[:0] = lowered
+        self._base -= len(lowered)
+
+    @property
+    def pending(self):
+        """Number of rows not yet in the postings."""
+        return self.next_id - self._indexed_upto
+
+    def index_pending(self, budget_sec=None):
+        """
+        Builds postings for rows appended since the last call.
+
+        Args:
+            budget_sec: Optional time budget; indexing stops once it is used up and
+                resumes on the next call.
+
+        Returns:
+            int: Number of rows indexed.
+        """
+        start_id = self._indexed_upto
+        end_id = self.next_id
+        if start_id >= end_id:
+            return 0
+        deadline = None if budget_sec is None else time.perf_counter() + budget_sec
+        postings = self._postings
+        rows = self._rows
+        base = self._base
+        row_id = start_id
+        while row_id < end_id:
+            for trigram in self._trigrams(rows[row_id - base]):
+                ids = postings.get(trigram)
+                if ids is None:
+                    ids = postings[trigram] = array("l")
+                ids.append(row_id)
+            row_id += 1
+            if deadline is not None and (row_id - start_id) % 8 == 0 and time.perf_counter() >= deadline:
+                break
+        self._indexed_upto = row_id
+        return row_id - start_id
+
+    def truncate(self, count):
+        """
+        Removes the last `count` rows (e.g. when the last logical line is re-wrapped).
+
+        Args:
+            count: Number of rows to remove from the end.
+        """
+        count = min(count, len(self._rows))
+        if count <= 0:
+            return
+        cutoff = self.next_id - count
+        indexed_removed = max(0, self._indexed_upto - cutoff)
+        removed = self._rows[len(self._rows) - indexed_removed:] if indexed_removed else []
+        del self._rows[-count:]
+        self._indexed_upto = min(self._indexed_upto, cutoff)
+        postings = self._postings
+        for lowered in removed:
+            for trigram in self._trigrams(lowered):
+                ids = postings.get(trigram)
+                if ids is None:
+                    continue
+                while ids and ids[-1] >= cutoff:
+                    ids.pop()
+                if not ids:
+                    del postings[trigram]
+
+    def discard_before(self, row_id):
+        """
+        Forgets rows with an id lower than `row_id` (scrollback trimmed from the front).
+        Postings are filtered lazily at query time; once more discarded rows than
+        held rows are still in them, their ids are pruned, so the postings stay
+        proportional to the rows held however often the front is trimmed.
+
+        Args:
+            row_id: First id to keep.
+        """
+        drop = min(max(0, row_id - self._base), len(self._rows))
+        if drop <= 0:
+            return
+        old_base = self._base
+        del self._rows[:drop]
+        self._base += drop
+        self._stale += max(0, min(self._indexed_upto, self._base) - max(old_base, self._head_end))
+        self._indexed_upto = max(self._indexed_upto, self._base)
+        if self._stale > len(self._rows):
+            self._prune_postings()
+
+    def get_row(self, row_id):
+        """
+        Returns the lowercased text of a row, or None if it is not indexed.
+        """
+        i = row_id - self._base
+        if 0 <= i < len(self._rows):
+            return self._rows[i]
+        return None
+
+    def search(self, query):
+        """
+        Finds the rows containing `query` (case-insensitive).
+
+        Args:
+            query: Substring to look for.
+
+        Returns:
+            list: Ascending ids of matching rows.
+        """
+        needle = query.lower()
+        if not needle:
+            return []
+        rows = self._rows
+        base = self._base
+        if len(needle) < 3:
+            return [base + i for i, row in enumerate(rows) if needle in row]
+        # Prepended rows are checked directly; postings may hold stale ids in their range.
+        head_end = self._head_end - base
+        hits = [base + i for i in range(max(0, head_end)) if needle in rows[i]]
+        candidates = None
+        for trigram in self._trigrams(needle):
+            ids = self._postings.get(trigram)
+            if ids is None:
+                candidates = ()
+                break
+            if candidates is None or len(ids) < len(candidates):
+                candidates = ids
+        for row_id in candidates:
+            i = row_id - base
+            if i >= 0 and i >= head_end and needle in rows[i]:
+                hits.append(row_id)
+        # Rows appended since the last index_pending() are checked directly.
+        tail_start = self._indexed_upto - base
+        hits.extend(base + i for i in range(tail_start, len(rows)) if needle in rows[i])
+        return hits
+
+    def find_in_row(self, row_id, query):
+        """
+        Returns the start columns of every occurrence of `query` in a row.
+        """
+        row = self.get_row(row_id)
+        needle = query.lower()
+        if row is None or not needle:
+            return []
+        columns = []
+        start = row.find(needle)
+        while start != -1:
+            columns.append(start)
+            start = row.find(needle, start + len(needle))
+        return columns
+
+    def posting_count(self):
+        """Total number of row ids held in the postings (stale ones included)."""
+        return sum(len(ids) for ids in self._postings.values())
+
+    def _prune_postings(self):
+        """
+        Drops ids of discarded rows from the postings. Lists are ascending, so
+        each loses a prefix; no row is re-indexed.
+        """
+        base = self._base
+        postings = self._postings
+        for trigram, ids in list(postings.items()):
+            cut = bisect_left(ids, base)
+            if cut == len(ids):
+                del postings[trigram]
+            elif cut:
+                del ids[:cut]
+        self._stale = 0
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
@@ -41,6 +41,9 @@ class ShaderFactory:
         uniform float ScanlineFactor;
         uniform float GrainIntensity;
         uniform float CurveIntensity;
+        uniform vec4 RevealMask;  // x, top, bottom in overlay pixels; w > 0.5 = enabled
+        uniform sampler2D CellLayer;  // glyph-grid text, rendered by GlyphGridRenderer
+        uniform float UseCellLayer;
 
         #define ENABLE_CURVE 1
         #define ENABLE_OVERSCAN 0
@@ -67,6 +70,24 @@ class ShaderFactory:
 
         #define clamp01(value) clamp(value, 0.0, 1.0)
 
+        // Typewriter reveal: cells right of RevealMask.x on the typing row are not shown yet.
+        // Applied on every sample so bloom/blur never leak light from unrevealed glyphs.
+        // The glyph-grid text layer is merged here as well, so every effect sees it.
+        vec4 sampleScreen(vec2 uv) {
+            vec4 color = texture(textureSampler, uv);
+            if (UseCellLayer > 0.5) {
+                vec4 cells = texture(CellLayer, uv);
+                color = vec4(max(color.rgb, cells.rgb), max(color.a, cells.a));
+            }
+            if (RevealMask.w > 0.5) {
+                vec2 px = vec2(uv.x, 1.0 - uv.y) * Resolution;
+                if (px.x >= RevealMask.x && px.y >= RevealMask.y && px.y < RevealMask.z) {
+                    color = vec4(0.0, 0.0, 0.0, 1.0);
+                }
+            }
+            return color;
+        }
+
         #if ENABLE_BACKLIGHT
         vec3 backlight(vec3 color, vec2 uv) {
             float backlight = max(0.0, dot(normalize(vec3(uv - 0.5, 0.5)), vec3(0.0, 0.0, 1.0)));
@@ -106,11 +127,11 @@ class ShaderFactory:
         #if ENABLE_BLOOM
         vec3 bloom(vec3 color, vec2 uv) {
             vec3 bloom = vec3(0.0);
-            vec2 texelSize = 1.0 / vec2(textureSize(textureSampler, 0));
+            vec2 texelSize = 1.0 / Resolution;
             for (int i = -4; i <= 4; i++) {
                 for (int j = -4; j <= 4; j++) {
                     vec2 offset = vec2(float(i), float(j)) * texelSize * BLOOM_KERNEL_SCALE;
-                    bloom += texture(textureSampler, uv + offset).rgb;
+                    bloom += sampleScreen(uv + offset).rgb;
                 }
             }
             bloom /= 81.0;
@@ -123,16 +144,16 @@ class ShaderFactory:
         float blurWeights[9] = float[](0.0, 0.092, 0.081, 0.071, 0.061, 0.051, 0.041, 0.031, 0.021);
 
         vec3 blurH(vec3 c, vec2 uv) {
-            vec3 screen = texture(textureSampler, uv).rgb * 0.102;
-            for (int i = 1; i < 9; i++) screen += texture(textureSampler, uv + vec2(float(i) * BlurOffset, 0.0)).rgb * blurWeights[i];
-            for (int i = 1; i < 9; i++) screen += texture(textureSampler, uv + vec2(float(-i) * BlurOffset, 0.0)).rgb * blurWeights[i];
+            vec3 screen = sampleScreen(uv).rgb * 0.102;
+            for (int i = 1; i < 9; i++) screen += sampleScreen(uv + vec2(float(i) * BlurOffset, 0.0)).rgb * blurWeights[i];
+            for (int i = 1; i < 9; i++) screen += sampleScreen(uv + vec2(float(-i) * BlurOffset, 0.0)).rgb * blurWeights[i];
             return screen * BLUR_MULTIPLIER;
         }
 
         vec3 blurV(vec3 c, vec2 uv) {
-            vec3 screen = texture(textureSampler, uv).rgb * 0.102;
-            for (int i = 1; i < 9; i++) screen += texture(textureSampler, uv + vec2(0.0, float(i) * BlurOffset)).rgb * blurWeights[i];
-            for (int i = 1; i < 9; i++) screen += texture(textureSampler, uv + vec2(0.0, float(-i) * BlurOffset)).rgb * blurWeights[i];
+            vec3 screen = sampleScreen(uv).rgb * 0.102;
+            for (int i = 1; i < 9; i++) screen += sampleScreen(uv + vec2(0.0, float(i) * BlurOffset)).rgb * blurWeights[i];
+            for (int i = 1; i < 9; i++) screen += sampleScreen(uv + vec2(0.0, float(-i) * BlurOffset)).rgb * blurWeights[i];
             return screen * BLUR_MULTIPLIER;
         }
 
@@ -302,7 +323,7 @@ class ShaderFactory:
             }
             #endif
 
-            vec4 color = texture(textureSampler, uv_sample);
+            vec4 color = sampleScreen(uv_sample);
             // Transparent overlay pixels -> opaque black so text shows on solid background
             if (color.a < 0.5) {
                 color = vec4(0.0, 0.0, 0.0, 1.0);
@@ -385,6 +406,99 @@ class ShaderFactory:
         gl.glUniform1f(gl.glGetUniformLocation(shader_program, "ScanlineFactor"), 0.3)
         gl.glUniform1f(gl.glGetUniformLocation(shader_program, "GrainIntensity"), 0.02)
         gl.glUniform1f(gl.glGetUniformLocation(shader_program, "CurveIntensity"), 0.3)
+        gl.glUniform4f(gl.glGetUniformLocation(shader_program, "RevealMask"), 0.0, 0.0, 0.0, 0.0)
+        gl.glUniform1f(gl.glGetUniformLocation(shader_program, "UseCellLayer"), 0.0)
 
         return shader_program
 
+    @staticmethod
+    def create_glyph_grid_shader():
+        # One instance per cell: the quad corner comes from gl_VertexID, the cell from
+        # gl_InstanceID, so no vertex buffers are needed.
+        vertex_shader = """
+        #version 460 core
+        uniform usampler2D Cells;     // per cell: atlas slot, fg code, bg code, unused
+        uniform ivec2 GridSize;       // columns, rows
+        uniform vec2 CellSize;        // pixels
+        uniform vec2 Origin;          // top-left of the grid in pixels
+        uniform vec2 Resolution;
+        uniform int AtlasColumns;
+        uniform vec2 AtlasCellUV;     // size of one atlas cell in texture coordinates
+        flat out uvec4 cell;
+        out vec2 glyphUV;
+
+        void main() {
+            int col = gl_InstanceID % GridSize.x;
+            int row = gl_InstanceID / GridSize.x;
+            vec2 corner = vec2(float(gl_VertexID & 1), float(gl_VertexID >> 1));
+            cell = texelFetch(Cells, ivec2(col, row), 0);
+            vec2 px = Origin + (vec2(col, row) + corner) * CellSize;
+            gl_Position = vec4(px.x / Resolution.x * 2.0 - 1.0, 1.0 - px.y / Resolution.y * 2.0, 0.0, 1.0);
+            vec2 slot = vec2(float(int(cell.x) % AtlasColumns), float(int(cell.x) / AtlasColumns));
+            glyphUV = (slot + corner) * AtlasCellUV;
+        }
+        """
+
+        fragment_shader = """
+        #version 460 core
+        flat in uvec4 cell;
+        in vec2 glyphUV;
+        out vec4 fragColor;
+        uniform sampler2D Atlas;      // white glyphs, coverage in alpha
+        uniform sampler2D Palette;    // 256 x 1 ANSI palette
+        uniform vec4 DefaultColor;    // terminal text color (code 256); code 257 is the background
+
+        vec4 cellColor(uint code) {
+            if (code == 256u) {
+                return DefaultColor;
+            }
+            if (code > 256u) {
+                return vec4(0.0);
+            }
+            return texelFetch(Palette, ivec2(int(code), 0), 0);
+        }
+
+        void main() {
+            float coverage = texture(Atlas, glyphUV).a;
+            vec4 fg = cellColor(cell.y);
+            vec4 bg = cellColor(cell.z);
+            fragColor = vec4(mix(bg.rgb, fg.rgb, coverage), max(bg.a, coverage));
+        }
+        """
+
+        vertex_shader_compiled = shaders.compileShader(vertex_shader, gl.GL_VERTEX_SHADER)
+        fragment_shader_compiled = shaders.compileShader(fragment_shader, gl.GL_FRAGMENT_SHADER)
+        return shaders.compileProgram(vertex_shader_compiled, fragment_shader_compiled)
+
+    @staticmethod
+    def create_hud_shader():
+        # A pixel-aligned textured quad drawn over the finished frame; the corner
+        # comes from gl_VertexID, so no vertex buffers are needed.
+        vertex_shader = """
+        #version 460 core
+        uniform vec4 Rect;            // x, y, width, height in pixels from the top-left
+        uniform vec2 Resolution;
+        out vec2 hudUV;
+
+        void main() {
+            vec2 corner = vec2(float(gl_VertexID & 1), float(gl_VertexID >> 1));
+            vec2 px = Rect.xy + corner * Rect.zw;
+            gl_Position = vec4(px.x / Resolution.x * 2.0 - 1.0, 1.0 - px.y / Resolution.y * 2.0, 0.0, 1.0);
+            hudUV = corner;
+        }
+        """
+
+        fragment_shader = """
+        #version 460 core
+        in vec2 hudUV;
+        out vec4 fragColor;
+        uniform sampler2D Hud;
+
+        void main() {
+            fragColor = texture(Hud, hudUV);
+        }
+        """
+
+        vertex_shader_compiled = shaders.compileShader(vertex_shader, gl.GL_VERTEX_SHADER)
+        fragment_shader_compiled = shaders.compileShader(fragment_shader, gl.GL_FRAGMENT_SHADER)
+        return shaders.compileProgram(vertex_shader_compiled, fragment_shader_compiled)
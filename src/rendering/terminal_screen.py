@@ -1,8 +1,12 @@
+from src.app.timeline import timeline
+from src.rendering.glyph_grid_renderer import GlyphGridRenderer
+from src.rendering.hud_renderer import HudRenderer
 from src.rendering.opengl_initializer import OpenGLInitializer
 from src.rendering.renderer import Renderer
 from src.rendering.shader_factory import ShaderFactory
 from src.rendering.texture_manager import TextureManager
 
+import time
 
 import pygame
 
@@ -27,36 +31,152 @@ class TerminalScreen:
         self.screen = None
         self.overlay = None
         self.curvature_shader = None
+        self.reveal_mask = None  # (x, top, bottom) in overlay pixels, set by shader typewriter
+        self.glyph_grid_renderer = None  # created on first use of the glyph-grid text backend
+        self._cell_layer = None  # (grid, origin, color) submitted for this frame
+        self._overlay_dirty = True
+        self._blank_texture = None
+        self.hud_renderer = None  # created when a HUD is first shown
+        self._hud = None  # (surface, position) drawn after the CRT pass, or None
+        self._hud_uploaded = None  # surface last uploaded to hud_renderer
+        self.display_times = {}  # seconds spent in each step of the last display(), for the profiler HUD
         self.opengl_init = OpenGLInitializer()
 
     def initialize(self):
         """
         Initializes Pygame and OpenGL, and creates the curvature shader.
         """
-        self._initialize_pygame()
+        with timeline.span("open display"):
+            self._initialize_pygame()
         self.opengl_init.initialize()
-        self.curvature_shader = ShaderFactory.create_curvature_shader()
+        with timeline.span("compile CRT shader"):
+            self.curvature_shader = ShaderFactory.create_curvature_shader()
 
     def display(self, current_time, crt_settings=None):
         """
         Displays the screen with CRT effects applied and renders it.
         Create texture from overlay while it has scene content, then clear for next frame.
+        When a cell grid was submitted, text is drawn on the GPU and the overlay is only
+        uploaded if something was drawn on it this frame. A HUD set with set_hud()
+        is drawn after the CRT pass. The CPU time of each step is left in
+        display_times (GPU work mostly shows up in "flip", where the driver waits).
         """
-        texture_id = TextureManager.create_texture_id(self.overlay)
+        t0 = time.perf_counter()
+        cell_texture_id = None
+        if self._cell_layer is not None:
+            if self.glyph_grid_renderer is None:
+                self._create_glyph_grid_renderer()
+            cell_texture_id = self.glyph_grid_renderer.render(*self._cell_layer)
+        t1 = time.perf_counter()
+        owns_texture = cell_texture_id is None or self._overlay_dirty
+        if owns_texture:
+            texture_id = TextureManager.create_texture_id(self.overlay)
+        else:
+            if self._blank_texture is None:
+                self._blank_texture = TextureManager.create_solid_texture((0, 0, 0, 255))
+            texture_id = self._blank_texture
+        t2 = time.perf_counter()
         TextureManager.bind_texture(texture_id, self.curvature_shader)
-        Renderer.render_texture(self.curvature_shader, current_time, self.width, self.height, texture_id, crt_settings)
+        Renderer.render_texture(
+            self.curvature_shader, current_time, self.width, self.height, texture_id, crt_settings,
+            reveal_mask=self.reveal_mask, cell_texture_id=cell_texture_id,
+        )
+        t3 = time.perf_counter()
+        if self._hud is not None:
+            self._draw_hud()
+        t4 = time.perf_counter()
         pygame.display.flip()
-        TextureManager.cleanup(texture_id)
+        t5 = time.perf_counter()
+        if owns_texture:
+            TextureManager.cleanup(texture_id)
         surface = pygame.Surface(
             (self.overlay.get_width(), self.overlay.get_height()), pygame.SRCALPHA
         )
         self.overlay.blit(surface, (0, 0))
+        times = self.display_times
+        times["cells"] = t1 - t0
+        times["upload"] = t2 - t1
+        times["crt"] = t3 - t2
+        times["hud"] = t4 - t3
+        times["flip"] = t5 - t4
+
+    def set_hud(self, surface, position=(0, 0)):
+        """
+        Shows a surface on top of the finished frame, after the CRT pass, until
+        replaced or cleared. A surface is uploaded once, when it is set.
+
+        Args:
+            surface: SRCALPHA surface to show, or None to remove the HUD.
+            position: (x, y) of its top-left corner in screen pixels.
+        """
+        self._hud = None if surface is None else (surface, position)
+
+    def _draw_hud(self):
+        surface, (x, y) = self._hud
+        if self.hud_renderer is None:
+            self.hud_renderer = HudRenderer(self.width, self.height)
+        if surface is not self._hud_uploaded:
+            self.hud_renderer.set_surface(surface)
+            self._hud_uploaded = surface
+        self.hud_renderer.render(x, y)
 
     def clear(self):
         """
         Clears the overlay to opaque black so the CRT shader always has a visible background.
+        The reveal mask and cell grid are reset too; the text renderer sets them again.
         """
         self.overlay.fill((0, 0, 0, 255))
+        self.reveal_mask = None
+        self._cell_layer = None
+        self._overlay_dirty = False
+
+    def submit_cell_grid(self, grid, origin, color):
+        """
+        Draws a CellGrid with the GPU glyph-grid backend this frame, on top of the overlay.
+
+        Args:
+            grid: CellGrid holding the text.
+            origin: (x, y) pixel position of the grid's top-left cell.
+            color: Default text color.
+        """
+        self._cell_layer = (grid, origin, color)
+
+    def prepare_glyph_grid(self, atlas=None):
+        """
+        Creates the glyph-grid renderer (linking its shader) and uploads a glyph
+        atlas, so the first frame using the glyph-grid backend does not stall.
+
+        Args:
+            atlas: Optional GlyphAtlas to upload.
+        """
+        if self.glyph_grid_renderer is None:
+            self._create_glyph_grid_renderer()
+        if atlas is not None:
+            self.glyph_grid_renderer.preload_atlas(atlas)
+
+    def mark_overlay_dirty(self):
+        """
+        Flags the overlay as drawn on this frame, for code that draws on it directly
+        instead of through blit(). Without this the glyph-grid backend skips the upload.
+        """
+        self._overlay_dirty = True
+
+    def set_reveal_mask(self, x, top, bottom):
+        """
+        Masks the cells of one text row from x to the right edge in the CRT pass.
+
+        Args:
+            x: First unrevealed pixel column in the overlay.
+            top: Top pixel row of the text line in the overlay.
+            bottom: Bottom pixel row (exclusive) of the text line in the overlay.
+        """
+        self.reveal_mask = (x, top, bottom)
+
+    def clear_reveal_mask(self):
+        """
+        Disables the typewriter reveal mask.
+        """
+        self.reveal_mask = None
 
     def blit(self, source, dest):
         """
@@ -67,6 +187,11 @@ class TerminalScreen:
             dest: The destination coordinates on the overlay as a tuple.
         """
         self.overlay.blit(source, dest)
+        self._overlay_dirty = True
+
+    def _create_glyph_grid_renderer(self):
+        with timeline.span("link glyph-grid shader", "render"):
+            self.glyph_grid_renderer = GlyphGridRenderer(self.width, self.height)
 
     def _initialize_pygame(self):
         """
@@ -1,4 +1,23 @@
+import math
 import time
+from collections import OrderedDict
+
+from src.rendering.cell_grid import CellGrid
+from src.rendering.glyph_atlas import GlyphAtlas
+from src.rendering.scroll_strip import ScrollStrip
+from src.rendering.scrollback_index import ScrollbackIndex
+
+# Typewriter reveal modes: "cpu" re-renders the growing substring every frame,
+# "shader" renders each line once at full length and lets the CRT pass mask the
+# cells that have not been typed yet.
+REVEAL_MODE_CPU = "cpu"
+REVEAL_MODE_SHADER = "shader"
+
+# Text backends: "surface" rasterizes lines with pygame onto the overlay,
+# "glyph_grid" fills a CellGrid that the GPU draws from a glyph atlas.
+BACKEND_SURFACE = "surface"
+BACKEND_GLYPH_GRID = "glyph_grid"
+
 
 class TextRenderer:
     """
@@ -6,8 +25,20 @@ class TextRenderer:
     text wrapping, scrolling, and rendering with a cursor for user text input.
     """
 
+    SEARCH_INDEX_BUDGET_SEC = 0.002  # per-frame time slice for building the scrollback search index
+    SMOOTH_SCROLL_RATE = 18.0  # smooth scroll closes this fraction of the remaining distance per second
+    HISTORY_PAGE_ROWS = 256  # rows paged in from the history source when scrolling past the top
+    _VIEW_STATE = (  # attributes swapped by detach_view() / attach_view()
+        "full_text_lines", "text_buffer", "previous_text_lines", "scrollback_index",
+        "_last_logical_line_wrapped_count", "current_line_index", "current_char_index",
+        "is_rendering_complete", "finish_rendering_requested", "is_active_rendering",
+        "scroll_position", "_scroll_px", "search_query", "_search_hits", "_search_hit_index",
+        "centered_line_indices", "user_input_text", "history", "_paged_rows",
+    )
+
     def __init__(self, screen, font, color, char_delay=0.0001, margin=(50, 50), 
-                 line_height=30, max_width=700, max_height=500):
+                 line_height=30, max_width=700, max_height=500, reveal_mode=REVEAL_MODE_CPU,
+                 smooth_scroll=False, text_backend=BACKEND_SURFACE, scrollback_limit=None):
         """
         Initializes the TextRenderer.
 
@@ -20,6 +51,13 @@ class TextRenderer:
             line_height: Height of each line in pixels.
             max_width: Maximum width of the text area in pixels.
             max_height: Maximum height of the text area in pixels.
+            reveal_mode: "cpu" to rasterize the typed substring each frame, or "shader"
+                to render full lines and mask unrevealed cells in the CRT pass.
+            smooth_scroll: Scroll by pixels, drawing rows from a cached ScrollStrip.
+            text_backend: Backend used by views that opt in with set_backend(); the
+                active backend starts as "surface".
+            scrollback_limit: Maximum number of wrapped rows kept; older rows are
+                dropped from the front. None keeps everything.
         """
         self.screen = screen
         self.font = font
@@ -45,6 +83,28 @@ class TextRenderer:
         self.on_output_added = None  # optional callback when output is appended (e.g. play return sound)
         self.on_char_typed = None   # optional callback when typewriter adds char(s), e.g. play keypress sound
         self.centered_line_indices = set()  # line indices to center horizontally (e.g. {0} for welcome line)
+        self.reveal_mode = reveal_mode
+        self._line_cache = OrderedDict()  # (text, color) -> rendered surface, LRU
+        self._line_cache_max = 512
+        self.line_cache_hits = 0  # counters for the profiler HUD; misses are font.render calls
+        self.line_cache_misses = 0
+        self._cell_width = None
+        self.scrollback_index = ScrollbackIndex()  # trigram index over full_text_lines rows
+        self.search_query = ""
+        self._search_hits = []  # matching row indices, ascending
+        self._search_hit_index = -1
+        self.smooth_scroll = smooth_scroll
+        self._scroll_px = 0.0  # displayed scroll offset in pixels (smooth mode)
+        self._scroll_anim_time = time.time()
+        self._scroll_strip = ScrollStrip(line_height)
+        self.text_backend = text_backend
+        self.backend = BACKEND_SURFACE
+        self._cell_grid = None
+        self._cell_origin = (0, 0)
+        self.scrollback_limit = scrollback_limit
+        self.history = None  # source of rows older than full_text_lines (see set_history)
+        self._paged_rows = 0  # rows at the front paged in from history; trimmed first
+        self._wrap_columns = None  # characters per row when the font is monospace, False if it is not
 
     def set_text(self, text_lines):
         """
@@ -53,7 +113,11 @@ class TextRenderer:
         Args:
             text_lines: List of strings to be rendered.
         """
-        self.full_text_lines = self._wrap_text(text_lines)
+        self.full_text_lines = []
+        self.scrollback_index.clear()
+        self.history = None
+        self._paged_rows = 0
+        self._extend_lines(self._wrap_text(text_lines))
         self._last_logical_line_wrapped_count = (
             len(self._wrap_text([text_lines[-1]])) if text_lines else 0
         )
@@ -67,21 +131,109 @@ class TextRenderer:
         """
         if self._is_time_to_update():
             self._update_text_buffer()
+        self.scrollback_index.index_pending(self.SEARCH_INDEX_BUDGET_SEC)
 
     def render(self):
         """
         Renders the text buffer, user input, and scroll indicators on the screen.
         """
+        if self.backend == BACKEND_GLYPH_GRID and hasattr(self.screen, "submit_cell_grid"):
+            self._render_cells()
+            return
         visible_lines = self._get_visible_lines()
         max_visible_lines = self._get_max_visible_lines()
         y = self.margin[1]
-        for i, line in enumerate(visible_lines):
-            line_index = self.scroll_position + i
-            self._render_line(line, y, line_index=line_index)
-            y += self.line_height
+        if self.smooth_scroll:
+            self._render_smooth(max_visible_lines)
+            y += len(visible_lines) * self.line_height
+        else:
+            for i, line in enumerate(visible_lines):
+                line_index = self.scroll_position + i
+                self._render_line(line, y, line_index=line_index)
+                if self.search_query:
+                    self._render_search_highlights(line, y, line_index)
+                y += self.line_height
+        self._update_reveal_mask()
         self._render_user_input(y)
         self._render_scroll_indicators()
 
+    def render_rows(self, rows, cursor=None):
+        """
+        Renders a fixed grid of terminal rows at the text margin, bypassing the
+        scrollback, wrapping and scrolling (full-screen programs on an emulated
+        screen). With the glyph-grid backend only rows whose content changed are
+        re-uploaded.
+
+        Args:
+            rows: List of lines (str or StyledLine), one per screen row.
+            cursor: (row, col) of the terminal cursor, or None to hide it.
+        """
+        show_cursor = cursor is not None and self.cursor_enabled and int(time.time() * 2) % 2 == 0
+        if self.backend == BACKEND_GLYPH_GRID and hasattr(self.screen, "submit_cell_grid"):
+            grid = self._get_cell_grid()
+            origin_x, origin_y = self._cell_origin
+            col0 = (self.margin[0] - origin_x) // self._get_cell_width()
+            row0 = (self.margin[1] - origin_y) // self.line_height
+            grid.begin_frame()
+            for i, line in enumerate(rows[:grid.rows - row0]):
+                highlights = ((cursor[1], 1),) if show_cursor and cursor[0] == i else ()
+                grid.set_row(row0 + i, ((col0, line, highlights),))
+            grid.end_frame()
+            self.screen.clear_reveal_mask()
+            self.screen.submit_cell_grid(grid, self._cell_origin, self.color)
+            return
+        y = self.margin[1]
+        for line in rows:
+            if line:
+                self._render_line(line, y)
+            y += self.line_height
+        if show_cursor:
+            cursor_surface = self._render_text_surface("█", self.color)
+            self.screen.blit(cursor_surface, (self.margin[0] + cursor[1] * self._get_cell_width(),
+                                              self.margin[1] + cursor[0] * self.line_height))
+
+    def detach_view(self):
+        """
+        Hands over the scrollback and view state (rows, search index, scroll and
+        search position) without copying it and leaves the renderer empty, so
+        another view can use it. attach_view() brings the state back.
+
+        Returns:
+            dict: The detached state.
+        """
+        view = {name: getattr(self, name) for name in self._VIEW_STATE}
+        self.full_text_lines = []
+        self.text_buffer = []
+        self.previous_text_lines = []
+        self.scrollback_index = ScrollbackIndex()
+        self._search_hits = []
+        self._search_hit_index = -1
+        self.search_query = ""
+        self.centered_line_indices = set()
+        self._paged_rows = 0
+        self._reset_state()
+        return view
+
+    def attach_view(self, view):
+        """
+        Restores state returned by detach_view(), replacing the current state.
+
+        Args:
+            view: State from detach_view().
+        """
+        for name, value in view.items():
+            setattr(self, name, value)
+        self._scroll_strip.invalidate()
+
+    def set_backend(self, backend):
+        """
+        Selects the text backend for the current view.
+
+        Args:
+            backend: "surface" or "glyph_grid".
+        """
+        self.backend = backend
+
     def finish_rendering(self):
         """
         Completes the rendering immediately by rendering all remaining text at once.
@@ -96,42 +248,97 @@ class TextRenderer:
         Does not call update() here to avoid recursion when on_output_added appends more text.
         """
         self.previous_text_lines = self.full_text_lines.copy()
-        self.full_text_lines.extend(self._wrap_text([text]))
+        self._extend_lines(self._wrap_text([text]))
         self.is_active_rendering = True
 
-    def append_lines_instant(self, lines):
+    def set_history(self, history, first_seq=None):
+        """
+        Attaches a source of rows older than the scrollback (e.g. a LogScrollback
+        over a session log). Scrolling up past the first row pages them in.
+
+        Args:
+            history: Object with mark(row_id, seq), discard_before(row_id) and
+                rows_before(first_id, count, wrap), or None.
+            first_seq: The history's sequence number of the line the first row
+                starts, if the current rows came from it.
+        """
+        self.history = history
+        if history is not None and first_seq is not None and self.full_text_lines:
+            history.mark(self.scrollback_index.first_id, first_seq)
+
+    def append_lines_instant(self, lines, notify=True, first_seq=None):
         """
         Appends lines to the buffer and updates the display immediately
-        (no typewriter effect). Used for live shell output.
+        (no typewriter effect). Used for live shell output. Only the new rows are
+        copied to the text buffer, so the cost does not grow with the scrollback.
 
         Args:
             lines: List of strings to append.
+            notify: Call on_output_added; batched callers notify once themselves.
+            first_seq: The history's sequence number of lines[0], so older lines
+                can be paged in before it later.
         """
         if not lines:
             return
-        for line in lines:
-            wrapped = self._wrap_text([line])
-            self.full_text_lines.extend(wrapped)
-            self._last_logical_line_wrapped_count = len(wrapped)
+        if first_seq is not None and self.history is not None:
+            self.history.mark(self.scrollback_index.next_id, first_seq)
+        at_bottom = self.is_at_bottom()
+        last = self._wrap_text(lines[-1:])
+        self._extend_lines(self._wrap_text(lines[:-1]) + last)
+        self._last_logical_line_wrapped_count = len(last)
+        self._trim_scrollback(at_bottom)
         self._render_full_text()
-        if self.on_output_added:
+        if notify and self.on_output_added:
             self.on_output_added()
 
-    def replace_last_line(self, text):
+    def replace_last_line(self, text, notify=True):
         """
         Replaces the last logical line with the given text (e.g. for \\r progress updates).
         No-op if there are no lines.
+
+        Args:
+            text: The new last line.
+            notify: Call on_output_added.
         """
         if not self.full_text_lines or self._last_logical_line_wrapped_count <= 0:
             return
-        n = self._last_logical_line_wrapped_count
+        self._drop_last_line()
         wrapped = self._wrap_text([text])
-        self.full_text_lines = self.full_text_lines[:-n] + wrapped
+        self._extend_lines(wrapped)
         self._last_logical_line_wrapped_count = len(wrapped)
         self._render_full_text()
-        if self.on_output_added:
+        if notify and self.on_output_added:
             self.on_output_added()
 
+    def remove_last_line(self, notify=True):
+        """
+        Removes the last logical line appended with append_lines_instant() (e.g. an
+        in-progress line that was erased). No-op if there is none; until the next
+        append, replace_last_line() and remove_last_line() do nothing.
+
+        Args:
+            notify: Call on_output_added.
+        """
+        if not self.full_text_lines or self._last_logical_line_wrapped_count <= 0:
+            return
+        self._drop_last_line()
+        self._last_logical_line_wrapped_count = 0
+        self._render_full_text()
+        if notify and self.on_output_added:
+            self.on_output_added()
+
+    def _drop_last_line(self):
+        """Deletes the rows of the last logical line, and search hits on them."""
+        n = self._last_logical_line_wrapped_count
+        del self.full_text_lines[-n:]
+        if self._buffer_mirrors_text():
+            del self.text_buffer[len(self.full_text_lines):]
+        self.scrollback_index.truncate(n)
+        if self._search_hits:
+            cutoff = len(self.full_text_lines)
+            self._search_hits = [row for row in self._search_hits if row < cutoff]
+            self._search_hit_index = min(self._search_hit_index, len(self._search_hits) - 1)
+
     def is_rendering(self):
         """
         Checks if the text is still being rendered.
@@ -141,6 +348,18 @@ class TextRenderer:
         """
         return not self.is_rendering_complete
 
+    def is_animating(self):
+        """
+        Checks if the next frames would differ without new input: text still being
+        typed out or a smooth scroll still easing toward its position.
+
+        Returns:
+            bool: True while rendering or scrolling is in progress.
+        """
+        if self.is_rendering():
+            return True
+        return self.smooth_scroll and abs(self.scroll_position * self.line_height - self._scroll_px) >= 0.5
+
     def get_text_buffer(self):
         """
         Gets the current text buffer.
@@ -158,8 +377,10 @@ class TextRenderer:
 
     def scroll_up(self):
         """
-        Scrolls the visible text up by one line.
+        Scrolls the visible text up by one line, paging in history at the top.
         """
+        if self.scroll_position == 0:
+            self._page_in_history()
         if self.scroll_position > 0:
             self.scroll_position -= 1
 
@@ -173,9 +394,12 @@ class TextRenderer:
 
     def scroll_page_up(self):
         """
-        Scrolls the visible text up by one page (max visible lines).
+        Scrolls the visible text up by one page (max visible lines), paging in
+        history when the page reaches past the top.
         """
         page_size = self._get_max_visible_lines()
+        if self.scroll_position <= page_size:
+            self._page_in_history()
         self.scroll_position = max(0, self.scroll_position - page_size)
 
     def scroll_page_down(self):
@@ -195,6 +419,12 @@ class TextRenderer:
         """
         self.user_input_text = text
 
+    def is_at_bottom(self):
+        """
+        True when the last row is in view, i.e. the user has not scrolled back.
+        """
+        return self.scroll_position >= len(self.full_text_lines) - self._get_max_visible_lines()
+
     def scroll_to_bottom(self):
         """
         Scrolls the visible text to the bottom.
@@ -202,6 +432,219 @@ class TextRenderer:
         self.scroll_position = max(0, len(self.full_text_lines) - self._get_max_visible_lines())
         self._render_full_text()
 
+    def search(self, query):
+        """
+        Runs an incremental search over the scrollback and jumps to the newest hit
+        at or above the bottom of the current view. Matches are highlighted until
+        clear_search() is called.
+
+        Args:
+            query: Case-insensitive substring to look for.
+
+        Returns:
+            int: Number of matching rows.
+        """
+        self.search_query = query
+        if not query:
+            self._search_hits = []
+            self._search_hit_index = -1
+            return 0
+        first_id = self.scrollback_index.first_id
+        self._search_hits = [row_id - first_id for row_id in self.scrollback_index.search(query)]
+        if not self._search_hits:
+            self._search_hit_index = -1
+            return 0
+        view_bottom = self.scroll_position + self._get_max_visible_lines() - 1
+        index = len(self._search_hits) - 1
+        while index > 0 and self._search_hits[index] > view_bottom:
+            index -= 1
+        self._search_hit_index = index
+        self._scroll_to_row(self._search_hits[index])
+        return len(self._search_hits)
+
+    def search_next(self):
+        """
+        Jumps to the next older hit, wrapping around to the newest one.
+        """
+        if not self._search_hits:
+            return
+        self._search_hit_index = (self._search_hit_index - 1) % len(self._search_hits)
+        self._scroll_to_row(self._search_hits[self._search_hit_index])
+
+    def search_prev(self):
+        """
+        Jumps to the next newer hit, wrapping around to the oldest one.
+        """
+        if not self._search_hits:
+            return
+        self._search_hit_index = (self._search_hit_index + 1) % len(self._search_hits)
+        self._scroll_to_row(self._search_hits[self._search_hit_index])
+
+    def clear_search(self):
+        """
+        Ends the search and removes match highlighting.
+        """
+        self.search_query = ""
+        self._search_hits = []
+        self._search_hit_index = -1
+
+    def get_search_status(self):
+        """
+        Returns (current hit number counted from the newest, total hits) for status lines.
+        """
+        if not self._search_hits:
+            return 0, 0
+        return len(self._search_hits) - self._search_hit_index, len(self._search_hits)
+
+    def _scroll_to_row(self, row):
+        """
+        Scrolls so that the given row is visible, roughly centered.
+        """
+        page_size = self._get_max_visible_lines()
+        max_scroll = max(0, len(self.text_buffer) - page_size)
+        self.scroll_position = max(0, min(max_scroll, row - page_size // 2))
+
+    def _extend_lines(self, wrapped):
+        """
+        Appends wrapped rows to full_text_lines and keeps the search index (and any
+        active search) up to date.
+
+        Args:
+            wrapped: Already wrapped rows.
+        """
+        start = len(self.full_text_lines)
+        self.full_text_lines.extend(wrapped)
+        self.scrollback_index.extend(wrapped)
+        if self.search_query:
+            needle = self.search_query.lower()
+            for offset, row in enumerate(wrapped):
+                if needle in row.lower():
+                    self._search_hits.append(start + offset)
+
+    def _trim_scrollback(self, at_bottom=True):
+        """
+        Drops the oldest rows once the scrollback exceeds scrollback_limit by an
+        eighth, so the front of the list is shifted rarely and in bulk. Scroll
+        position, search hits and the search index follow the removed rows.
+
+        While the view is scrolled back, rows in or just above it (a page of
+        history, where the reader is heading) are kept even past the limit,
+        so the view never jumps. Back at the bottom, rows paged in from history
+        are dropped first, all of them; they can be paged in again.
+
+        Args:
+            at_bottom: Whether the view was at the bottom before the rows were appended.
+        """
+        limit = self.scrollback_limit
+        if not limit:
+            return
+        excess = len(self.full_text_lines) - limit
+        if excess <= limit // 8:
+            excess = 0
+        if at_bottom:
+            excess = max(excess, self._paged_rows)
+        else:
+            excess = min(excess, self.scroll_position - self.HISTORY_PAGE_ROWS)
+        if excess <= 0:
+            return
+        self._drop_front_rows(excess)
+        if self.history is not None:
+            self.history.discard_before(self.scrollback_index.first_id)
+
+    def _drop_front_rows(self, excess):
+        """
+        Removes the first `excess` rows; scroll position, search hits and the search
+        index follow.
+        """
+        mirrored = self._buffer_mirrors_text()
+        del self.full_text_lines[:excess]
+        if mirrored:
+            del self.text_buffer[:excess]
+        else:
+            self.text_buffer = self.text_buffer[excess:]
+        self.scrollback_index.discard_before(self.scrollback_index.first_id + excess)
+        self._paged_rows = max(0, self._paged_rows - excess)
+        self.current_line_index = max(0, self.current_line_index - excess)
+        self.scroll_position = max(0, self.scroll_position - excess)
+        self._scroll_px = max(0.0, self._scroll_px - excess * self.line_height)
+        self.centered_line_indices = {i - excess for i in self.centered_line_indices if i >= excess}
+        if self._search_hits:
+            kept = [row - excess for row in self._search_hits if row >= excess]
+            self._search_hit_index = max(-1 if not kept else 0,
+                                         self._search_hit_index - (len(self._search_hits) - len(kept)))
+            self._search_hits = kept
+
+    def _page_in_history(self):
+        """
+        Prepends up to HISTORY_PAGE_ROWS older rows from the history source while
+        the view is at rest, keeping what is on screen in place.
+
+        Returns:
+            int: Number of rows added.
+        """
+        if self.history is None or not self._buffer_mirrors_text():
+            return 0
+        found = self.history.rows_before(self.scrollback_index.first_id, self.HISTORY_PAGE_ROWS, self._wrap_text)
+        if not found:
+            return 0
+        rows, stale = found
+        if stale:
+            self._drop_front_rows(stale)  # a line cut by trimming; it comes back whole from the history
+        count = len(rows)
+        self._paged_rows += count
+        self.full_text_lines[:0] = rows
+        self.text_buffer[:0] = rows
+        self.scrollback_index.prepend(rows)
+        self.current_line_index += count
+        self.scroll_position += count
+        self._scroll_px += count * self.line_height
+        self.centered_line_indices = {i + count for i in self.centered_line_indices}
+        if self.search_query:
+            needle = self.search_query.lower()
+            hits = [i for i, row in enumerate(rows) if needle in row.lower()]
+            self._search_hit_index += len(hits)
+            self._search_hits = hits + [row + count for row in self._search_hits]
+        return count - stale
+
+    def _buffer_mirrors_text(self):
+        """
+        True when text_buffer holds the same row objects as the start of
+        full_text_lines (instant output, nothing being typed), so it can be
+        updated in place instead of copied.
+        """
+        buffer = self.text_buffer
+        n = len(buffer)
+        return (self.is_rendering_complete and n <= len(self.full_text_lines)
+                and (n == 0 or buffer[n - 1] is self.full_text_lines[n - 1]))
+
+    def _get_wrap_columns(self):
+        """
+        Returns how many characters fit in a row when the font is monospace, or
+        None for proportional fonts, whose rows must be measured.
+        """
+        if self._wrap_columns is None:
+            cw = self._get_cell_width()
+            monospace = cw > 0 and self.font.size("W")[0] == cw and self.font.size("i")[0] == cw
+            self._wrap_columns = (self.max_width - self.margin[0]) // cw if monospace else False
+        return self._wrap_columns or None
+
+    def _split_position(self, subline, max_width, columns):
+        """
+        Returns where to break a row: the longest prefix that fits, cut back to
+        the last space when the row is too long. Monospace fonts skip measuring.
+        """
+        if columns is not None:
+            split_pos = min(len(subline), columns)
+        else:
+            split_pos = len(subline)
+            while self.font.size(subline[:split_pos])[0] > max_width and split_pos > 0:
+                split_pos -= 1
+        if split_pos < len(subline):
+            split_pos = subline[:split_pos].rfind(' ')
+            if split_pos == -1:
+                split_pos = len(subline)
+        return split_pos
+
     def _wrap_text(self, text_lines):
         """
         Wraps text lines to fit within the maximum width.
@@ -213,24 +656,54 @@ class TextRenderer:
             list: Wrapped text lines.
         """
         wrapped_lines = []
+        max_width = self.max_width - self.margin[0]
+        columns = self._get_wrap_columns()
         for line in text_lines:
-            if line.strip() == "":
+            if columns is not None and len(line) <= columns and "\n" not in line and not hasattr(line, "runs"):
+                # Fast path: a short plain line on a monospace font is a single row.
+                wrapped_lines.append(line if line.strip() else "")
+            elif line.strip() == "":
                 wrapped_lines.append("")
+            elif hasattr(line, "runs"):
+                wrapped_lines.extend(self._wrap_styled_line(line))
             else:
                 for subline in line.split('\n'):
                     while subline:
-                        max_width = self.max_width - self.margin[0]
-                        split_pos = len(subline)
-                        while self.font.size(subline[:split_pos])[0] > max_width and split_pos > 0:
-                            split_pos -= 1
-                        if split_pos < len(subline):
-                            split_pos = subline[:split_pos].rfind(' ')
-                            if split_pos == -1:
-                                split_pos = len(subline)
+                        split_pos = self._split_position(subline, max_width, columns)
                         wrapped_lines.append(subline[:split_pos])
                         subline = subline[split_pos:].strip()
         return wrapped_lines
 
+    def _wrap_styled_line(self, line):
+        """
+        Wraps an attributed line (one with `runs`, e.g. ANSI-colored shell output)
+        exactly like _wrap_text, but by offsets so every piece keeps its runs.
+
+        Args:
+            line: Line with `runs` and a `slice(start, end)` method.
+
+        Returns:
+            list: Wrapped lines.
+        """
+        wrapped_lines = []
+        max_width = self.max_width - self.margin[0]
+        columns = self._get_wrap_columns()
+        text = str(line)
+        pos = 0
+        for sub_end in [i for i, ch in enumerate(text) if ch == '\n'] + [len(text)]:
+            start, end = pos, sub_end
+            pos = sub_end + 1
+            while start < end:
+                subline = text[start:end]
+                split_pos = self._split_position(subline, max_width, columns)
+                wrapped_lines.append(line.slice(start, start + split_pos))
+                start += split_pos
+                while start < end and text[start].isspace():
+                    start += 1
+                while end > start and text[end - 1].isspace():
+                    end -= 1
+        return wrapped_lines
+
     def _wrap_user_input(self):
         """
         Wraps user input text to fit within the maximum width.
@@ -252,6 +725,7 @@ class TextRenderer:
         self.finish_rendering_requested = False
         self.is_active_rendering = True
         self.scroll_position = 0
+        self._scroll_px = 0.0
         self.user_input_text = ""
 
     def _is_time_to_update(self):
@@ -297,9 +771,13 @@ class TextRenderer:
 
     def _render_full_text(self):
         """
-        Renders the full text by copying all lines to the text buffer.
+        Renders the full text by copying all lines to the text buffer; when the
+        buffer already mirrors the text, only the rows it lacks are appended.
         """
-        self.text_buffer = self.full_text_lines.copy()
+        if self._buffer_mirrors_text():
+            self.text_buffer.extend(self.full_text_lines[len(self.text_buffer):])
+        else:
+            self.text_buffer = self.full_text_lines.copy()
         self.is_rendering_complete = True
         self.finish_rendering_requested = True
         self.is_active_rendering = False
@@ -313,7 +791,11 @@ class TextRenderer:
             self.text_buffer.append(self.full_text_lines[i])
         if self.current_line_index < len(self.full_text_lines):
             current_line = self.full_text_lines[self.current_line_index]
-            self.text_buffer.append(current_line[:self.current_char_index])
+            if self.reveal_mode == REVEAL_MODE_SHADER:
+                # Full line goes to the overlay; the CRT pass hides the untyped cells.
+                self.text_buffer.append(current_line)
+            else:
+                self.text_buffer.append(current_line[:self.current_char_index])
 
     def _move_to_next_line(self):
         """
@@ -363,7 +845,7 @@ class TextRenderer:
             y: Y coordinate for the cursor.
         """
         if self.cursor_enabled and int(time.time() * 2) % 2 == 0:
-            cursor_surface = self.font.render("█", True, self.color)
+            cursor_surface = self._render_text_surface("█", self.color)
             self.screen.blit(cursor_surface, (x, y))
 
     def _render_user_input(self, y):
@@ -376,7 +858,7 @@ class TextRenderer:
         user_input_lines = self._wrap_user_input()
         if user_input_lines:
             for line in user_input_lines:
-                user_input_surface = self.font.render(line, True, self.color)
+                user_input_surface = self._render_text_surface(line, self.color)
                 self.screen.blit(user_input_surface, (self.margin[0], y))
                 y += self.line_height
 
@@ -388,7 +870,141 @@ class TextRenderer:
 
         self._render_cursor(cursor_x, cursor_y)
 
-    def _render_line(self, line, y, line_index=None):
+    def _render_smooth(self, max_visible_lines):
+        """
+        Smooth-scroll rendering: eases the pixel offset toward scroll_position and
+        draws the window from the cached scroll strip, so only rows that scrolled in
+        or changed are rasterized.
+
+        Args:
+            max_visible_lines: Number of rows in the text window.
+        """
+        view_height = max_visible_lines * self.line_height
+        self._advance_scroll_animation(self.scroll_position * self.line_height, view_height)
+        self._scroll_strip.render(
+            self.screen, 0, self.margin[1], self._surface_width(), view_height,
+            self._scroll_px, len(self.text_buffer), self._strip_row_key, self._draw_strip_row,
+        )
+
+    def _advance_scroll_animation(self, target_px, view_height):
+        """
+        Moves the displayed pixel offset toward target_px (exponential ease-out).
+        Jumps larger than a page are shortened to one page so bulk output does not
+        crawl through everything in between.
+        """
+        now = time.time()
+        dt = now - self._scroll_anim_time
+        self._scroll_anim_time = now
+        diff = target_px - self._scroll_px
+        if abs(diff) > view_height:
+            self._scroll_px = target_px - math.copysign(view_height, diff)
+            diff = target_px - self._scroll_px
+        self._scroll_px += diff * min(1.0, dt * self.SMOOTH_SCROLL_RATE)
+        if abs(target_px - self._scroll_px) < 0.5:
+            self._scroll_px = float(target_px)
+
+    def _strip_row_key(self, row):
+        """
+        Key that changes whenever a row's appearance changes (text, runs, centering,
+        search highlighting).
+        """
+        line = self.text_buffer[row]
+        return (line, getattr(line, "runs", None), row in self.centered_line_indices, self.search_query)
+
+    def _draw_strip_row(self, surface, row, y):
+        """
+        Draws one row into the scroll strip.
+        """
+        line = self.text_buffer[row]
+        self._render_line(line, y, line_index=row, target=surface)
+        if self.search_query:
+            self._render_search_highlights(line, y, row, target=surface)
+
+    def _row_top(self, row):
+        """
+        Returns the y coordinate of a row in the text window, following the smooth
+        scroll offset when enabled.
+        """
+        if self.smooth_scroll:
+            return self.margin[1] + row * self.line_height - int(self._scroll_px)
+        return self.margin[1] + (row - self.scroll_position) * self.line_height
+
+    def _render_cells(self):
+        """
+        Glyph-grid rendering: writes the visible rows, user input, cursor and scroll
+        indicators into the CellGrid and hands it to the screen, which draws it on
+        the GPU. Rows that did not change are skipped by the grid, so steady output
+        touches only the rows that scrolled or changed. Scrolling is whole-row here.
+        """
+        grid = self._get_cell_grid()
+        origin_x, origin_y = self._cell_origin
+        cw = self._get_cell_width()
+        lh = self.line_height
+        col0 = (self.margin[0] - origin_x) // cw
+        row0 = (self.margin[1] - origin_y) // lh
+        self._scroll_px = float(self.scroll_position * lh)
+        rows = {}
+
+        visible_lines = self._get_visible_lines()
+        for i, line in enumerate(visible_lines):
+            line_index = self.scroll_position + i
+            col = (self._line_x(cw * len(line), line_index) - origin_x) // cw
+            highlights = ()
+            if self.search_query:
+                row_id = self.scrollback_index.first_id + line_index
+                length = len(self.search_query)
+                highlights = tuple((start, length) for start in self.scrollback_index.find_in_row(row_id, self.search_query))
+            rows.setdefault(row0 + i, []).append((col, line, highlights))
+
+        row = row0 + len(visible_lines)
+        user_input_lines = self._wrap_user_input()
+        for line in user_input_lines:
+            rows.setdefault(row, []).append((col0, line, ()))
+            row += 1
+        if self.cursor_enabled and int(time.time() * 2) % 2 == 0:
+            if user_input_lines:
+                rows.setdefault(row - 1, []).append((col0 + len(user_input_lines[-1]), "█", ()))
+            else:
+                rows.setdefault(row, []).append((col0, "█", ()))
+
+        indicator_col = (self.max_width - 20 - origin_x) // cw
+        if self.scroll_position > 0:
+            rows.setdefault((self.margin[1] - 20 - origin_y) // lh, []).append((indicator_col, "^", ()))
+        if len(self.text_buffer) > self.scroll_position + self._get_max_visible_lines():
+            rows.setdefault((self.max_height - self.margin[1] - origin_y) // lh, []).append((indicator_col, "v", ()))
+
+        grid.begin_frame()
+        for row, items in rows.items():
+            grid.set_row(row, tuple(items))
+        grid.end_frame()
+        self._update_reveal_mask()
+        self.screen.submit_cell_grid(grid, self._cell_origin, self.color)
+
+    def warm_up(self):
+        """
+        Creates the cell grid and rasterizes its glyph atlas ahead of the first
+        glyph-grid frame.
+
+        Returns:
+            GlyphAtlas: The atlas, for uploading to the GPU.
+        """
+        return self._get_cell_grid().atlas
+
+    def _get_cell_grid(self):
+        """
+        Returns the CellGrid covering the screen, creating it (and its glyph atlas)
+        on first use. The grid is aligned so the text margin falls on a cell edge.
+        """
+        if self._cell_grid is None:
+            cw = self._get_cell_width()
+            lh = self.line_height
+            self._cell_origin = (self.margin[0] % cw, self.margin[1] % lh)
+            cols = (self.screen.width - self._cell_origin[0]) // cw
+            rows = (self.screen.height - self._cell_origin[1]) // lh
+            self._cell_grid = CellGrid(rows, cols, GlyphAtlas(self.font, cw, lh))
+        return self._cell_grid
+
+    def _render_line(self, line, y, line_index=None, target=None):
         """
         Renders a single line of text.
 
@@ -396,15 +1012,137 @@ class TextRenderer:
             line: String to be rendered.
             y: Y coordinate for the line.
             line_index: Optional global line index (for centered_line_indices).
+            target: Surface to draw on; defaults to the screen.
+        """
+        if target is None:
+            target = self.screen
+        runs = getattr(line, "runs", None)
+        if runs:
+            self._render_runs(line, y, line_index, target)
+            return
+        rendered_text = self._render_text_surface(line, self.color)
+        target.blit(rendered_text, (self._line_x(rendered_text.get_width(), line_index), y))
+
+    def _render_runs(self, line, y, line_index=None, target=None):
+        """
+        Renders an attributed line run by run. Each run goes through the line cache,
+        so colored output costs one cached surface per run, never one per character.
+
+        Args:
+            line: Line with `iter_runs()` yielding (text, style); style.resolve()
+                maps it to (fg, bg) colors.
+            y: Y coordinate for the line.
+            line_index: Optional global line index (for centered_line_indices).
+            target: Surface to draw on; defaults to the screen.
+        """
+        if target is None:
+            target = self.screen
+        x = self._line_x(self.font.size(line)[0], line_index)
+        for text, style in line.iter_runs():
+            fg, bg = style.resolve(self.color)
+            surface = self._render_text_surface(text, fg, bg)
+            target.blit(surface, (x, y))
+            x += surface.get_width()
+
+    def _line_x(self, line_width, line_index=None):
+        """
+        Returns the x coordinate of a line, honouring centered_line_indices.
+
+        Args:
+            line_width: Rendered width of the line in pixels.
+            line_index: Optional global line index.
         """
-        rendered_text = self.font.render(line, True, self.color)
         if getattr(self, "centered_line_indices", None) and line_index is not None and line_index in self.centered_line_indices:
-            w = getattr(self.screen, "get_width", None)
-            surface_w = w() if callable(w) else getattr(self.screen, "width", self.max_width)
-            x = (surface_w - rendered_text.get_width()) // 2
+            return (self._surface_width() - line_width) // 2
+        return self.margin[0]
+
+    def _surface_width(self):
+        """
+        Returns the width of the surface the text is drawn on.
+        """
+        w = getattr(self.screen, "get_width", None)
+        return w() if callable(w) else getattr(self.screen, "width", self.max_width)
+
+    def _render_search_highlights(self, line, y, line_index, target=None):
+        """
+        Draws the search matches of one row in inverse video.
+
+        Args:
+            line: Row text as rendered.
+            y: Y coordinate of the row.
+            line_index: Global row index.
+            target: Surface to draw on; defaults to the screen.
+        """
+        if target is None:
+            target = self.screen
+        row_id = self.scrollback_index.first_id + line_index
+        columns = self.scrollback_index.find_in_row(row_id, self.search_query)
+        if not columns:
+            return
+        x0 = self._line_x(self.font.size(line)[0], line_index)
+        length = len(self.search_query)
+        for col in columns:
+            match = line[col:col + length]
+            surface = self._render_text_surface(match, (0, 0, 0), self.color)
+            target.blit(surface, (x0 + self.font.size(line[:col])[0], y))
+
+    def _render_text_surface(self, text, color, background=None):
+        """
+        Renders text through a small LRU cache so unchanged lines are rasterized once.
+
+        Args:
+            text: String to be rendered.
+            color: Text color.
+            background: Optional background color (e.g. for inverse video).
+
+        Returns:
+            Surface: The rendered text.
+        """
+        key = (text, color, background)
+        surface = self._line_cache.get(key)
+        if surface is not None:
+            self._line_cache.move_to_end(key)
+            self.line_cache_hits += 1
+            return surface
+        self.line_cache_misses += 1
+        if background is None:
+            surface = self.font.render(text, True, color)
         else:
-            x = self.margin[0]
-        self.screen.blit(rendered_text, (x, y))
+            surface = self.font.render(text, True, color, background)
+        self._line_cache[key] = surface
+        if len(self._line_cache) > self._line_cache_max:
+            self._line_cache.popitem(last=False)
+        return surface
+
+    def _get_cell_width(self):
+        """
+        Returns the width of one character cell (the terminal font is monospace).
+        """
+        if self._cell_width is None:
+            self._cell_width = self.font.size(" ")[0]
+        return self._cell_width
+
+    def _update_reveal_mask(self):
+        """
+        In shader reveal mode, sends the typewriter position of the line being typed
+        to the screen (column x cell width) so the CRT pass masks unrevealed cells.
+        """
+        set_mask = getattr(self.screen, "set_reveal_mask", None)
+        if set_mask is None:
+            return
+        if (self.reveal_mode != REVEAL_MODE_SHADER or self.is_rendering_complete
+                or self.current_line_index >= len(self.full_text_lines)):
+            self.screen.clear_reveal_mask()
+            return
+        top = self._row_top(self.current_line_index)
+        window_bottom = self.margin[1] + self._get_max_visible_lines() * self.line_height
+        if top < self.margin[1] or top >= window_bottom:
+            self.screen.clear_reveal_mask()
+            return
+        line = self.full_text_lines[self.current_line_index]
+        line_width = self._get_cell_width() * len(line)
+        x = self._line_x(line_width, self.current_line_index) + self.current_char_index * self._get_cell_width()
+        set_mask(x, top, top + self.line_height)
 
     def _render_scroll_indicators(self):
         """
@@ -412,8 +1150,8 @@ class TextRenderer:
         """
         max_visible_lines = self._get_max_visible_lines()
         if self.scroll_position > 0:
-            up_indicator = self.font.render("^", True, self.color)
+            up_indicator = self._render_text_surface("^", self.color)
             self.screen.blit(up_indicator, (self.max_width - 20, self.margin[1] - 20))
         if len(self.text_buffer) > self.scroll_position + max_visible_lines:
-            down_indicator = self.font.render("v", True, self.color)
+            down_indicator = self._render_text_surface("v", self.color)
             self.screen.blit(down_indicator, (self.max_width - 20, self.max_height - self.margin[1]))
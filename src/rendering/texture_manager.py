@@ -28,6 +28,24 @@ class TextureManager:
         gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
         return texture_id
 
+    @staticmethod
+    def create_solid_texture(color):
+        """
+        Creates a 1x1 texture of a single color.
+
+        Args:
+            color: RGBA tuple.
+
+        Returns:
+            int: The texture ID.
+        """
+        texture_id = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, 1, 1, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, bytes(color))
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        return texture_id
+
     @staticmethod
     def bind_texture(texture_id, shader_program):
         """
@@ -14,4 +14,11 @@ class BaseScene(abc.ABC):
 
     @abc.abstractmethod
     def render(self):
-        pass
\ No newline at end of file
+        pass
+
+    def is_idle(self):
+        """
+        True when nothing on screen moves until the next event, so the main loop
+        may draw at its idle rate. Scenes animated by the clock keep the default.
+        """
+        return False
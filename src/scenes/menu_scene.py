@@ -37,6 +37,7 @@ class MenuScene(BaseScene, MenuSupportMixin):
         self.app.is_rendering = self.app.text_renderer.is_rendering()
         self.app.text_renderer.render()
         if self.input_mode == "menu" and not self.app.is_rendering:  # Only render the menu if rendering is complete
+            self.app.screen.mark_overlay_dirty()
             self._render_menu(self.app.screen.overlay, self.app.text_renderer)  # Pass overlay
         else:
             self.app.text_renderer.enable_cursor()  # Enable cursor when not in menu mode
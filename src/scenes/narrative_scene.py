@@ -19,6 +19,7 @@ class NarrativeScene(MenuScene, TextScene):
         )
 
     def enter(self):
+        self.app.text_renderer.set_backend(self.app.text_renderer.text_backend)
         self.chapter.load_content()
         self.menu_options = self.chapter.get_options()
         self.app.text_renderer.set_text(self.chapter.get_text())
@@ -13,32 +13,52 @@ from src.scenes.view_all_personnel_scene import ViewAllPersonnelScene
 from src.scenes.search_personnel_scene import SearchPersonnelScene
 from src.scenes.shell_scene import ShellScene
 from src.scenes.settings_scene import SettingsScene
+from src.scenes.scene_registry import SceneRegistry
 from src.narrative.narrative_chapter import NarrativeChapter
 
 class SceneFactory:
     @staticmethod
     def create_scenes(app, config):
-        return {
-            'settings_scene': SettingsScene(app),
-            'bootup_scene': BootupScene(app),
-            'termlink_boot_scene': TermlinkBootScene(app),
-            'login_scene': LoginScene(app, config.password),
-            'success_scene': SuccessScene(app),
-            'data_logs': DataLogsScene(app),
-            'personnel_records': PersonnelRecordsScene(app),
-            'security_controls': SecurityControlsScene(app),
-            'power_management': PowerManagementScene(app),
-            'view_all_personnel': ViewAllPersonnelScene(app),
-            'search_personnel': SearchPersonnelScene(app),
-            'vault_overseer': NarrativeScene(app, SceneFactory._load_chapter('vault_overseer.yaml')),
-            'research_log': NarrativeScene(app, SceneFactory._load_chapter('research_log.yaml')),
-            'business_terminal': NarrativeScene(app, SceneFactory._load_chapter('business_terminal.yaml')),
-            'vault149_medical_terminal': NarrativeScene(app, SceneFactory._load_chapter('vault149/medical_terminal.yaml')),
-            'vault149_overseer_terminal': NarrativeScene(app, SceneFactory._load_chapter('vault149/overseer_terminal.yaml')),
-            'vault149_security_terminal': NarrativeScene(app, SceneFactory._load_chapter('vault149/security_terminal.yaml')),
-            'vault_scene': VaultScene(app),
-            'shell_scene': ShellScene(app, app.shell_runner),
+        """
+        Returns the SceneRegistry of all scenes. Nothing is built here: each scene
+        (for narrative terminals, including parsing its chapter) is built when it
+        is first entered or prewarmed.
+        """
+        def narrative(yaml_file):
+            return lambda: NarrativeScene(app, SceneFactory._load_chapter(yaml_file))
+
+        factories = {
+            'settings_scene': lambda: SettingsScene(app),
+            'bootup_scene': lambda: BootupScene(app),
+            'termlink_boot_scene': lambda: TermlinkBootScene(app),
+            'login_scene': lambda: LoginScene(app, config.password),
+            'success_scene': lambda: SuccessScene(app),
+            'data_logs': lambda: DataLogsScene(app),
+            'personnel_records': lambda: PersonnelRecordsScene(app),
+            'security_controls': lambda: SecurityControlsScene(app),
+            'power_management': lambda: PowerManagementScene(app),
+            'view_all_personnel': lambda: ViewAllPersonnelScene(app),
+            'search_personnel': lambda: SearchPersonnelScene(app),
+            'vault_overseer': narrative('vault_overseer.yaml'),
+            'research_log': narrative('research_log.yaml'),
+            'business_terminal': narrative('business_terminal.yaml'),
+            'vault149_medical_terminal': narrative('vault149/medical_terminal.yaml'),
+            'vault149_overseer_terminal': narrative('vault149/overseer_terminal.yaml'),
+            'vault149_security_terminal': narrative('vault149/security_terminal.yaml'),
+            'vault_scene': lambda: VaultScene(app),
+            'shell_scene': lambda: ShellScene(app, app.shell_sessions),
+        }
+        after_boot = (config.scene_after_boot,)
+        successors = {
+            'termlink_boot_scene': after_boot,
+            'bootup_scene': after_boot,
+            'login_scene': ('success_scene',),
+            'success_scene': ('shell_scene', 'data_logs', 'personnel_records', 'security_controls',
+                              'power_management', 'vault_scene', 'login_scene'),
+            'data_logs': ('vault149_medical_terminal', 'vault149_security_terminal', 'vault149_overseer_terminal'),
+            'personnel_records': ('view_all_personnel', 'search_personnel'),
         }
+        return SceneRegistry(factories, successors)
 
     @staticmethod
     def _load_chapter(yaml_file):
@@ -0,0 +1,100 @@
+"""
+Scenes by name, built on first use instead of all at startup.
+
+Each scene is registered as a factory; the first lookup builds it and later
+lookups return the same instance, so start-up only pays for the first scene
+however many terminals ship. Scene constructors only set up state and parse
+data (no drawing), so a background worker can build the scenes likely to be
+entered next (prewarm) while the current one runs; a lookup that races the
+worker waits for its build instead of building twice.
+"""
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SceneRegistry:
+    """
+    Mapping of scene name -> scene, filled lazily from factories.
+    """
+
+    def __init__(self, factories, successors=None):
+        """
+        Initializes the SceneRegistry. No scene is built yet.
+
+        Args:
+            factories: Dict of scene name -> callable returning the scene.
+            successors: Dict of scene name -> names of the scenes usually entered
+                from it, built ahead by prewarm_next().
+        """
+        self._factories = dict(factories)
+        self._successors = dict(successors or {})
+        self._scenes = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}  # name -> lock held while that scene is built
+        self._queue = None  # names waiting for the prewarm worker, created with it
+
+    def __getitem__(self, name):
+        scene = self._scenes.get(name)
+        if scene is not None:
+            return scene
+        if name not in self._factories:
+            raise KeyError(name)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            scene = self._scenes.get(name)
+            if scene is None:
+                scene = self._factories[name]()
+                self._scenes[name] = scene
+        return scene
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def names(self):
+        """Returns the names of all registered scenes."""
+        return list(self._factories)
+
+    def items(self):
+        """Returns (name, scene) for the scenes built so far."""
+        return list(self._scenes.items())
+
+    def is_built(self, name):
+        """True once the scene has been built."""
+        return name in self._scenes
+
+    def prewarm(self, names):
+        """Builds the named scenes on the background worker (unknown names are ignored)."""
+        pending = [name for name in names if name in self._factories and name not in self._scenes]
+        if not pending:
+            return
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue()
+                threading.Thread(target=self._prewarm_loop, name="scene-prewarm", daemon=True).start()
+        for name in pending:
+            self._queue.put(name)
+
+    def prewarm_next(self, name):
+        """Prewarms the usual successors of scene `name`."""
+        self.prewarm(self._successors.get(name, ()))
+
+    def _prewarm_loop(self):
+        while True:
+            name = self._queue.get()
+            if name in self._scenes:
+                continue
+            try:
+                self[name]
+            except Exception:
+                # Built again (and the error raised) when the scene is entered.
+                logger.debug("prewarming %s failed", name, exc_info=True)
@@ -1,46 +1,189 @@
 """
 Shell scene: shows live output from a real shell and one input line at the bottom.
 Enter sends the line to the shell. No menus; no typewriter effect.
-Right-click pastes from clipboard (Linux-style).
+Right-click pastes from clipboard (Linux-style): a single line goes into the
+input line, multi-line text is streamed to the shell and run.
+Ctrl+F searches the scrollback: type to refine, Enter/F3 jumps to the next older
+hit, Shift+Enter/Shift+F3 to the next newer one, Esc leaves search.
+While a full-screen program (top, vim, less) holds the alternate screen, the
+emulated screen is drawn instead and every key goes straight to the program.
+Several shells can be open (see SessionPool): Ctrl+Shift+T opens one,
+Ctrl+Shift+W closes the current one, Alt+1..9 and Ctrl+PageUp/PageDown switch.
+With a session log, scrolling up past the oldest row pages older output back in
+from disk.
+Tab completes commands and paths from in-process caches (see Completer); when
+the word cannot be extended, the candidates are listed.
+Up/Down walk the command history, which all sessions share and which is kept
+across runs (see CommandHistory). Ctrl+R searches it backwards as you type:
+Ctrl+R again finds the next older match, Enter runs the match, Left/Right/End
+edit it, Esc or Ctrl+G restores the line as it was.
 """
+import time
+from collections import deque
+
 import pygame
 import pyperclip
 from src.scenes.base_scene import BaseScene
+from src.shell.completion import Completer
+from src.shell.session_log import LogScrollback
+
+# Keys sent to full-screen programs as escape sequences.
+_CURSOR_KEYS = {pygame.K_UP: "A", pygame.K_DOWN: "B", pygame.K_RIGHT: "C", pygame.K_LEFT: "D",
+                pygame.K_HOME: "H", pygame.K_END: "F"}
+_SPECIAL_KEYS = {
+    pygame.K_RETURN: "\r", pygame.K_KP_ENTER: "\r", pygame.K_BACKSPACE: "\x7f", pygame.K_TAB: "\t",
+    pygame.K_ESCAPE: "\x1b", pygame.K_INSERT: "\x1b[2~", pygame.K_DELETE: "\x1b[3~",
+    pygame.K_PAGEUP: "\x1b[5~", pygame.K_PAGEDOWN: "\x1b[6~",
+    pygame.K_F1: "\x1bOP", pygame.K_F2: "\x1bOQ", pygame.K_F3: "\x1bOR", pygame.K_F4: "\x1bOS",
+    pygame.K_F5: "\x1b[15~", pygame.K_F6: "\x1b[17~", pygame.K_F7: "\x1b[18~", pygame.K_F8: "\x1b[19~",
+    pygame.K_F9: "\x1b[20~",
+}
 
 
 class ShellScene(BaseScene):
-    def __init__(self, app, shell_runner):
+    INGEST_BUDGET_SEC = 0.004  # per-frame time for moving new output into the text view
+    INGEST_BATCH = 256  # lines appended per step of the ingest loop
+    COMPLETION_LIST_MAX = 100  # candidates listed after a Tab that could not extend the word
+
+    def __init__(self, app, sessions):
         super().__init__(app)
-        self.runner = shell_runner
-        self._last_line_count = 0
-        self._last_displayed_line = None  # content of last line, for \\r updates
+        self.sessions = sessions
+        self._cursor = 0  # ShellRunner.read_since cursor
+        self._backlog = deque()  # output lines read from the runner but not yet in the text view
+        self._pending_shown = ""  # in-progress line currently shown as the last row, for \\r updates
+        self._search_active = False
+        self._search_query = ""
+        self._history_search = None  # (query, match id or None, input before Ctrl+R) during reverse-i-search
+        self._screen_rows = None  # rows of the emulated screen while it is shown
+        self._completer = Completer()
+
+    @property
+    def runner(self):
+        """The foreground session's ShellRunner."""
+        return self.sessions.foreground.runner
 
     def enter(self):
+        self.app.text_renderer.set_backend(self.app.text_renderer.text_backend)
+        self._start_view()
+        self.app.is_rendering = False
+        self.app.state_transition = False
+
+    def _start_view(self):
+        """Fills the text view from the foreground session's scrollback."""
         self.runner.setwinsize(24, 80)
-        initial_lines = self.runner.get_output_lines()
+        lines, pending, self._cursor = self.runner.read_since(0)
+        initial_lines = lines + [pending] if pending else lines
         if not initial_lines:
-            initial_lines = ["Terminal ready."]
+            number = self.sessions.foreground.number
+            initial_lines = ["Terminal ready." if number == 1 else f"Terminal {number} ready."]
         self.app.text_renderer.set_text(initial_lines)
+        if self.runner.log is not None:
+            self.app.text_renderer.set_history(
+                LogScrollback(self.runner.log), first_seq=self._cursor - len(lines) if lines else None)
         self.app.text_renderer.finish_rendering()
-        self.app.is_rendering = False
-        self.app.state_transition = False
         self.app.input_handler.reset()
-        lines = self.runner.get_output_lines()
-        self._last_line_count = len(lines)
-        self._last_displayed_line = lines[-1] if lines else None
+        self._pending_shown = pending
+        self._screen_rows = None
+        self._search_active = False
+        self._search_query = ""
+        self._history_search = None
+        limit = self.app.text_renderer.scrollback_limit or self.runner.SCROLLBACK_LINES
+        self._backlog = deque(maxlen=limit)
+
+    def _park_view(self, session):
+        """Moves the view state of a session going to the background onto the session."""
+        self._end_history_search(accept=False)
+        session.view = {
+            "renderer": self.app.text_renderer.detach_view(),
+            "cursor": self._cursor,
+            "backlog": self._backlog,
+            "pending_shown": self._pending_shown,
+            "search_active": self._search_active,
+            "search_query": self._search_query,
+            "input": self.app.input_handler.get_user_input(),
+        }
+
+    def _show_session(self, session):
+        """
+        Shows the foreground session: its parked view comes back as it was and the
+        next update() ingests only what arrived while it was in the background.
+        """
+        view, session.view = session.view, None
+        self._screen_rows = None
+        if view is None:
+            self._start_view()
+            return
+        self.app.text_renderer.attach_view(view["renderer"])
+        self._cursor = view["cursor"]
+        self._backlog = view["backlog"]
+        self._pending_shown = view["pending_shown"]
+        self._search_active = view["search_active"]
+        self._search_query = view["search_query"]
+        self.app.input_handler.reset()
+        self.app.input_handler.set_user_input(view["input"])
+
+    def _handle_session_key(self, event):
+        """
+        Session hotkeys. Returns True when the key was one of them.
+        """
+        mod = event.mod
+        sessions = self.sessions
+        current = sessions.foreground
+        if mod & pygame.KMOD_CTRL and mod & pygame.KMOD_SHIFT and event.key in (pygame.K_t, pygame.K_w):
+            if event.key == pygame.K_t:
+                if sessions.spawn() is None:
+                    return True  # pool full
+                self._park_view(current)
+            else:
+                sessions.close(current)
+            self._show_session(sessions.foreground)
+            return True
+        target = None
+        if mod & pygame.KMOD_ALT and pygame.K_1 <= event.key <= pygame.K_9:
+            target = sessions.get(event.key - pygame.K_0)
+        elif mod & pygame.KMOD_CTRL and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+            target = sessions.neighbour(-1 if event.key == pygame.K_PAGEUP else 1)
+        else:
+            return False
+        if target is not None and target is not current:
+            self._park_view(current)
+            sessions.switch(target)
+            self._show_session(target)
+        return True
 
     def handle_event(self, event):
         if event.type == pygame.QUIT:
             return True
         if event.type == pygame.USEREVENT:
             return False
+        if event.type == pygame.KEYDOWN and self._handle_session_key(event):
+            return False
+        if self.runner.screen_active():
+            self._handle_screen_event(event)
+            return False
+        if event.type == pygame.KEYDOWN and self._search_active:
+            self._handle_search_key(event)
+            return False
+        if event.type == pygame.KEYDOWN and self._history_search is not None:
+            self._handle_history_search_key(event)
+            return False
         if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_f and (event.mod & pygame.KMOD_CTRL):
+                self._search_active = True
+                self._search_query = ""
+                return False
+            if event.key == pygame.K_r and (event.mod & pygame.KMOD_CTRL):
+                self._history_search = ("", None, self.app.input_handler.get_user_input())
+                return False
             if event.key == pygame.K_PAGEUP:
                 self.app.text_renderer.scroll_page_up()
                 return False
             if event.key == pygame.K_PAGEDOWN:
                 self.app.text_renderer.scroll_page_down()
                 return False
+            if event.key == pygame.K_TAB:
+                self._complete()
+                return False
             if event.key == pygame.K_UP:
                 prev = self.runner.history_prev()
                 if prev is not None:
@@ -53,6 +196,11 @@ class ShellScene(BaseScene):
                 return False
             if event.key == pygame.K_c and (event.mod & pygame.KMOD_CTRL):
                 self.runner.send_interrupt()
+                if self._pending_shown:
+                    # Shown again below "^C" by the next update, so later \r updates
+                    # and the completed line replace that row, not "^C".
+                    self.app.text_renderer.remove_last_line(notify=False)
+                    self._pending_shown = ""
                 self.app.text_renderer.append_lines_instant(["^C"])
                 return False
             if event.key == pygame.K_m and (event.mod & pygame.KMOD_ALT):
@@ -62,11 +210,7 @@ class ShellScene(BaseScene):
             try:
                 pasted = pyperclip.paste()
                 if pasted and isinstance(pasted, str):
-                    # One line: append to current input (newlines become spaces)
-                    line = pasted.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
-                    self.app.input_handler.set_user_input(
-                        self.app.input_handler.get_user_input() + line
-                    )
+                    self._paste(pasted)
             except (pyperclip.PyperclipException, Exception):
                 pass
             return False
@@ -75,28 +219,240 @@ class ShellScene(BaseScene):
             self._handle_enter_pressed()
         return False
 
+    def _handle_screen_event(self, event):
+        """Full-screen program: keys and pastes go to the terminal unchanged."""
+        if event.type == pygame.KEYDOWN:
+            data = self._encode_key(event)
+            if data:
+                self.runner.write_raw(data)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+            try:
+                pasted = pyperclip.paste()
+                if pasted and isinstance(pasted, str):
+                    self.runner.paste(pasted)
+            except (pyperclip.PyperclipException, Exception):
+                pass
+
+    def _encode_key(self, event):
+        """Returns the bytes a terminal sends for a key press, as text."""
+        if event.key in _CURSOR_KEYS:
+            prefix = "\x1bO" if self.runner.screen.application_cursor_keys else "\x1b["
+            return prefix + _CURSOR_KEYS[event.key]
+        if event.key in _SPECIAL_KEYS:
+            return _SPECIAL_KEYS[event.key]
+        if event.mod & pygame.KMOD_CTRL and pygame.K_a <= event.key <= pygame.K_z:
+            return chr(event.key - pygame.K_a + 1)
+        text = event.unicode
+        if text and event.mod & pygame.KMOD_ALT:
+            return "\x1b" + text
+        return text
+
+    def _paste(self, pasted):
+        """
+        One line is appended to the input line. Multi-line text is sent with what
+        was already typed, up to the last line break, as one paste that is then
+        run; the shell streams it in chunks, so a large script never stalls a
+        frame. Text after the last line break stays in the input line.
+        """
+        input_handler = self.app.input_handler
+        end = max(pasted.rfind("\n"), pasted.rfind("\r"))
+        if end < 0:
+            input_handler.set_user_input(input_handler.get_user_input() + pasted)
+            return
+        head = pasted[:end - 1] if pasted[end - 1:end + 1] == "\r\n" else pasted[:end]
+        self.runner.paste(input_handler.get_user_input() + head, submit=True)
+        input_handler.set_user_input(pasted[end + 1:])
+        self.app.text_renderer.scroll_to_bottom()
+
+    def _complete(self):
+        """
+        Tab: extends the last word of the input line. When it cannot be extended
+        and several candidates match, they are listed below the output with the
+        prompt shown again under them, as shells do.
+        """
+        input_handler = self.app.input_handler
+        line = input_handler.get_user_input()
+        completed, candidates = self._completer.complete(line, self.runner.cwd())
+        input_handler.set_user_input(completed)
+        if not candidates or completed != line:
+            return
+        listing = "  ".join(candidates[:self.COMPLETION_LIST_MAX])
+        if len(candidates) > self.COMPLETION_LIST_MAX:
+            listing += f"  ... {len(candidates) - self.COMPLETION_LIST_MAX} more"
+        renderer = self.app.text_renderer
+        renderer.append_lines_instant([listing, self._pending_shown] if self._pending_shown else [listing])
+        renderer.scroll_to_bottom()
+
+    def _handle_search_key(self, event):
+        renderer = self.app.text_renderer
+        if event.key == pygame.K_ESCAPE or (event.key == pygame.K_f and (event.mod & pygame.KMOD_CTRL)):
+            self._search_active = False
+            renderer.clear_search()
+            renderer.scroll_to_bottom()
+        elif event.key in (pygame.K_RETURN, pygame.K_F3):
+            if event.mod & pygame.KMOD_SHIFT:
+                renderer.search_prev()
+            else:
+                renderer.search_next()
+        elif event.key == pygame.K_BACKSPACE:
+            self._search_query = self._search_query[:-1]
+            renderer.search(self._search_query)
+        elif event.key == pygame.K_PAGEUP:
+            renderer.scroll_page_up()
+        elif event.key == pygame.K_PAGEDOWN:
+            renderer.scroll_page_down()
+        elif event.unicode and event.unicode.isprintable():
+            self._search_query += event.unicode
+            renderer.search(self._search_query)
+
+    def _search_prompt(self):
+        current, total = self.app.text_renderer.get_search_status()
+        if not self._search_query:
+            return "(search): "
+        if not total:
+            return f"(failed search)'{self._search_query}': "
+        return f"(search {current}/{total})'{self._search_query}': "
+
+    def _handle_history_search_key(self, event):
+        query, match, original = self._history_search
+        history = self.runner.history
+        ctrl = event.mod & pygame.KMOD_CTRL
+        if event.key == pygame.K_ESCAPE or (event.key == pygame.K_g and ctrl):
+            self._end_history_search(accept=False)
+        elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            self._end_history_search(accept=True)
+            self._handle_enter_pressed()
+        elif event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_END, pygame.K_HOME, pygame.K_TAB):
+            self._end_history_search(accept=True)
+        elif event.key == pygame.K_r and ctrl:
+            if query and match is not None:
+                found = history.search(query, before=match[0])
+                if found is not None:
+                    self._history_search = (query, found, original)
+        elif event.key == pygame.K_BACKSPACE:
+            query = query[:-1]
+            self._history_search = (query, history.search(query) if query else None, original)
+        elif event.unicode and event.unicode.isprintable() and not ctrl:
+            query += event.unicode
+            # Typing keeps the current match while it still contains the query, as readline does.
+            if match is not None and query.lower() in match[1].lower():
+                found = history.search(query, before=match[0] + 1)
+            else:
+                found = history.search(query)
+            self._history_search = (query, found, original)
+
+    def _end_history_search(self, accept):
+        """
+        Leaves reverse-i-search. Accepting puts the match in the input line and
+        continues Up/Down from it; otherwise the input line is left as it was.
+        """
+        if self._history_search is None:
+            return
+        _, match, original = self._history_search
+        self._history_search = None
+        if accept and match is not None:
+            self.app.input_handler.set_user_input(match[1])
+            self.runner.set_history_cursor(match[0])
+        else:
+            self.app.input_handler.set_user_input(original)
+
+    def _history_search_prompt(self):
+        query, match, _ = self._history_search
+        if query and match is None:
+            return f"(failed reverse-i-search)'{query}': "
+        return f"(reverse-i-search)'{query}': {match[1] if match else ''}"
+
     def _handle_enter_pressed(self):
         user_input = self.app.input_handler.get_user_input()
         if user_input:
             self.runner.write(user_input)
         self.app.input_handler.reset()
+        self.app.text_renderer.scroll_to_bottom()
 
     def update(self):
         self.app.input_handler.update()
-        lines = self.runner.get_output_lines()
-        if len(lines) > self._last_line_count:
-            new_lines = lines[self._last_line_count:]
-            self.app.text_renderer.append_lines_instant(new_lines)
-            self.app.text_renderer.scroll_to_bottom()
-            self._last_line_count = len(lines)
-            self._last_displayed_line = lines[-1] if lines else None
-        elif lines and len(lines) == self._last_line_count and lines[-1] != self._last_displayed_line:
-            self.app.text_renderer.replace_last_line(lines[-1])
-            self._last_displayed_line = lines[-1]
+        cursor = self._cursor
+        new_lines, pending, self._cursor = self.runner.read_since(cursor)
+        if self._cursor - cursor > len(new_lines):
+            self._backlog.clear()  # output was lost in between; keep the queue contiguous
+        self._backlog.extend(new_lines)
+        self._ingest(pending)
+
+    def _ingest(self, pending):
+        """
+        Moves queued output into the text view, spending at most INGEST_BUDGET_SEC
+        per frame; the rest waits for the next frame. A burst costs one append per
+        batch and one scroll and output notification per frame, and when more is
+        queued than the scrollback holds, the oldest lines fall off the queue
+        without ever being wrapped. The in-progress (\\r-updated) line is shown at
+        most once per frame, after the queue has drained. Each batch is appended
+        with the sequence number of its first line, for paging in the session log.
+        The view follows new output only while it is at the bottom, so history
+        being read stays put.
+        """
+        renderer = self.app.text_renderer
+        follow = renderer.is_at_bottom()
+        backlog = self._backlog
+        appended = changed = False
+        deadline = time.perf_counter() + self.INGEST_BUDGET_SEC
+        while backlog:
+            seq = self._cursor - len(backlog)
+            batch = [backlog.popleft() for _ in range(min(len(backlog), self.INGEST_BATCH))]
+            if self._pending_shown:
+                # The row showing the in-progress line becomes its completed version.
+                renderer.replace_last_line(batch[0], notify=False)
+                batch = batch[1:]
+                seq += 1
+                self._pending_shown = ""
+            renderer.append_lines_instant(batch, notify=False, first_seq=seq)
+            appended = changed = True
+            if time.perf_counter() >= deadline:
+                break
+        if not backlog and pending != self._pending_shown:
+            if not pending:
+                renderer.remove_last_line(notify=False)  # the line was erased; no blank row is left
+            elif self._pending_shown:
+                renderer.replace_last_line(pending, notify=False)
+            else:
+                renderer.append_lines_instant([pending], notify=False)
+                appended = True
+            self._pending_shown = pending
+            changed = True
+        if changed and renderer.on_output_added:
+            renderer.on_output_added()
+        if appended and follow and not self._search_active:
+            renderer.scroll_to_bottom()
+
+    def is_idle(self):
+        """Idle once all output is in the view, nothing is scrolling and no key is repeating.
+        New output wakes the loop through the runner's on_output.
+        """
+        if self._backlog or getattr(self.app.input_handler, "backspace_pressed", False):
+            return False
+        return not self.app.text_renderer.is_animating()
 
     def render(self):
         self.app.text_renderer.enable_cursor()
-        self.app.text_renderer.set_user_input_text(self.app.input_handler.get_user_input())
+        if self.runner.screen_active():
+            self._render_screen()
+            return
+        self._screen_rows = None
+        if self._search_active:
+            self.app.text_renderer.set_user_input_text(self._search_prompt())
+        elif self._history_search is not None:
+            self.app.text_renderer.set_user_input_text(self._history_search_prompt())
+        else:
+            self.app.text_renderer.set_user_input_text(self.app.input_handler.get_user_input())
         self.app.text_renderer.update()
         self.app.is_rendering = self.app.text_renderer.is_rendering()
         self.app.text_renderer.render()
+
+    def _render_screen(self):
+        """Draws the emulated screen, refreshing only the rows the program changed."""
+        rows, cursor, (height, _width) = self.runner.read_screen(full=self._screen_rows is None)
+        if self._screen_rows is None or len(self._screen_rows) != height:
+            self._screen_rows = [""] * height
+        for y, line in rows.items():
+            self._screen_rows[y] = line
+        self.app.is_rendering = False
+        self.app.text_renderer.render_rows(self._screen_rows, cursor)
@@ -1,12 +1,15 @@
 """
 Pip-Boy style Termlink boot sequence: Phase 0 = brief Robco OS ASCII, Phase 1 = kernel scroll,
 Phase 2 = system loader diagnostic with typewriter, Phase 3 = scroll off then terminal.
+The phases are purely visual, so the app's boot warm-up (see src.app.warmup) runs
+alongside them: worker threads in the background, main-thread tasks a slice per frame.
 """
 import random
 import time
 import pygame
 from src.scenes.base_scene import BaseScene
 from src.app.constants import BLACK
+from src.rendering.scroll_strip import ScrollStrip
 
 # Opaque black for overlay (required for SRCALPHA surface + CRT shader)
 BLACK_OPAQUE = (0, 0, 0, 255)
@@ -193,6 +196,7 @@ class TermlinkBootScene(BaseScene):
     PHASE3_DELAY_AFTER_TYPING_SEC = 1.0  # pause before scroll-off starts
     PHASE3_SCROLL_SPEED = 1200  # pixels per second (scroll Phase 2 content up and off)
     PHASE3_DELAY_AFTER_WIPE_SEC = 0.5   # pause after wipe before terminal appears
+    WARMUP_MAIN_DELAY_SEC = 0.1  # main-thread warm-up starts once the splash is on screen
 
     def __init__(self, app):
         super().__init__(app)
@@ -201,6 +205,7 @@ class TermlinkBootScene(BaseScene):
         self._black_until_sec = None
         self._phase1_lines = []  # full lines only (kernel log)
         self._phase1_scroll_y = 0.0  # smooth pixel offset (increases each frame)
+        self._phase1_strip = None  # pre-rendered rows; only the leading edge is rendered per frame
         self._phase1_last_tick_ms = 0
         self._phase1_next_batch_ms = 0
         self._phase2_line_index = 0
@@ -213,6 +218,7 @@ class TermlinkBootScene(BaseScene):
         self._phase3_wipe_sound_played = False
         self._phase3_wipe_done_sec = None
         self._phase3_lines = []
+        self._warmup = None  # the app's WarmupScheduler, or None
 
     def enter(self):
         self._phase = 0
@@ -220,6 +226,7 @@ class TermlinkBootScene(BaseScene):
         self._black_until_sec = None
         self._phase1_lines = []
         self._phase1_scroll_y = 0.0
+        self._phase1_strip = ScrollStrip(self.app.text_renderer.line_height or 30)
         self._phase1_last_tick_ms = pygame.time.get_ticks()
         self._phase1_next_batch_ms = self._phase1_last_tick_ms
         # Pre-seed one batch for when Phase 1 starts
@@ -243,6 +250,7 @@ class TermlinkBootScene(BaseScene):
         # Phase 2 char_delay is set when Phase 2 starts (from PHASE2_TARGET_DURATION_SEC)
         self.app.text_renderer.centered_line_indices = {0}  # center welcome line in Phase 2
         self._saved_on_output_added = self.app.text_renderer.on_output_added
+        self._warmup = self.app.start_warmup()
 
     def _on_phase2_line_finished(self):
         """Append next Phase 2 line when typewriter finishes current line. No return sound in Phase 2."""
@@ -273,6 +281,8 @@ class TermlinkBootScene(BaseScene):
 
     def update(self):
         t = pygame.time.get_ticks() / 1000.0 - self._start_time_sec
+        if self._warmup is not None and t >= self.WARMUP_MAIN_DELAY_SEC:
+            self._warmup.run_main()
 
         if self._phase == 0:
             if t >= self.PHASE0_DURATION:
@@ -361,6 +371,8 @@ class TermlinkBootScene(BaseScene):
                 if self._phase3_wipe_done_sec is None:
                     self._phase3_wipe_done_sec = t
                 if t - self._phase3_wipe_done_sec >= self.PHASE3_DELAY_AFTER_WIPE_SEC:
+                    if self._warmup is not None:
+                        self._warmup.run_main(budget_sec=None)  # GL work left over; workers may still run
                     self.app.set_scene(self.app.config.scene_after_boot)
 
     def render(self):
@@ -415,22 +427,22 @@ class TermlinkBootScene(BaseScene):
             self._phase1_lines.append(line)
 
     def _render_phase1(self):
-        """Kernel-style boot: smooth pixel scroll, full lines only (no typing effect)."""
+        """Kernel-style boot: smooth pixel scroll, full lines only (no typing effect).
+        Rows come from a scroll strip, so a frame only renders rows entering at the bottom."""
         overlay = self.app.screen.overlay
         overlay.fill(BLACK_OPAQUE)
+        margin_y = self.app.text_renderer.margin[1] if self.app.text_renderer.margin else 50
+        self._phase1_strip.render(
+            overlay, 0, 0, overlay.get_width(), overlay.get_height(),
+            int(self._phase1_scroll_y) - margin_y, len(self._phase1_lines),
+            self._phase1_lines.__getitem__, self._draw_phase1_row,
+        )
+
+    def _draw_phase1_row(self, surface, row, y):
         font = self.app.text_renderer.font
         color = self.app.text_renderer.color
-        line_height = self.app.text_renderer.line_height or 30
         margin_x = self.app.text_renderer.margin[0] if self.app.text_renderer.margin else 50
-        margin_y = self.app.text_renderer.margin[1] if self.app.text_renderer.margin else 50
-        h = overlay.get_height()
-
-        for i, line in enumerate(self._phase1_lines):
-            y = margin_y + i * line_height - self._phase1_scroll_y
-            if y < -line_height or y > h + line_height:
-                continue
-            surf = font.render(line, True, color)
-            overlay.blit(surf, (margin_x, int(y)))
+        surface.blit(font.render(self._phase1_lines[row], True, color), (margin_x, y))
 
     def _render_phase3(self):
         """Scroll Phase 2 lines up and off the screen."""
@@ -1,3 +1,5 @@
+from src.shell.session_pool import SessionPool
+from src.shell.shell_host import RemoteShellRunner
 from src.shell.shell_runner import ShellRunner
 
-__all__ = ["ShellRunner"]
+__all__ = ["RemoteShellRunner", "SessionPool", "ShellRunner"]
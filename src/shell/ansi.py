@@ -0,0 +1,199 @@
+"""
+ANSI SGR (Select Graphic Rendition) support: text styles and attributed lines.
+
+A StyledLine is a str that also carries `runs`, a tuple of (start, end, Style)
+spans, so code that only cares about the text (wrapping, search, comparisons)
+keeps working unchanged while renderers can draw it run by run.
+"""
+from collections import namedtuple
+
+
+def _build_palette():
+    """xterm 256-color palette as RGB tuples."""
+    base = [
+        (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+        (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+        (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+        (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+    ]
+    levels = [0, 95, 135, 175, 215, 255]
+    cube = [(levels[r], levels[g], levels[b]) for r in range(6) for g in range(6) for b in range(6)]
+    grays = [(8 + 10 * i,) * 3 for i in range(24)]
+    return base + cube + grays
+
+
+PALETTE = _build_palette()
+BLACK = (0, 0, 0)
+
+
+class Style(namedtuple("Style", "fg bg bold inverse")):
+    """
+    Text attributes of a run. fg/bg are None (terminal default), a palette index
+    (0-255) or an (r, g, b) tuple.
+    """
+    __slots__ = ()
+
+    def resolve(self, default_fg, default_bg=BLACK):
+        """
+        Returns (fg, bg) as RGB tuples for rendering; bg is None when it is the
+        default background, so the text can be drawn without a fill.
+        """
+        fg = self.fg
+        if self.bold and isinstance(fg, int) and fg < 8:
+            fg += 8  # bold renders as the bright variant, like most terminals
+        fg = default_fg if fg is None else _to_rgb(fg)
+        bg = None if self.bg is None else _to_rgb(self.bg)
+        if self.inverse:
+            fg, bg = (bg if bg is not None else default_bg), fg
+        return fg, bg
+
+
+DEFAULT_STYLE = Style(None, None, False, False)
+
+
+def _to_rgb(color):
+    if isinstance(color, tuple):
+        return color
+    return PALETTE[color % 256]
+
+
+def _extended_color(params, i):
+    """
+    Parses a 38/48 extended color starting at params[i] (the 5 or 2 selector).
+    Returns (color, next index).
+    """
+    if i < len(params) and params[i] == 5 and i + 1 < len(params):
+        return params[i + 1] % 256, i + 2
+    if i < len(params) and params[i] == 2 and i + 3 < len(params):
+        r, g, b = (max(0, min(255, v)) for v in params[i + 1:i + 4])
+        return (r, g, b), i + 4
+    return None, len(params)
+
+
+def _sub_color(sub):
+    """
+    Parses the ":" form of a 38/48 extended color from its sub-parameters:
+    5:n, 2:r:g:b, or ITU 2:colorspace:r:g:b (colorspace often left empty).
+    """
+    if sub[0] == 5 and len(sub) >= 2:
+        return sub[1] % 256
+    if sub[0] == 2 and len(sub) >= 4:
+        return tuple(max(0, min(255, v)) for v in sub[-3:])
+    return None
+
+
+def apply_sgr(style, params):
+    """
+    Applies the parameters of one `CSI ... m` sequence to a style.
+
+    Args:
+        style: Current Style.
+        params: List of integer parameters (empty means reset). Parameters with
+            ":" sub-parameters carry them in `sub`; they only matter for 38/48.
+
+    Returns:
+        Style: The updated style.
+    """
+    if not params:
+        return DEFAULT_STYLE
+    fg, bg, bold, inverse = style
+    i = 0
+    while i < len(params):
+        p = params[i]
+        i += 1
+        if p == 0:
+            fg, bg, bold, inverse = DEFAULT_STYLE
+        elif p == 1:
+            bold = True
+        elif p == 22:
+            bold = False
+        elif p == 7:
+            inverse = True
+        elif p == 27:
+            inverse = False
+        elif 30 <= p <= 37:
+            fg = p - 30
+        elif 90 <= p <= 97:
+            fg = p - 90 + 8
+        elif p == 39:
+            fg = None
+        elif 40 <= p <= 47:
+            bg = p - 40
+        elif 100 <= p <= 107:
+            bg = p - 100 + 8
+        elif p == 49:
+            bg = None
+        elif p == 38 or p == 48:
+            sub = getattr(p, "sub", None)
+            if sub:
+                color = _sub_color(sub)
+            else:
+                color, i = _extended_color(params, i)
+            if color is not None:
+                if p == 38:
+                    fg = color
+                else:
+                    bg = color
+    return Style(fg, bg, bold, inverse)
+
+
+class StyledLine(str):
+    """
+    A line of text plus its attributed runs: a tuple of (start, end, Style)
+    spans covering the whole text.
+    """
+
+    def __new__(cls, text, runs=()):
+        obj = super().__new__(cls, text)
+        obj.runs = tuple(runs)
+        return obj
+
+    def iter_runs(self):
+        """Yields (text, Style) for each run."""
+        for start, end, style in self.runs:
+            yield str.__getitem__(self, slice(start, end)), style
+
+    def slice(self, start, end):
+        """
+        Returns the [start:end] part of the line with its runs clipped to it.
+        Falls back to a plain str when the part has no styling.
+        """
+        text = str.__getitem__(self, slice(start, end))
+        runs = []
+        for run_start, run_end, style in self.runs:
+            lo = max(run_start, start)
+            hi = min(run_end, end)
+            if lo < hi:
+                runs.append((lo - start, hi - start, style))
+        return make_line(text, runs)
+
+
+def make_line(text, runs):
+    """
+    Builds a StyledLine from text and runs, or returns the plain str when every
+    run uses the default style.
+    """
+    if all(style == DEFAULT_STYLE for _, _, style in runs):
+        return str(text)
+    return StyledLine(text, runs)
+
+
+def join_segments(segments):
+    """
+    Joins (text, Style) segments into a single line, merging neighbours that
+    share a style.
+    """
+    parts = []
+    runs = []
+    pos = 0
+    for text, style in segments:
+        if not text:
+            continue
+        end = pos + len(text)
+        if runs and runs[-1][2] == style:
+            runs[-1] = (runs[-1][0], end, style)
+        else:
+            runs.append((pos, end, style))
+        parts.append(text)
+        pos = end
+    return make_line("".join(parts), runs)
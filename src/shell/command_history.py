@@ -0,0 +1,261 @@
+"""
+Command history shared by the shell sessions: deduplicated, kept across runs in
+an append-only file, and searchable by substring for reverse-i-search.
+
+Every add() gets a new id; re-entering a command moves it to the newest id and
+leaves a hole at the old one, so navigation and search walk ids and skip holes.
+Only live ids are stored, so holes cost nothing but the walk.
+A trigram index (trigram -> ascending ids) narrows a substring search to the
+few candidates that can match; ids of holes left in the postings are skipped,
+and pruned once they outnumber the entries.
+The index of the loaded file is built on a background thread; until it is
+ready, and for ids added since, search scans the commands directly.
+The file gets one JSON string per line and is rewritten without duplicates on
+load once they make up more than half of it.
+"""
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+
+class CommandHistory:
+    """
+    Commands in order of last use, oldest first.
+    """
+
+    MAX_ENTRIES = 50000
+
+    def __init__(self, path=None, max_entries=None):
+        """
+        Initializes the CommandHistory and loads the file.
+
+        Args:
+            path: History file ("~" is expanded), or None to keep history in memory only.
+            max_entries: Commands kept; older ones are forgotten (default MAX_ENTRIES).
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._by_id = {}  # live id -> command; superseded and forgotten ids are removed
+        self._lowered = {}  # live id -> lowercased command, for case-insensitive search
+        self._ids = {}  # command -> its current id
+        self._next_id = 0  # id the next add() gets
+        self._postings = {}  # trigram -> array of ascending ids
+        self._indexed = 0  # ids below this are in _postings
+        self._stale = 0  # indexed ids removed since the postings were last pruned
+        self._oldest = 0  # no live id is below this
+        self._lock = threading.Lock()  # between _add and the background index build
+        self._file = None
+        if self.path:
+            self._load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, command):
+        """
+        Records a command as the newest entry (moving it if it was there before)
+        and appends it to the file.
+        """
+        self._add(command)
+        if self._file is not None:
+            try:
+                self._file.write(json.dumps(command) + "\n")
+                self._file.flush()
+            except OSError:
+                logger.debug("history write failed", exc_info=True)
+
+    def get(self, entry_id):
+        """Returns the command with this id, or None."""
+        if entry_id is None:
+            return None
+        return self._by_id.get(entry_id)
+
+    def older(self, entry_id=None):
+        """Returns the id of the entry before entry_id (the newest one for None), or None."""
+        i = self._next_id if entry_id is None else entry_id
+        by_id = self._by_id
+        while i > self._oldest:
+            i -= 1
+            if i in by_id:
+                return i
+        return None
+
+    def newer(self, entry_id):
+        """Returns the id of the entry after entry_id, or None at the newest one."""
+        by_id = self._by_id
+        i = entry_id + 1
+        while i < self._next_id:
+            if i in by_id:
+                return i
+            i += 1
+        return None
+
+    def search(self, query, before=None):
+        """
+        Finds the newest entry containing query (case-insensitive) with an id
+        below `before` (default: all entries).
+
+        Returns:
+            tuple: (id, command), or None when nothing older matches.
+        """
+        needle = query.lower()
+        end = self._next_id if before is None else min(before, self._next_id)
+        by_id, lowered = self._by_id, self._lowered
+        indexed, index = self._indexed, self._postings  # in this order: index covers at least `indexed`
+        if len(needle) < 3:
+            indexed = 0
+        for entry_id in range(end - 1, max(indexed, self._oldest) - 1, -1):
+            text = lowered.get(entry_id)
+            if text is not None and needle in text:
+                return entry_id, by_id[entry_id]
+        if not indexed:
+            return None
+        postings = None
+        for trigram in self._trigrams(needle):
+            ids = index.get(trigram)
+            if ids is None:
+                return None
+            if postings is None or len(ids) < len(postings):
+                postings = ids
+        for i in range(bisect.bisect_left(postings, min(end, indexed)) - 1, -1, -1):
+            entry_id = postings[i]
+            if entry_id < self._oldest:
+                break
+            text = lowered.get(entry_id)
+            if text is not None and needle in text:
+                return entry_id, by_id[entry_id]
+        return None
+
+    def close(self):
+        """Closes the history file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _add(self, command):
+        previous = self._ids.get(command)
+        if previous is not None:
+            self._remove(previous)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._ids[command] = entry_id
+        self._by_id[entry_id] = command
+        self._lowered[entry_id] = command.lower()
+        while len(self._ids) > self.max_entries:
+            self._forget_oldest()
+        with self._lock:
+            if self._indexed == entry_id:
+                self._index(entry_id)
+                self._indexed = entry_id + 1
+            if self._stale > len(self._ids):
+                self._prune_postings()
+
+    def _remove(self, entry_id):
+        """Drops a superseded or forgotten id; its postings are pruned later."""
+        del self._by_id[entry_id]
+        del self._lowered[entry_id]
+        if entry_id < self._indexed:
+            self._stale += 1
+
+    def _forget_oldest(self):
+        entry_id = self._oldest
+        while entry_id not in self._by_id:
+            entry_id += 1
+        del self._ids[self._by_id[entry_id]]
+        self._remove(entry_id)
+        self._oldest = entry_id + 1
+
+    def _prune_postings(self):
+        """Removes the ids of superseded and forgotten entries from the postings."""
+        by_id = self._by_id
+        postings = {}
+        for trigram, ids in self._postings.items():
+            live = array("l", (entry_id for entry_id in ids if entry_id in by_id))
+            if live:
+                postings[trigram] = live
+        self._postings = postings
+        self._stale = 0
+
+    def _load(self):
+        commands = {}  # command -> None, in order of last use
+        lines = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        command = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if isinstance(command, str) and command:
+                        commands.pop(command, None)
+                        commands[command] = None
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.debug("history read failed", exc_info=True)
+        self._by_id = dict(enumerate(list(commands)[-self.max_entries:]))
+        self._lowered = {entry_id: command.lower() for entry_id, command in self._by_id.items()}
+        self._ids = {command: entry_id for entry_id, command in self._by_id.items()}
+        self._next_id = len(self._by_id)
+        threading.Thread(target=self._build_index, args=(self._next_id,), name="history-index",
+                         daemon=True).start()
+        if lines > 2 * len(self._ids):
+            self._rewrite()
+        try:
+            self._file = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            logger.debug("history file unavailable", exc_info=True)
+
+    def _index(self, entry_id):
+        lowered = self._lowered.get(entry_id)
+        if lowered is None:
+            return
+        for trigram in self._trigrams(lowered):
+            ids = self._postings.get(trigram)
+            if ids is None:
+                ids = self._postings[trigram] = array("l")
+            ids.append(entry_id)
+
+    def _build_index(self, count):
+        """Indexes the first `count` ids in the background, then catches up and takes over."""
+        postings = {}
+        lowered = self._lowered
+        for entry_id in range(count):
+            text = lowered.get(entry_id)
+            if text is None:
+                continue
+            for i in range(len(text) - 2):
+                ids = postings.get(text[i:i + 3])
+                if ids is None:
+                    postings[text[i:i + 3]] = [entry_id]
+                elif ids[-1] != entry_id:
+                    ids.append(entry_id)
+        postings = {trigram: array("l", ids) for trigram, ids in postings.items()}
+        with self._lock:
+            self._postings = postings
+            for entry_id in range(count, self._next_id):
+                self._index(entry_id)
+            self._indexed = self._next_id
+
+    def _rewrite(self):
+        """Replaces the file with one line per entry, oldest first."""
+        directory = os.path.dirname(self.path) or "."
+        try:
+            fd, temp = tempfile.mkstemp(dir=directory, prefix=".history-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for command in self._by_id.values():
+                    f.write(json.dumps(command) + "\n")
+            os.replace(temp, self.path)
+        except OSError:
+            logger.debug("history compaction failed", exc_info=True)
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
@@ -0,0 +1,254 @@
+"""
+Tab completion of commands and paths for ShellScene, served from in-process
+caches so a keystroke never waits on a subprocess or on the child shell.
+
+CommandIndex holds the executables on $PATH as one sorted list, so a prefix
+lookup is two bisections. It is built on a background thread and refreshed
+there: every RECHECK_INTERVAL a lookup schedules a pass that stats the PATH
+directories and rescans only those whose mtime changed. DirectoryCache keeps
+recent directory listings for TTL seconds. Completer splits the input line,
+picks the source, and extends the word to the longest common prefix.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_WINDOWS = sys.platform == "win32"
+_COMMAND_SEPARATORS = ("|", ";", "&", "(", "`")
+_SHELL_SPECIAL = set(" \t'\"\\$&;|()<>*?!#`")  # escaped with a backslash on POSIX
+
+
+def _fold(name):
+    """Comparison key of a name: case-insensitive on Windows."""
+    return name.lower() if _WINDOWS else name
+
+
+def _escape(name):
+    """Quotes a name for a POSIX shell word; cmd.exe words are left as they are."""
+    if _WINDOWS:
+        return name
+    return "".join("\\" + ch if ch in _SHELL_SPECIAL else ch for ch in name)
+
+
+def _split_word(line):
+    """Splits line into (head, word) at the last whitespace not escaped by a backslash;
+    the word is returned unescaped.
+    """
+    i = len(line)
+    while i > 0:
+        ch = line[i - 1]
+        if ch in " \t":
+            escaped = 0
+            while i - 2 - escaped >= 0 and line[i - 2 - escaped] == "\\":
+                escaped += 1
+            if _WINDOWS or escaped % 2 == 0:
+                break
+        i -= 1
+    word = line[i:]
+    if not _WINDOWS:
+        chars = []
+        it = iter(word)
+        for ch in it:
+            chars.append(next(it, "") if ch == "\\" else ch)
+        word = "".join(chars)
+    return line[:i], word
+
+
+def _prefix_range(keys, prefix):
+    """Returns (lo, hi) of the entries of sorted keys that start with prefix."""
+    lo = bisect.bisect_left(keys, prefix)
+    hi = bisect.bisect_left(keys, prefix + "\U0010ffff", lo)
+    return lo, hi
+
+
+class CommandIndex:
+    """
+    Names of the executables in the $PATH directories, for command completion.
+    """
+
+    RECHECK_INTERVAL = 5.0  # seconds between checks of the PATH directories' mtimes
+
+    def __init__(self, path=None):
+        """
+        Initializes the CommandIndex and starts the first scan in the background.
+
+        Args:
+            path: Search path to index (default: $PATH).
+        """
+        path = os.environ.get("PATH", "") if path is None else path
+        self._dirs = list(dict.fromkeys(d for d in path.split(os.pathsep) if d))
+        self._extensions = tuple(
+            ext.lower() for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(";") if ext
+        ) if _WINDOWS else ()
+        self._by_dir = {}  # directory -> (mtime, names)
+        self._keys = []  # folded names, sorted; replaced as a whole by the scanner
+        self._names = []  # names in the order of _keys
+        self._lock = threading.Lock()
+        self._scanning = False
+        self._checked = 0.0
+        self._refresh()
+
+    def matches(self, prefix):
+        """
+        Returns the command names starting with prefix, sorted.
+        """
+        if time.monotonic() - self._checked >= self.RECHECK_INTERVAL:
+            self._refresh()
+        keys, names = self._keys, self._names
+        lo, hi = _prefix_range(keys, _fold(prefix))
+        return list(dict.fromkeys(names[lo:hi]))  # a name on several PATH entries is listed once
+
+    def _refresh(self):
+        """Starts a background pass over the PATH directories unless one is running."""
+        with self._lock:
+            if self._scanning:
+                return
+            self._scanning = True
+            self._checked = time.monotonic()
+        threading.Thread(target=self._scan, name="command-index", daemon=True).start()
+
+    def _scan(self):
+        try:
+            changed = False
+            by_dir = self._by_dir
+            for directory in self._dirs:
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    changed |= by_dir.pop(directory, None) is not None
+                    continue
+                cached = by_dir.get(directory)
+                if cached is None or cached[0] != mtime:
+                    by_dir[directory] = (mtime, self._executables(directory))
+                    changed = True
+            if changed:
+                names = sorted({name for _, dir_names in by_dir.values() for name in dir_names}, key=_fold)
+                self._keys, self._names = [_fold(name) for name in names], names
+        finally:
+            self._scanning = False
+            self._checked = time.monotonic()
+
+    def _executables(self, directory):
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if _WINDOWS:
+                            if entry.name.lower().endswith(self._extensions) and entry.is_file():
+                                names.append(entry.name)
+                        elif entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return names
+
+
+class DirectoryCache:
+    """
+    Recently listed directories, each kept for TTL seconds.
+    """
+
+    TTL = 2.0  # seconds a listing is served before the directory is read again
+    MAX_DIRECTORIES = 64
+
+    def __init__(self):
+        self._listings = OrderedDict()  # directory -> (time, keys, entries), least recently used first
+
+    def matches(self, directory, prefix):
+        """
+        Returns (name, is_dir) for the entries of directory starting with prefix,
+        sorted. Hidden entries are only returned for a prefix starting with ".".
+        """
+        keys, entries = self._listing(directory)
+        lo, hi = _prefix_range(keys, _fold(prefix))
+        if prefix.startswith("."):
+            return entries[lo:hi]
+        return [entry for entry in entries[lo:hi] if not entry[0].startswith(".")]
+
+    def _listing(self, directory):
+        now = time.monotonic()
+        cached = self._listings.get(directory)
+        if cached is not None and now - cached[0] < self.TTL:
+            self._listings.move_to_end(directory)
+            return cached[1], cached[2]
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        entries.append((entry.name, entry.is_dir()))
+                    except OSError:
+                        entries.append((entry.name, False))
+        except OSError:
+            pass
+        entries.sort(key=lambda entry: _fold(entry[0]))
+        keys = [_fold(name) for name, _ in entries]
+        self._listings[directory] = (now, keys, entries)
+        self._listings.move_to_end(directory)
+        while len(self._listings) > self.MAX_DIRECTORIES:
+            self._listings.popitem(last=False)
+        return keys, entries
+
+
+class Completer:
+    """
+    Completes the last word of an input line: a command name in command
+    position, a path otherwise (or when the word contains a separator).
+    """
+
+    def __init__(self, commands=None, directories=None):
+        """
+        Initializes the Completer.
+
+        Args:
+            commands: CommandIndex to use (default: a new one over $PATH).
+            directories: DirectoryCache to use (default: a new one).
+        """
+        self.commands = commands or CommandIndex()
+        self.directories = directories or DirectoryCache()
+
+    def complete(self, line, cwd):
+        """
+        Completes the end of the line.
+
+        Args:
+            line: The input line; its last word is completed.
+            cwd: Directory relative paths are resolved against.
+
+        Returns:
+            tuple: (line, candidates) - the line extended as far as the matches
+                agree (a unique match gets "/" or " " appended), and the sorted
+                candidates when there is more than one.
+        """
+        head, word = _split_word(line)
+        before = head.rstrip()
+        separators = ("/", os.sep) if not _WINDOWS else ("/", "\\", ":")
+        if (not before or before.endswith(_COMMAND_SEPARATORS)) and word and not any(s in word for s in separators):
+            names = self.commands.matches(word)
+            return self._extend(head, "", word, [(name, False) for name in names])
+        split = max(word.rfind(s) for s in separators) + 1
+        prefix, base = word[:split], word[split:]
+        directory = os.path.expanduser(prefix) if prefix else "."
+        if not os.path.isabs(directory):
+            directory = os.path.join(cwd, directory)
+        return self._extend(head, prefix, base, self.directories.matches(os.path.normpath(directory), base))
+
+    @staticmethod
+    def _extend(head, prefix, base, entries):
+        prefix = _escape(prefix)
+        if not entries:
+            return head + prefix + _escape(base), []
+        if len(entries) == 1:
+            name, is_dir = entries[0]
+            return head + prefix + _escape(name) + ("/" if is_dir else " "), []
+        names = [name + ("/" if is_dir else "") for name, is_dir in entries]
+        common = os.path.commonprefix([name for name, _ in entries])
+        if len(common) < len(base):
+            common = base  # case-insensitive matches (Windows) agree on less than was typed
+        return head + prefix + _escape(common), names
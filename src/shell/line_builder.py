@@ -0,0 +1,167 @@
+"""
+Line-oriented consumer of VTParser events: turns terminal output into
+scrollback lines for ShellRunner.
+"""
+from src.shell.ansi import DEFAULT_STYLE, apply_sgr, join_segments, make_line
+from src.shell.vt_parser import VTHandler
+
+
+class LineBuilder(VTHandler):
+    """
+    Keeps the line being written as (text, Style) segments plus a cursor column.
+    Printing at the end of the line appends; after CR (or BS / cursor-left /
+    cursor-column) it overwrites, like a terminal, so "\\r" progress updates and
+    prompts redraw in place. LF completes the line. SGR changes the style and EL
+    erases; other sequences are consumed and ignored.
+
+    Completed lines collect in `lines` until take_lines(); empty lines are
+    dropped, as the shell view has always done.
+    """
+
+    TAB_WIDTH = 8
+    MAX_LINE_LENGTH = 65536  # a longer line without LF is completed at this length
+
+    def __init__(self):
+        self.style = DEFAULT_STYLE
+        self.lines = []
+        self._segments = []  # (text, Style)
+        self._length = 0
+        self._col = 0
+
+    @property
+    def column(self):
+        """The cursor column in the line being written."""
+        return self._col
+
+    def take_lines(self):
+        """
+        Returns and forgets the lines completed since the last call.
+        """
+        lines = self.lines
+        self.lines = []
+        return lines
+
+    def pending(self):
+        """
+        Returns the line being written ('' if empty) without completing it.
+        """
+        if not self._segments:
+            return ""
+        return join_segments(self._segments)
+
+    def finish(self):
+        """
+        Completes the current line (end of stream).
+        """
+        if self._segments:
+            self._newline()
+
+    def text(self, text):
+        # Fast path for plain output: complete lines are split off in bulk; only
+        # lines that overwrite themselves with a bare CR go through print/execute.
+        text = text.replace("\r\n", "\n")
+        parts = text.split("\n")
+        if parts[0]:
+            self._print_part(parts[0])
+        if len(parts) == 1:
+            return
+        self._newline()
+        middle = parts[1:-1]
+        if "\r" in text:
+            for part in middle:
+                self._print_part(part)
+                self._newline()
+        elif self.style == DEFAULT_STYLE:
+            self.lines.extend(part for part in middle if part)
+        else:
+            style = self.style
+            self.lines.extend(make_line(part, ((0, len(part), style),)) for part in middle if part)
+        if parts[-1]:
+            self._print_part(parts[-1])
+
+    def _print_part(self, part):
+        if "\r" in part:
+            VTHandler.text(self, part)
+        else:
+            self.print(part)
+
+    def print(self, text):
+        col = self._col
+        if col > self._length:
+            self._segments.append((" " * (col - self._length), DEFAULT_STYLE))
+            self._length = col
+        if col == self._length:
+            self._segments.append((text, self.style))
+            self._length += len(text)
+            self._col = self._length
+        else:
+            end = col + len(text)
+            self._segments = self._slice(0, col) + [(text, self.style)] + self._slice(end, self._length)
+            self._length = max(self._length, end)
+            self._col = end
+        if self._length >= self.MAX_LINE_LENGTH:
+            self._newline()
+
+    def execute(self, ch):
+        if ch == "\n" or ch == "\x0b" or ch == "\x0c":
+            self._newline()
+        elif ch == "\r":
+            self._col = 0
+        elif ch == "\b":
+            self._col = max(0, self._col - 1)
+        elif ch == "\t":
+            self.print(" " * (self.TAB_WIDTH - self._col % self.TAB_WIDTH))
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        if private or intermediates:
+            return
+        first = params[0] if params else 0
+        if final == "m":
+            self.style = apply_sgr(self.style, params)
+        elif final == "K":
+            self._erase_in_line(first)
+        elif final == "C":
+            self._col += max(1, first)
+        elif final == "D":
+            self._col = max(0, self._col - max(1, first))
+        elif final == "G":
+            self._col = max(0, first - 1)
+
+    def _erase_in_line(self, mode):
+        col = self._col
+        if mode == 0:
+            if col < self._length:
+                self._segments = self._slice(0, col)
+                self._length = col
+        elif mode == 1:
+            end = min(col + 1, self._length)
+            self._segments = [(" " * end, DEFAULT_STYLE)] + self._slice(end, self._length)
+        elif mode == 2:
+            self._segments = []
+            self._length = 0
+
+    def _newline(self):
+        if self._segments:
+            line = join_segments(self._segments)
+            if line:
+                self.lines.append(line)
+        self._segments = []
+        self._length = 0
+        self._col = 0
+
+    def _slice(self, start, end):
+        """
+        Returns the segments covering columns [start, end) of the current line.
+        """
+        out = []
+        pos = 0
+        for text, style in self._segments:
+            seg_end = pos + len(text)
+            lo = max(pos, start)
+            hi = min(seg_end, end)
+            if lo < hi:
+                out.append((text[lo - pos:hi - pos], style))
+            pos = seg_end
+            if pos >= end:
+                break
+        return out
@@ -0,0 +1,172 @@
+"""
+Native pseudo-terminal for POSIX systems, with the same small interface
+ShellRunner uses from winpty.PtyProcess: read / write / isalive / setwinsize.
+
+The child runs in its own session with the PTY slave as its controlling
+terminal, so job control, password prompts (ssh, sudo) and line-buffered
+output behave as in a real terminal. No Python code runs between fork and
+exec (the UI process has threads by then, so a preexec_fn could deadlock):
+subprocess does the setsid() itself, and a /bin/sh wrapper opens the slave
+by name, which makes it the controlling terminal of the new session, before
+it execs the command. The master fd is non-blocking and reads wait on a
+selector, so the reader thread never spins.
+"""
+import errno
+import fcntl
+import os
+import pty
+import selectors
+import shutil
+import signal
+import struct
+import subprocess
+import termios
+import threading
+
+# $1 is the slave's path; opening it from the new session leader makes it the
+# controlling tty. The fd is closed again at once, the tty stays.
+_CTTY_WRAPPER = 'exec 3<>"$1" 3>&-; shift; exec "$@"'
+
+
+def default_shell():
+    """The user's login shell from $SHELL, or /bin/sh."""
+    return os.environ.get("SHELL") or "/bin/sh"
+
+
+class PosixPty:
+    """A child process attached to a pty.openpty() pair."""
+
+    POLL_INTERVAL = 0.1  # seconds a blocked read waits before re-checking for close()
+    EXIT_TIMEOUT = 0.5  # seconds terminate() waits for the child to exit before killing it
+
+    def __init__(self, process, master_fd):
+        self._process = process
+        self._fd = master_fd
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(master_fd, selectors.EVENT_READ)
+        self._closed = False
+        self._fd_closed = False
+
+    @classmethod
+    def spawn(cls, argv, cwd=None, dimensions=(24, 80), env=None):
+        """Start argv on a new PTY. dimensions is (rows, cols)."""
+        child_env = dict(os.environ if env is None else env)
+        command = os.path.join(cwd, argv[0]) if cwd and "/" in argv[0] else argv[0]
+        if shutil.which(command, path=child_env.get("PATH")) is None:
+            # Checked here because the wrapper would only report it on the terminal.
+            raise FileNotFoundError(errno.ENOENT, "command not found", argv[0])
+        master_fd, slave_fd = pty.openpty()
+        _set_winsize(slave_fd, *dimensions)
+        child_env.setdefault("TERM", "xterm-256color")
+        try:
+            process = subprocess.Popen(
+                ["/bin/sh", "-c", _CTTY_WRAPPER, "sh", os.ttyname(slave_fd), *argv],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=cwd,
+                env=child_env,
+                start_new_session=True,  # setsid(), so the slave can become the controlling tty
+                close_fds=True,
+            )
+        except Exception:
+            os.close(master_fd)
+            os.close(slave_fd)
+            raise
+        os.close(slave_fd)  # the child holds its own copy; EOF/EIO then tracks the child
+        os.set_blocking(master_fd, False)
+        return cls(process, master_fd)
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    def fileno(self):
+        return self._fd
+
+    def read(self, size=4096):
+        """Block until output is available and return up to size bytes.
+        Raises EOFError once the child has closed the terminal.
+        """
+        while not self._closed:
+            try:
+                data = os.read(self._fd, size)
+            except BlockingIOError:
+                self._selector.select(self.POLL_INTERVAL)
+                continue
+            except OSError as e:
+                if e.errno == errno.EIO:  # Linux reports a closed slave as EIO
+                    raise EOFError from e
+                raise
+            if not data:
+                raise EOFError
+            return data
+        raise EOFError
+
+    def write(self, data):
+        """Write str or bytes to the terminal, waiting while the kernel buffer is full."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        view = memoryview(data)
+        while view and not self._closed:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                with selectors.DefaultSelector() as selector:
+                    selector.register(self._fd, selectors.EVENT_WRITE)
+                    selector.select(self.POLL_INTERVAL)
+                continue
+            view = view[written:]
+        return len(data)
+
+    def isalive(self):
+        return not self._closed and self._process.poll() is None
+
+    def setwinsize(self, rows, cols):
+        """Resize the terminal; the kernel sends SIGWINCH to the foreground job."""
+        _set_winsize(self._fd, rows, cols)
+
+    def terminate(self, close=True):
+        """Hang up the child without waiting for it. A daemon thread reaps it,
+        killing it if it has not exited within EXIT_TIMEOUT, so no zombie is
+        left behind and a child that ignores the hangup never stalls the caller.
+
+        Args:
+            close: Also close the master fd. Pass False while another thread may
+                still read it (the reactor), and call close() once it has let go.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # SIGHUP rather than SIGTERM: interactive shells ignore SIGTERM, and on
+            # SIGHUP they pass the hangup on to their jobs, as when a terminal closes.
+            self._process.send_signal(signal.SIGHUP)
+        except OSError:
+            pass
+        if self._process.poll() is None:
+            threading.Thread(target=self._reap, name="pty-reap", daemon=True).start()
+        if close:
+            self.close()
+
+    def _reap(self):
+        try:
+            self._process.wait(self.EXIT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        except OSError:
+            pass
+
+    def close(self):
+        """Close the master fd. Only safe once nothing reads or writes it any more."""
+        self._closed = True
+        if self._fd_closed:
+            return
+        self._fd_closed = True
+        self._selector.close()
+        os.close(self._fd)
+
+
+def _set_winsize(fd, rows, cols):
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
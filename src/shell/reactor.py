@@ -0,0 +1,116 @@
+"""
+One thread that multiplexes the output of every shell session with selectors,
+instead of one reader thread per process.
+
+POSIX only: Windows pipes and winpty handles cannot be polled by select(), so
+ShellRunner keeps its own reader thread there.
+"""
+import logging
+import os
+import selectors
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ShellReactor:
+    """
+    Calls a registered callback on the reactor thread whenever its fd becomes
+    readable. A callback reads what is available (one read, so busy sessions
+    take turns) and returns False once its stream has ended, which unregisters
+    it. Registrations from other threads are queued and picked up after a
+    wake-up through a self-pipe. The thread starts on the first register().
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._changes = []  # (fd, callback or None to unregister, on_removed), applied on the reactor thread
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def register(self, fd, callback):
+        """Watch fd for output; callback() runs on the reactor thread."""
+        with self._lock:
+            self._changes.append((fd, callback, None))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shell-reactor", daemon=True)
+                self._thread.start()
+        self._wake()
+
+    def unregister(self, fd, on_removed=None):
+        """
+        Stop watching fd. Safe to call for an fd that already ended.
+
+        The fd is dropped on the reactor thread, after any callback for it that
+        is already running or due in the current round, so the caller must not
+        close it before then: the number could be reused by a new session and
+        read by the old callback. on_removed() is called on the reactor thread
+        once the fd is no longer watched; close the fd there.
+        """
+        if self._closed:
+            if on_removed is not None:
+                on_removed()
+            return
+        with self._lock:
+            self._changes.append((fd, None, on_removed))
+        self._wake()
+
+    def close(self):
+        """Stop the reactor thread."""
+        self._closed = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wake-up is already pending, or the reactor is gone
+
+    def _apply_changes(self):
+        with self._lock:
+            changes = self._changes
+            self._changes = []
+        for fd, callback, on_removed in changes:
+            try:
+                if callback is None:
+                    self._selector.unregister(fd)
+                else:
+                    self._selector.register(fd, selectors.EVENT_READ, callback)
+            except KeyError:
+                pass  # unregistered already, when its stream ended
+            except (ValueError, OSError):
+                logger.debug("reactor: cannot change fd %r", fd, exc_info=True)
+            if on_removed is not None:
+                try:
+                    on_removed()
+                except Exception:
+                    logger.debug("reactor: on_removed for fd %r failed", fd, exc_info=True)
+
+    def _run(self):
+        while not self._closed:
+            self._apply_changes()
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                try:
+                    keep = key.data()
+                except Exception:
+                    logger.debug("reactor: callback failed", exc_info=True)
+                    keep = False
+                if keep is False:
+                    try:
+                        self._selector.unregister(key.fd)
+                    except (KeyError, ValueError):
+                        pass
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
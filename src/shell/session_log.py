@@ -0,0 +1,236 @@
+"""
+Append-only on-disk log of a session's output, so scrollback can reach back
+far beyond what the text view keeps in memory.
+
+A log is two files: the lines as UTF-8 text, one per line, and an index of
+u64 end offsets, one per line, so line i is found without scanning. The
+reader thread appends in batches (FLUSH_BYTES, FLUSH_LINES or FLUSH_INTERVAL,
+whichever comes first) and lines are read back through an mmap of both files,
+which is how a second process (the UI of an out-of-process shell) reads the
+log its helper writes. Line numbers are ShellRunner sequence numbers.
+
+LogScrollback is the TextRenderer history source built on a log: it pages the
+lines older than the text view's first row back in on demand.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+_OFFSET = struct.Struct("<Q")
+INDEX_SUFFIX = ".idx"
+
+
+def new_log_path(directory=None):
+    """Creates an empty log file in directory (default: the temp directory) and returns its path."""
+    fd, path = tempfile.mkstemp(prefix="robco-shell-", suffix=".log", dir=directory)
+    os.close(fd)
+    return path
+
+
+class SessionLog:
+    """
+    One session's log. The writer (the process running the shell) appends; any
+    process can read lines by number. Thread-safe.
+    """
+
+    FLUSH_BYTES = 1 << 16  # buffered bytes that trigger a write
+    FLUSH_LINES = 1024  # buffered lines that trigger a write
+    FLUSH_INTERVAL = 1.0  # seconds after which buffered lines are written on the next append
+
+    def __init__(self, path, writable=False):
+        """
+        Opens a log.
+
+        Args:
+            path: Path of the line file; the index is path + INDEX_SUFFIX.
+            writable: Open for appending (the file is truncated), else read-only.
+        """
+        self.path = path
+        self._writable = writable
+        self._lock = threading.Lock()
+        self._closed = False
+        self._maps = (None, None)  # (lines mmap, index mmap), remapped as the files grow
+        self._pending = []  # lines appended but not written yet (writer only)
+        self._buffer = bytearray()
+        self._ends = array("Q")
+        self._written = 0  # lines on disk
+        self._size = 0  # bytes on disk plus buffered
+        self._last_flush = time.monotonic()
+        mode = "w+b" if writable else "rb"
+        if not writable:
+            open(path + INDEX_SUFFIX, "ab").close()  # the writer may not have created it yet
+        self._data_file = open(path, mode, buffering=0)
+        self._index_file = open(path + INDEX_SUFFIX, mode, buffering=0)
+
+    def append(self, lines):
+        """Adds lines (str or StyledLine; attributes are not kept). Writer only."""
+        if not lines:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            for line in lines:
+                data = str(line).encode("utf-8", "replace") + b"\n"
+                self._buffer += data
+                self._size += len(data)
+                self._ends.append(self._size)
+            self._pending.extend(lines)
+            if (len(self._buffer) >= self.FLUSH_BYTES or len(self._pending) >= self.FLUSH_LINES
+                    or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+                self._flush()
+
+    def flush(self):
+        """Writes buffered lines to disk."""
+        with self._lock:
+            if not self._closed:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        try:
+            self._data_file.write(self._buffer)  # lines before their index entries, for readers
+            self._index_file.write(self._ends.tobytes())
+        except OSError:
+            logger.debug("session log write failed", exc_info=True)
+        self._written += len(self._pending)
+        self._pending = []
+        self._buffer = bytearray()
+        self._ends = array("Q")
+        self._last_flush = time.monotonic()
+
+    def __len__(self):
+        """Number of lines that can be read."""
+        with self._lock:
+            if self._writable:
+                return self._written + len(self._pending)
+            return self._index_size() // _OFFSET.size
+
+    def line(self, number):
+        """
+        Returns line `number` as text, or None if it is not in the log (yet).
+        """
+        with self._lock:
+            if self._closed or number < 0:
+                return None
+            if self._writable and number >= self._written:
+                index = number - self._written
+                return str(self._pending[index]) if index < len(self._pending) else None
+            data, index = self._mapped(number)
+            if data is None:
+                return None
+            end = _OFFSET.unpack_from(index, number * _OFFSET.size)[0]
+            start = _OFFSET.unpack_from(index, (number - 1) * _OFFSET.size)[0] if number else 0
+            return data[start:end - 1].decode("utf-8", "replace")
+
+    def _index_size(self):
+        return os.fstat(self._index_file.fileno()).st_size
+
+    def _mapped(self, number):
+        """Maps (or remaps, after growth) both files so that line `number` is covered."""
+        data, index = self._maps
+        need = (number + 1) * _OFFSET.size
+        if index is None or len(index) < need:
+            if self._index_size() < need:
+                return None, None
+            for m in self._maps:
+                if m is not None:
+                    m.close()
+            index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            end = _OFFSET.unpack_from(index, need - _OFFSET.size)[0]
+            data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ) if end else b""
+            if len(data) < end:
+                return None, None
+            self._maps = (data, index)
+        return data, index
+
+    def close(self, delete=False):
+        """Flushes and closes the log; delete removes its files."""
+        with self._lock:
+            if self._closed:
+                return
+            if self._writable:
+                self._flush()
+            self._closed = True
+            for m in self._maps:
+                if isinstance(m, mmap.mmap):
+                    m.close()
+            self._maps = (None, None)
+            self._data_file.close()
+            self._index_file.close()
+        if delete:
+            for path in (self.path, self.path + INDEX_SUFFIX):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # already removed by the other process, or still open on Windows
+
+
+class LogScrollback:
+    """
+    TextRenderer history source over a SessionLog. The owner of the view marks,
+    for appended batches, the row id their first line starts at and its line
+    number; paging starts from the oldest mark still in the view, so rows the
+    view trimmed mid-line or never got (lines dropped in a burst) cannot shift
+    the log out of step with the rows.
+    """
+
+    def __init__(self, log):
+        """
+        Initializes the LogScrollback.
+
+        Args:
+            log: The session's SessionLog.
+        """
+        self._log = log
+        self._marks = []  # (row id, line number), ascending
+
+    def mark(self, row_id, number):
+        """Records that row `row_id` of the view is the first row of log line `number`."""
+        self._marks.append((row_id, number))
+
+    def discard_before(self, row_id):
+        """Forgets marks of rows the view dropped, keeping those at or after row_id."""
+        marks = self._marks
+        keep = 0
+        while keep < len(marks) and marks[keep][0] < row_id:
+            keep += 1
+        if keep:
+            del marks[:keep]
+
+    def rows_before(self, first_id, count, wrap):
+        """
+        Returns (rows, stale) to page in above the view, or None when nothing
+        older is available: the view drops its first `stale` rows (the part of a
+        line before the oldest mark) and prepends `rows`, wrapped with `wrap`
+        from the log lines before that mark, at least `count` of them when the
+        log has that many.
+        """
+        self.discard_before(first_id)
+        if not self._marks:
+            return None
+        row_id, number = self._marks[0]
+        if number <= 0 or number > len(self._log):
+            return None
+        pages = []
+        total = 0
+        while number > 0 and total < count:
+            text = self._log.line(number - 1)
+            if text is None:
+                break
+            number -= 1
+            rows = wrap([text])
+            pages.append(rows)
+            total += len(rows)
+        if not pages:
+            return None
+        rows = [row for page in reversed(pages) for row in page]
+        self._marks.insert(0, (row_id - len(rows), number))
+        return rows, row_id - first_id
@@ -0,0 +1,116 @@
+"""
+Several shells side by side: SessionPool spawns, switches between and closes
+ShellRunners that share one ShellReactor for their output.
+
+Every session keeps reading in the background into its runner's scrollback
+ring; only the foreground session is drawn. ShellScene parks its view state
+(wrapped scrollback, scroll position, input line) on the session it leaves,
+so switching back shows it immediately without replaying output.
+"""
+import sys
+
+from src.shell.reactor import ShellReactor
+
+
+class ShellSession:
+    """One shell of the pool."""
+
+    def __init__(self, number, runner):
+        """
+        Initializes the ShellSession.
+
+        Args:
+            number: 1-based number shown to the user and used by the hotkeys.
+            runner: The session's ShellRunner.
+        """
+        self.number = number
+        self.runner = runner
+        self.view = None  # ShellScene state parked here while the session is in the background
+
+
+class SessionPool:
+    """
+    The open sessions, ordered by number, and which one is in the foreground.
+    There is always at least one session.
+    """
+
+    MAX_SESSIONS = 9
+
+    def __init__(self, runner_factory, max_sessions=None):
+        """
+        Initializes the SessionPool and spawns the first session.
+
+        Args:
+            runner_factory: Callable(reactor) returning a new ShellRunner; reactor
+                is None where output cannot be multiplexed (Windows).
+            max_sessions: Maximum number of open sessions (default MAX_SESSIONS).
+        """
+        self._runner_factory = runner_factory
+        self.max_sessions = max_sessions or self.MAX_SESSIONS
+        self.reactor = None if sys.platform == "win32" else ShellReactor()
+        self.sessions = []
+        self.foreground = None
+        self.spawn()
+
+    def spawn(self):
+        """
+        Starts a new shell and brings it to the foreground.
+
+        Returns:
+            ShellSession: The new session, or None when the pool is full.
+        """
+        if len(self.sessions) >= self.max_sessions:
+            return None
+        used = {session.number for session in self.sessions}
+        number = next(n for n in range(1, self.max_sessions + 1) if n not in used)
+        session = ShellSession(number, self._runner_factory(self.reactor))
+        self.sessions.append(session)
+        self.sessions.sort(key=lambda s: s.number)
+        self.foreground = session
+        return session
+
+    def get(self, number):
+        """Returns the session with this number, or None."""
+        for session in self.sessions:
+            if session.number == number:
+                return session
+        return None
+
+    def neighbour(self, step):
+        """Returns the session `step` places after the foreground one, wrapping around."""
+        index = self.sessions.index(self.foreground)
+        return self.sessions[(index + step) % len(self.sessions)]
+
+    def switch(self, session):
+        """Brings a session to the foreground."""
+        if session in self.sessions:
+            self.foreground = session
+
+    def close(self, session=None):
+        """
+        Closes a session (default: the foreground one). Closing the last session
+        starts a fresh one. The foreground moves to the closed session's neighbour.
+
+        Returns:
+            ShellSession: The foreground session afterwards.
+        """
+        session = session or self.foreground
+        if session not in self.sessions:
+            return self.foreground
+        index = self.sessions.index(session)
+        self.sessions.remove(session)
+        session.runner.close()
+        if not self.sessions:
+            return self.spawn()
+        if session is self.foreground:
+            self.foreground = self.sessions[min(index, len(self.sessions) - 1)]
+        return self.foreground
+
+    def close_all(self):
+        """Closes every session and stops the reactor (application exit)."""
+        for session in self.sessions:
+            session.runner.close()
+        self.sessions = []
+        self.foreground = None
+        if self.reactor is not None:
+            self.reactor.close()
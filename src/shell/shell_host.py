@@ -0,0 +1,341 @@
+"""
+Out-of-process shell: the PTY, UTF-8 decoding and escape parsing run in a
+helper process, so heavy output is parsed on another core instead of competing
+with the render loop for the GIL.
+
+The helper (host_main) runs an ordinary ShellRunner and copies its completed
+lines into a SharedLineRing; the emulated screen, the in-progress line and
+other low-rate state go through the ring's state mailbox. RemoteShellRunner is
+the UI-side stand-in with the ShellRunner interface: reading output only maps
+the shared memory, and input travels as small messages over a Pipe, sent from
+the writer thread so a large paste never blocks a frame. The helper sleeps
+until its shell writes something, and after publishing sends a small "output"
+message back over the Pipe, which wakes the UI through on_output.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+
+from src.app.tracer import tracer
+from src.shell.command_history import CommandHistory
+from src.shell.session_log import SessionLog
+from src.shell.shell_runner import ShellRunner
+from src.shell.shm_ring import DEFAULT_RING_BYTES, SharedLineReader, SharedLineRing, ring_size
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_INTERVAL = 0.005  # seconds between the host's copies into the ring
+IDLE_PUBLISH_INTERVAL = 0.5  # longest wait for output before state (alive, writing) is checked anyway
+
+
+def host_main(conn, shm_name, runner_args):
+    """
+    Entry point of the helper process: runs the shell and publishes its output.
+
+    Args:
+        conn: The host's end of the control Pipe.
+        shm_name: Name of the shared memory block created by RemoteShellRunner.
+        runner_args: (shell_command, shell_cwd, use_pty, read_size, log_path) for the ShellRunner.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = SharedLineRing(shm.buf)
+    shell_command, shell_cwd, use_pty, read_size, log_path = runner_args
+    wake = threading.Event()
+    runner = ShellRunner(shell_command, shell_cwd, use_pty, read_size=read_size, log_path=log_path,
+                         on_output=wake.set)
+    stop = threading.Event()
+    threading.Thread(target=_control_loop, args=(conn, runner, stop, wake), daemon=True).start()
+    try:
+        _publish_loop(ring, runner, stop, wake, conn)
+    finally:
+        runner.close()
+        ring = None
+        shm.close()
+        conn.close()
+
+
+def _control_loop(conn, runner, stop, wake):
+    """Apply the UI's input messages to the runner until the UI closes the Pipe."""
+    try:
+        while True:
+            message = conn.recv()
+            kind = message[0]
+            if kind == "line":
+                runner.write(message[1])
+            elif kind == "raw":
+                runner.write_raw(message[1])
+            elif kind == "paste":
+                runner.paste(message[1], submit=message[2])
+            elif kind == "interrupt":
+                runner.send_interrupt()
+            elif kind == "resize":
+                runner.setwinsize(message[1], message[2])
+            elif kind == "close":
+                break
+    except (EOFError, OSError):
+        pass
+    finally:
+        stop.set()
+        wake.set()
+
+
+def _publish_loop(ring, runner, stop, wake, conn):
+    """Copy new lines into the ring and publish state changes, at most every
+    PUBLISH_INTERVAL while output flows, and tell the UI when something was published.
+    """
+    cursor = 0
+    seq = 0
+    rows = {}
+    was_active = False
+    state = None
+    while True:
+        stopping = stop.is_set()
+        wake.clear()
+        lines, pending, cursor = runner.read_since(cursor)
+        if lines:
+            ring.append(lines, first_seq=cursor - len(lines))  # keeps lines the runner dropped counted
+        elif runner.log is not None:
+            runner.log.flush()  # output paused: make the log readable by the UI up to here
+        seq = cursor
+        active = runner.screen_active()
+        if active:
+            changed, screen_cursor, size = runner.read_screen(full=not was_active)
+            rows.update(changed)
+            rows = {y: line for y, line in rows.items() if y < size[0]}
+        else:
+            changed, screen_cursor, size = {}, None, None
+            rows = {}
+        was_active = active
+        screen = runner.screen
+        new_state = {
+            "seq": seq,
+            "pending": pending,
+            "active": active,
+            "rows": rows,
+            "cursor": screen_cursor,
+            "size": size,
+            "application_cursor_keys": screen.application_cursor_keys,
+            "bracketed_paste": screen.bracketed_paste,
+            "writing": runner.is_writing(),
+            "alive": runner.is_alive(),
+            "pid": runner.pid(),
+        }
+        published = bool(lines)
+        if changed or new_state != state:
+            ring.publish_state(new_state)
+            state = dict(new_state, rows=dict(rows))
+            published = True
+        if published:
+            try:
+                conn.send(("output",))
+            except (OSError, ValueError):
+                pass  # the UI is gone; the control loop stops us
+        if stopping:
+            return
+        wake.wait(IDLE_PUBLISH_INTERVAL)
+        stop.wait(PUBLISH_INTERVAL)  # let output accumulate into one batch
+
+
+class _RemoteScreen:
+    """The emulated-screen modes the UI reads from runner.screen, as last published."""
+
+    def __init__(self):
+        self.active = False
+        self.application_cursor_keys = False
+        self.bracketed_paste = False
+
+
+class RemoteShellRunner(ShellRunner):
+    """
+    ShellRunner whose shell lives in a helper process (see host_main). Output is
+    read from a shared-memory ring into the usual scrollback deque on each
+    read_since(); input is forwarded to the helper.
+    """
+
+    JOIN_TIMEOUT = 2.0  # seconds to wait for the helper to exit on close()
+
+    def __init__(self, shell_command=None, shell_cwd=None, use_pty=True, read_size=None,
+                 reactor=None, log_path=None, history=None, on_output=None, ring_bytes=None):
+        """
+        Initializes the RemoteShellRunner and starts its helper process.
+
+        Args:
+            shell_command, shell_cwd, use_pty, read_size: As for ShellRunner.
+            reactor: Ignored; the helper reads its shell on a thread of its own.
+            log_path: Session log the helper writes and this process reads.
+            history: CommandHistory, kept in this process (as for ShellRunner).
+            on_output: Called from a thread of this process when the helper published output.
+            ring_bytes: Bytes of line storage in the shared ring (default 8 MiB).
+        """
+        self._cwd = shell_cwd or os.getcwd()
+        self._lines = deque(maxlen=self.SCROLLBACK_LINES)
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        self._pending_visible = ""
+        self.history = history if history is not None else CommandHistory()
+        self._history_cursor = None
+        self._closed = False
+        self.on_output = on_output
+        self.log = SessionLog(log_path) if log_path else None
+        self.screen = _RemoteScreen()
+        self._state = {}
+        self._held_state = None  # newest state, waiting until the lines before it are read
+        self._shown_rows = {}
+        self._shm = shared_memory.SharedMemory(create=True, size=ring_size(ring_bytes or DEFAULT_RING_BYTES))
+        self._reader = SharedLineReader(self._shm.buf)
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._host = context.Process(
+            target=host_main,
+            args=(child_conn, self._shm.name, (shell_command, shell_cwd, use_pty, read_size, log_path)),
+            name="shell-host",
+            daemon=True,
+        )
+        self._host.start()
+        child_conn.close()
+        self._write_queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
+        threading.Thread(target=self._wake_loop, name="shell-host-wake", daemon=True).start()
+
+    def _wake_loop(self):
+        """Pass the helper's "output" messages on to on_output; a last call when it exits."""
+        try:
+            while True:
+                self._conn.recv()
+                if self.on_output is not None:
+                    self.on_output()
+        except (EOFError, OSError):
+            pass
+        if self.on_output is not None and not self._closed:
+            self.on_output()
+
+    def _write_loop(self):
+        """Forward queued messages to the helper (blocks only this thread on a large
+        paste). The None from close() is forwarded as the helper's stop message.
+        """
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    self._conn.send(("close",))
+                    return
+                self._conn.send(item)
+            except (OSError, ValueError):
+                pass  # the helper is gone
+            finally:
+                self._write_queue.task_done()
+
+    def _pull(self):
+        """Move new lines and state out of the shared ring."""
+        if self._closed:
+            return
+        start = tracer.now() if tracer.enabled else None
+        lines, next_seq = self._reader.read()
+        state = self._reader.read_state() or self._held_state
+        self._held_state = None
+        if state is not None and state["seq"] > next_seq:
+            self._held_state, state = state, None  # its lines are not all read yet
+        with self._lock:
+            if next_seq - len(lines) > self._next_seq:
+                self._lines.clear()  # lines were lost in the ring or the helper; keep the deque contiguous
+            self._lines.extend(lines)
+            self._next_seq = next_seq
+            if state is not None:
+                self._state = state
+                self._pending_visible = state["pending"]
+        if state is not None:
+            screen = self.screen
+            screen.active = state["active"]
+            screen.application_cursor_keys = state["application_cursor_keys"]
+            screen.bracketed_paste = state["bracketed_paste"]
+        if start is not None:
+            tracer.complete("shell pull", "shell", start, {"lines": len(lines)})
+
+    def read_since(self, cursor):
+        """As ShellRunner.read_since, after taking new output from the ring."""
+        self._pull()
+        return super().read_since(cursor)
+
+    def get_output_lines(self):
+        """As ShellRunner.get_output_lines, after taking new output from the ring."""
+        self._pull()
+        return super().get_output_lines()
+
+    def screen_active(self):
+        """True while a full-screen program is shown on the helper's emulated screen."""
+        return self.screen.active
+
+    def read_screen(self, full=False):
+        """As ShellRunner.read_screen; changed rows are found by comparing with the
+        rows returned last time.
+        """
+        self._pull()
+        state = self._state
+        rows = state.get("rows") or {}
+        size = state.get("size") or (24, 80)
+        if full:
+            changed = dict(rows)
+        else:
+            shown = self._shown_rows
+            changed = {y: line for y, line in rows.items() if shown.get(y) != line}
+        self._shown_rows = dict(rows)
+        return changed, state.get("cursor"), size
+
+    def write_raw(self, data):
+        """Send input to the shell unchanged."""
+        self._send(("raw", data))
+
+    def _send_line(self, line):
+        self._send(("line", line))
+
+    def paste(self, text, submit=False):
+        """Stream pasted text to the shell; the helper chooses bracketed paste."""
+        self._send(("paste", text, submit))
+
+    def is_writing(self):
+        """True while input is still queued here or in the helper."""
+        return self._write_queue.unfinished_tasks > 0 or bool(self._state.get("writing"))
+
+    def send_interrupt(self):
+        """Send Ctrl+C, cancelling pastes the helper is still sending."""
+        self._send(("interrupt",))
+
+    def setwinsize(self, rows, cols):
+        """Set the terminal size of the helper's shell and emulated screen."""
+        self._send(("resize", rows, cols))
+
+    def pid(self):
+        """Process id of the shell in the helper, once it has been published."""
+        return self._state.get("pid")
+
+    def is_alive(self):
+        """True while the helper process and its shell are running."""
+        return self._host.is_alive() and self._state.get("alive", True)
+
+    def close(self):
+        """Stop the helper process and free the shared ring."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_queue.put_nowait(None)
+        except queue.Full:
+            pass  # the helper stopped reading; it is terminated below
+        self._host.join(self.JOIN_TIMEOUT)
+        if self._host.is_alive():
+            self._host.terminate()
+            self._host.join(self.JOIN_TIMEOUT)
+        self._conn.close()
+        self._reader = None
+        try:
+            self._shm.close()
+            self._shm.unlink()
+        except (BufferError, FileNotFoundError):
+            logger.debug("shell ring cleanup failed", exc_info=True)
+        if self.log is not None:
+            self.log.close(delete=True)
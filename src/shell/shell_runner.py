@@ -1,16 +1,29 @@
 """
-Runs a real Windows shell (cmd.exe) in a subprocess and exposes a line buffer
-plus write(line) for the UI to drive a real terminal.
-Supports optional PTY (pseudo-terminal) mode so SSH and other TTY programs work.
+Runs a real shell (cmd.exe on Windows, $SHELL elsewhere) in a subprocess and
+exposes a line buffer plus write(line) for the UI to drive a real terminal.
+Supports optional PTY (pseudo-terminal) mode so SSH and other TTY programs work:
+winpty on Windows, a native pty (src.shell.posix_pty) on Linux and macOS.
 
 Debug: set env ROBCO_SHELL_DEBUG=1 to log raw PTY data and line processing to stderr.
 """
+import codecs
+import errno
 import os
-import re
+import queue
+import shlex
 import subprocess
 import sys
 import threading
 import logging
+from collections import deque
+from itertools import islice
+
+from src.app.tracer import tracer
+from src.shell.command_history import CommandHistory
+from src.shell.line_builder import LineBuilder
+from src.shell.session_log import SessionLog
+from src.shell.vt_parser import VTParser
+from src.shell.vt_screen import AltScreenRouter, VTScreen
 
 logger = logging.getLogger(__name__)
 if os.environ.get("ROBCO_SHELL_DEBUG"):
@@ -20,85 +33,122 @@ if os.environ.get("ROBCO_SHELL_DEBUG"):
         h.setFormatter(logging.Formatter("%(asctime)s [shell] %(message)s"))
         logger.addHandler(h)
 
-# Strip ANSI escape sequences so prompts (e.g. SSH password) and text are visible
-# instead of raw codes like [1:35H, [?1004h. Covers CSI, OSC, and common two-byte.
-# OSC (e.g. window title) must end with BEL or ST so the full sequence is removed.
-_ANSI_ESCAPE = re.compile(
-    r"\x1b(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~]|\][^\x1b]*(?:\x07|\x1b\\))"
-)
-# C0 control characters (incl. BEL 0x07) to strip from visible output
-_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
-
-
-def _strip_ansi(text):
-    if not text:
-        return text
-    return _ANSI_ESCAPE.sub("", text)
-
-
-def _visible_line(text):
-    """Apply \\r semantics: take the part after the last \\r (in-place overwrite).
-    If that part is empty (e.g. password prompt ending with \\r), show the full line.
-    Strips ANSI, then C0 control chars (e.g. BEL), so only printable content is shown.
-    """
-    if not text:
-        return ""
-    s = _strip_ansi(text).rstrip("\r\n")
-    after_last_r = s.split("\r")[-1]
-    visible = after_last_r if after_last_r else s
-    return _CONTROL_CHARS.sub("", visible)
+_PASTE_START = "\x1b[200~"
+_PASTE_END = "\x1b[201~"
 
 
 class ShellRunner:
     """
     Spawns a shell process, reads stdout/stderr into a thread-safe line buffer,
     and provides write(line) to send input. No UI dependency.
-    When use_pty is True on Windows, uses a PTY so SSH and similar programs work.
+    When use_pty is True, uses a PTY so SSH and similar programs work.
+    shell_command None picks the platform shell; a string is a command line.
+
+    Output is parsed once by a VTParser feeding a LineBuilder, in the reader
+    thread. Lines get consecutive sequence numbers and are kept in a ring of the
+    last SCROLLBACK_LINES; read_since(cursor) returns only what arrived after a
+    cursor, so polling costs O(new output) instead of O(history).
+
+    Full-screen programs (top, vim, less) are emulated by a VTScreen instead; screen_active() tells the UI to draw
+    read_screen() rows and send keys with write_raw() while they run.
+
+    Input never blocks the caller: writes go through a bounded queue to a writer
+    thread, which does the blocking PTY/pipe writes. paste() streams large text
+    in PASTE_CHUNK pieces produced on the writer thread, wrapped in bracketed
+    paste markers when the program asked for them.
+
+    With a ShellReactor (POSIX), output is read on the reactor's shared thread
+    instead of a reader thread per shell.
+
+    With a log_path, every completed line is also appended to a SessionLog, which
+    keeps the whole session on disk for scrollback beyond the in-memory ring;
+    line numbers in the log are the sequence numbers of read_since().
+
+    on_output, when given, is called on the reading thread after each chunk of
+    output has been parsed, so a UI that sleeps while idle can be woken.
     """
 
-    def __init__(self, shell_command=None, shell_cwd=None, use_pty=True):
-        if shell_command is None:
-            shell_command = "cmd.exe"
-        if isinstance(shell_command, str):
-            self._argv = [shell_command, "/q", "/k"]
-        else:
-            self._argv = list(shell_command)
+    SCROLLBACK_LINES = 10000
+    READ_SIZE = 65536  # bytes per read from the pipe/PTY
+    WRITE_QUEUE_SIZE = 256  # pending writes before further input is dropped
+    PASTE_CHUNK = 4096  # characters per write when streaming a paste
+
+    def __init__(self, shell_command=None, shell_cwd=None, use_pty=True, read_size=None, reactor=None,
+                 log_path=None, history=None, on_output=None):
+        self._argv = self._build_argv(shell_command)
         self._cwd = shell_cwd or os.getcwd()
-        self._lines = []
+        self._lines = deque(maxlen=self.SCROLLBACK_LINES)
+        self._next_seq = 0  # sequence number the next completed line will get
         self._lock = threading.Lock()
+        self.screen = VTScreen(24, 80)
+        self._screen_lock = threading.Lock()  # the reader mutates the screen while parsing
         self._process = None
         self._pty = None
         self._reader_thread = None
+        self._reactor = reactor if sys.platform != "win32" else None  # Windows handles cannot be polled
+        self._reader_fd = None
+        self._stream = None  # (decoder, parser, builder) when reading on the reactor
+        self._closed = False
+        self.on_output = on_output  # called from the reading thread when output was parsed
+        self.log = SessionLog(log_path, writable=True) if log_path else None
         self._encoding = "utf-8"
         self._errors = "replace"
-        self._history = []
-        self._history_index = -1
-        self._history_max = 50
+        self._read_size = read_size or self.READ_SIZE
+        self.history = history if history is not None else CommandHistory()  # may be shared by sessions
+        self._history_cursor = None  # id of the entry shown by history_prev/next, None below the newest
         self._use_pty = False
-        self._pending = ""  # in-progress line (no \\n yet); \\r updates apply here
+        self._pending_visible = ""  # in-progress line (no \\n yet) as displayed, set by the reader thread
+        self._pty_newline = "\r\n"  # what Enter sends to the PTY
+        self._write_queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self._paste_generation = 0  # bumped to cancel pastes still being streamed
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
 
-        if use_pty and sys.platform == "win32":
+        if use_pty:
             try:
-                import winpty
-
-                # Pass full argv (e.g. ["cmd.exe", "/q", "/k"]) so cmd starts quiet
-                # and doesn't print delayed Microsoft banner lines
-                self._pty = winpty.PtyProcess.spawn(
-                    self._argv, cwd=self._cwd, dimensions=(24, 80)
-                )
-                self._pty.setwinsize(24, 80)
-                self._use_pty = True
-                self._reader_thread = threading.Thread(
-                    target=self._read_loop_pty, daemon=True
-                )
-                self._reader_thread.start()
+                self._start_pty()
             except Exception:
+                logger.debug("pty unavailable, using pipes", exc_info=True)
                 self._use_pty = False
                 self._pty = None
                 self._start_pipe()
         else:
             self._start_pipe()
 
+    @staticmethod
+    def _build_argv(shell_command):
+        if sys.platform == "win32":
+            if shell_command is None:
+                shell_command = "cmd.exe"
+            if isinstance(shell_command, str):
+                return [shell_command, "/q", "/k"]
+            return list(shell_command)
+        if shell_command is None:
+            from src.shell.posix_pty import default_shell
+
+            return [default_shell()]
+        if isinstance(shell_command, str):
+            return shlex.split(shell_command)
+        return list(shell_command)
+
+    def _start_pty(self):
+        if sys.platform == "win32":
+            import winpty
+
+            # Pass full argv (e.g. ["cmd.exe", "/q", "/k"]) so cmd starts quiet
+            # and doesn't print delayed Microsoft banner lines
+            self._pty = winpty.PtyProcess.spawn(
+                self._argv, cwd=self._cwd, dimensions=(24, 80)
+            )
+            self._pty.setwinsize(24, 80)
+        else:
+            from src.shell.posix_pty import PosixPty
+
+            self._pty = PosixPty.spawn(self._argv, cwd=self._cwd, dimensions=(24, 80))
+            self._pty_newline = "\r"  # the tty line discipline turns CR into NL (ICRNL)
+        self._use_pty = True
+        self._start_reader(self._pty.fileno() if self._reactor else None, self._read_loop_pty)
+
     def _start_pipe(self):
         kwargs = {
             "stdin": subprocess.PIPE,
@@ -110,172 +160,361 @@ class ShellRunner:
         if sys.platform == "win32":
             kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
         self._process = subprocess.Popen(self._argv, **kwargs)
-        self._reader_thread = threading.Thread(target=self._read_loop_pipe, daemon=True)
+        self._start_reader(self._process.stdout.fileno() if self._reactor else None, self._read_loop_pipe)
+
+    def _start_reader(self, fd, read_loop):
+        """Read output on the shared reactor when there is one, else on a thread of our own."""
+        if self._reactor is not None:
+            os.set_blocking(fd, False)
+            self._stream = self._new_stream()
+            self._reader_fd = fd
+            self._reactor.register(fd, self._on_readable)
+            return
+        self._reader_thread = threading.Thread(target=read_loop, daemon=True)
         self._reader_thread.start()
 
+    def _on_readable(self):
+        """Reactor callback: parse what the shell wrote. Returns False at EOF."""
+        if self._closed:
+            return False  # queued before close(); the fd is about to be released
+        try:
+            data = os.read(self._reader_fd, self._read_size)
+        except BlockingIOError:
+            return True
+        except OSError as e:  # EIO: the PTY slave closed; EBADF: close() got here first
+            if e.errno not in (errno.EIO, errno.EBADF):
+                logger.debug("shell read failed", exc_info=True)
+            data = b""
+        decoder, parser, builder = self._stream
+        if not data:
+            self._finish_stream(decoder, parser, builder)
+            return False
+        self._feed(parser, decoder.decode(data))
+        self._publish(builder)
+        return True
+
     def _read_loop_pipe(self):
         out = self._process.stdout if self._process else None
         if out is None:
             return
-        buffer = b""
+        decoder, parser, builder = self._new_stream()
         try:
             while True:
-                chunk = out.read(4096)
+                chunk = out.read(self._read_size)
                 if not chunk:
                     break
-                buffer += chunk
-                while b"\n" in buffer:
-                    line_bytes, _, buffer = buffer.partition(b"\n")
-                    decoded = line_bytes.decode(
-                        self._encoding, errors=self._errors
-                    )
-                    visible = _visible_line(decoded)
-                    if visible:
-                        with self._lock:
-                            self._lines.append(visible)
-                with self._lock:
-                    self._pending = buffer.decode(
-                        self._encoding, errors=self._errors
-                    )
+                self._feed(parser, decoder.decode(chunk))
+                self._publish(builder)
         except (OSError, ValueError):
             pass
         finally:
-            if buffer.strip():
-                visible = _visible_line(
-                    buffer.decode(self._encoding, errors=self._errors)
-                )
-                if visible:
-                    with self._lock:
-                        self._lines.append(visible)
-                with self._lock:
-                    self._pending = ""
+            self._finish_stream(decoder, parser, builder)
 
     def _read_loop_pty(self):
         if self._pty is None:
             return
-        buffer = ""
+        decoder, parser, builder = self._new_stream()
         try:
-            while self._pty.isalive():
+            while True:  # read until EOF so output written just before exit is kept
                 try:
-                    data = self._pty.read(4096)
+                    data = self._pty.read(self._read_size)
                 except (EOFError, OSError, ValueError):
                     break
                 if not data:
                     break
-                if isinstance(data, bytes):
-                    data = data.decode(self._encoding, errors=self._errors)
                 logger.debug("pty raw: %r", data)
-                buffer += data
-                while "\n" in buffer:
-                    line, _, buffer = buffer.partition("\n")
-                    visible = _visible_line(line)
-                    logger.debug("pty line: %r -> visible: %r", line, visible)
-                    if visible:
-                        with self._lock:
-                            self._lines.append(visible)
-                            self._pending = buffer
-                    else:
-                        with self._lock:
-                            self._pending = buffer
-                    logger.debug("pty pending: %r", buffer)
-                if buffer and "\n" not in buffer:
-                    logger.debug("pty pending (no newline yet): %r", buffer)
-                    with self._lock:
-                        self._pending = buffer
+                # winpty hands out decoded text; the POSIX pty gives bytes
+                self._feed(parser, data if isinstance(data, str) else decoder.decode(data))
+                lines, pending = self._publish(builder)
+                logger.debug("pty lines: %r", lines)
+                logger.debug("pty pending: %r", pending)
         except Exception:
             pass
         finally:
-            if buffer.strip():
-                visible = _visible_line(buffer)
-                if visible:
-                    with self._lock:
-                        self._lines.append(visible)
-                with self._lock:
-                    self._pending = ""
+            self._finish_stream(decoder, parser, builder)
+
+    def _new_stream(self):
+        """Decoder, parser and line builder for one output stream. The incremental
+        decoder keeps multi-byte characters split across reads whole; the parser
+        keeps escape sequences split across reads whole.
+        """
+        decoder = codecs.getincrementaldecoder(self._encoding)(errors=self._errors)
+        builder = LineBuilder()
+        return decoder, VTParser(AltScreenRouter(builder, self.screen)), builder
+
+    def _feed(self, parser, text):
+        """Parse output under the screen lock and answer terminal queries
+        (cursor position, device attributes) the program made.
+        """
+        start = tracer.now() if tracer.enabled else None
+        with self._screen_lock:
+            parser.feed(text)
+            responses = self.screen.responses
+            self.screen.responses = []
+        if start is not None:
+            tracer.complete("shell parse", "shell", start, {"chars": len(text)})
+        if responses:
+            self._send("".join(responses))
+
+    def _finish_stream(self, decoder, parser, builder):
+        self._feed(parser, decoder.decode(b"", final=True))
+        builder.finish()
+        self._publish(builder)
+
+    def _publish(self, builder):
+        """Store the lines the builder completed and its in-progress line, under one
+        lock so readers never see a completed line together with its stale pending
+        form. Returns (lines, pending).
+        """
+        start = tracer.now() if tracer.enabled else None
+        lines = builder.take_lines()
+        pending = builder.pending()
+        if lines and self.log is not None:
+            self.log.append(lines)
+        with self._lock:
+            self._lines.extend(lines)
+            self._next_seq += len(lines)
+            self._pending_visible = pending
+        if start is not None:
+            tracer.complete("shell publish", "shell", start, {"lines": len(lines)})
+        if self.on_output is not None:
+            self.on_output()
+        return lines, pending
+
+    @property
+    def line_count(self):
+        """Number of lines completed so far (the sequence number the next one gets)."""
+        return self._next_seq
+
+    def read_since(self, cursor):
+        """Return (new_lines, pending, new_cursor): the completed lines after
+        `cursor` (a value previously returned here, or 0), the current in-progress
+        line ('' if none) and the cursor to pass next time. Lines that already
+        left the scrollback ring are skipped.
+        """
+        with self._lock:
+            end = self._next_seq
+            count = min(end - cursor, len(self._lines))
+            new_lines = list(islice(reversed(self._lines), count))[::-1] if count > 0 else []
+            return new_lines, self._pending_visible, end
 
     def get_output_lines(self):
         """Return a copy of the current output lines plus the pending line (if any)."""
         with self._lock:
             out = list(self._lines)
-            if self._pending:
-                out.append(_visible_line(self._pending))
+            if self._pending_visible:
+                out.append(self._pending_visible)
             return out
 
+    def screen_active(self):
+        """True while a full-screen program is shown on the emulated screen."""
+        return self.screen.active
+
+    def read_screen(self, full=False):
+        """Return (rows, cursor, size) for the emulated screen: rows maps the row
+        index to its line for rows changed since the last call (all rows when
+        full), cursor is (row, col) or None when hidden, size is (rows, cols).
+        """
+        screen = self.screen
+        with self._screen_lock:
+            dirty = screen.take_dirty()
+            indices = range(screen.rows) if full else dirty
+            rows = {y: screen.row_line(y) for y in indices if y < screen.rows}
+            cursor = (screen.y, screen.x) if screen.cursor_visible else None
+            return rows, cursor, (screen.rows, screen.cols)
+
+    def write_raw(self, data):
+        """Send keystrokes or other input to the shell unchanged (no newline, no history)."""
+        self._send(data)
+
     def write(self, line):
         """Send a line to the shell (adds newline if missing)."""
         cmd = line.strip().rstrip("\n")
         if cmd:
-            self._history.append(cmd)
-            if len(self._history) > self._history_max:
-                self._history.pop(0)
-            self._history_index = -1
+            self.history.add(cmd)
+            self._history_cursor = None
         if not line.endswith("\n"):
             line = line + "\n"
+        self._send_line(line)
+
+    def _send_line(self, line):
+        """Queue a newline-terminated line, with Enter translated for the PTY."""
         if self._use_pty and self._pty is not None:
+            line = line.replace("\r\n", "\n").replace("\n", self._pty_newline)
+        self._send(line)
+
+    def paste(self, text, submit=False):
+        """Stream pasted text to the shell without blocking. Newlines are sent as
+        Enter; with bracketed paste enabled the text is wrapped in paste markers
+        so the shell or editor takes it as one insertion. submit sends Enter
+        after the paste (outside the markers), running a pasted script, unless
+        the paste was cancelled.
+        """
+        bracketed = self.screen.bracketed_paste
+        if bracketed and _PASTE_END in text:
+            text = text.replace(_PASTE_END, "")  # the paste must not be able to end itself
+        generation = self._paste_generation
+        self._send(self._paste_chunks(text, bracketed, generation, submit))
+
+    def is_writing(self):
+        """True while queued input (e.g. a large paste) has not been written yet."""
+        return self._write_queue.unfinished_tasks > 0
+
+    def _paste_chunks(self, text, bracketed, generation, submit):
+        """Yield the paste in PASTE_CHUNK pieces; runs on the writer thread, so the
+        newline translation of a multi-megabyte paste never costs a frame. Stops
+        early when send_interrupt() cancels pastes.
+        """
+        if bracketed:
+            yield _PASTE_START
+        i = 0
+        n = len(text)
+        while i < n and generation == self._paste_generation:
+            end = min(n, i + self.PASTE_CHUNK)
+            if text[end - 1] == "\r" and end < n:
+                end += 1  # keep a CRLF pair in one chunk
+            chunk = text[i:end]
+            if self._use_pty:
+                chunk = chunk.replace("\r\n", "\n").replace("\n", self._pty_newline)
+            yield chunk
+            i = end
+        if bracketed:
+            yield _PASTE_END
+        if submit and generation == self._paste_generation:
+            yield self._pty_newline if self._use_pty else "\n"
+
+    def _send(self, data):
+        """Queue a string (or an iterable of strings) for the writer thread. Returns
+        False when the queue is full because the shell stopped reading its input.
+        """
+        try:
+            self._write_queue.put_nowait(data)
+        except queue.Full:
+            logger.debug("write queue full, dropping input")
+            return False
+        return True
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is None or self._closed:
+                return
             try:
-                to_send = line if line.endswith("\r\n") else line.replace("\n", "\r\n")
-                if isinstance(to_send, bytes):
-                    to_send = to_send.decode(self._encoding, errors=self._errors)
-                self._pty.write(to_send)
+                for chunk in ((item,) if isinstance(item, str) else item):
+                    self._write_now(chunk)
+            finally:
+                self._write_queue.task_done()
+
+    def _write_now(self, text):
+        """Write text to the PTY or the pipe, ignoring a closed shell. May block."""
+        if self._use_pty and self._pty is not None:
+            try:
+                self._pty.write(text)
             except (OSError, BrokenPipeError, ValueError):
                 pass
             return
         if self._process is None or self._process.stdin is None:
             return
         try:
-            self._process.stdin.write(
-                line.encode(self._encoding, errors=self._errors)
-            )
+            self._process.stdin.write(text.encode(self._encoding, errors=self._errors))
             self._process.stdin.flush()
         except (OSError, BrokenPipeError, ValueError):
             pass
 
     def history_prev(self):
-        """Return the previous command in history, or None if at top or empty."""
-        if not self._history:
-            return None
-        if self._history_index <= 0:
-            self._history_index = 0
-            return self._history[0]
-        self._history_index -= 1
-        return self._history[self._history_index]
+        """Return the previous (older) command in history; the oldest again when
+        already there. None if the history is empty.
+        """
+        previous = self.history.older(self._history_cursor)
+        if previous is None:
+            return self.history.get(self._history_cursor)
+        self._history_cursor = previous
+        return self.history.get(previous)
 
     def history_next(self):
-        """Return the next command in history; '' when moving to bottom (empty line). None if already at bottom."""
-        if self._history_index < 0:
+        """Return the next (newer) command in history; '' when moving past the newest
+        (empty line). None if already at the bottom.
+        """
+        if self._history_cursor is None:
             return None
-        if self._history_index >= len(self._history) - 1:
-            self._history_index = -1
-            return ""
-        self._history_index += 1
-        return self._history[self._history_index]
+        self._history_cursor = self.history.newer(self._history_cursor)
+        return self.history.get(self._history_cursor) or ""
+
+    def set_history_cursor(self, entry_id):
+        """Continue Up/Down navigation from a history entry (e.g. one found by search)."""
+        self._history_cursor = entry_id
 
     def send_interrupt(self):
-        """Send Ctrl+C to the shell process."""
-        if self._use_pty and self._pty is not None:
-            try:
-                self._pty.write("\x03")
-            except (OSError, BrokenPipeError, ValueError):
-                pass
-            return
-        if self._process is None or self._process.stdin is None:
-            return
-        try:
-            self._process.stdin.write(b"\x03")
-            self._process.stdin.flush()
-        except (OSError, BrokenPipeError, ValueError):
-            pass
+        """Send Ctrl+C to the shell process, cancelling pastes still being sent."""
+        self._paste_generation += 1
+        self._send("\x03")
 
     def setwinsize(self, rows, cols):
         """Set the PTY terminal size (rows, cols). No-op in pipe mode. Call when
         the shell scene is shown so programs like SSH get the size and show prompts.
+        The emulated screen follows the new size.
         """
+        with self._screen_lock:
+            self.screen.resize(rows, cols)
         if self._use_pty and self._pty is not None:
             try:
                 self._pty.setwinsize(rows, cols)
             except Exception:
                 pass
 
+    def close(self):
+        """Stop the shell and its reader and writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._paste_generation += 1
+        reactor_owns_fd = self._reactor is not None and self._reader_fd is not None
+        if reactor_owns_fd:
+            self._reactor.unregister(self._reader_fd, self._release_reader_fd)
+        try:
+            if self._pty is not None:
+                self._pty.terminate(close=not reactor_owns_fd)
+            elif self._process is not None:
+                self._process.terminate()
+                self._process.stdin.close()
+        except Exception:
+            logger.debug("shell close failed", exc_info=True)
+        try:
+            self._write_queue.put_nowait(None)
+        except queue.Full:
+            pass  # the writer fails on the closed shell and drains the queue
+        if self.log is not None:
+            self.log.close(delete=True)
+
+    def _release_reader_fd(self):
+        """Closes the output fd once the reactor has stopped watching it (reactor thread)."""
+        if self._pty is not None:
+            self._pty.close()
+        elif self._process is not None:
+            self._process.stdout.close()
+
+    def pid(self):
+        """Process id of the shell, or None."""
+        try:
+            if self._pty is not None:
+                return self._pty.pid
+            return self._process.pid if self._process is not None else None
+        except Exception:
+            return None
+
+    def cwd(self):
+        """The shell's working directory. Followed through /proc where there is one
+        (Linux), so `cd` is seen without asking the shell; elsewhere the directory
+        it was started in.
+        """
+        pid = self.pid()
+        if pid is not None and os.path.isdir("/proc/self"):
+            try:
+                return os.readlink(f"/proc/{pid}/cwd")
+            except OSError:
+                pass
+        return self._cwd
+
     def is_alive(self):
         """True if the shell process is still running."""
         if self._use_pty and self._pty is not None:
@@ -0,0 +1,264 @@
+"""
+Single-producer ring of output lines in shared memory, written by the shell
+host process and read by the UI process without locks or pickling per frame.
+
+Layout of the block: a small header of u64 counters, a state mailbox for
+low-rate state (pending line, emulated screen), then the line data. Lines are
+records [u32 length][u8 kind][u64 seq][payload] appended at a monotonically growing
+byte position `head`; plain lines are UTF-8, attributed lines are pickled
+StyledLines. A record never wraps: when it does not fit before the end of the
+buffer the writer skips to the start. Before overwriting old records the
+writer advances `oldest`, so a reader that was overtaken (or copied bytes that
+were being overwritten) notices and resynchronizes at the oldest intact line.
+The state mailbox is a seqlock: its version is odd while it is being written.
+The header counters are read and written as whole aligned machine words
+(struct packs byte by byte, so the other process could see half an update).
+"""
+import pickle
+import struct
+import time
+from collections import deque
+
+# Header words: head, oldest, next_seq, oldest_seq, state_version; then the u32 state_length at byte 40.
+_HEADER_BYTES = 64
+_RECORD = struct.Struct("<IBQ")
+_PAD = 0xFFFFFFFF  # length marking the unused tail before a wrap
+_PAD_BYTES = struct.pack("<I", _PAD)
+_PLAIN = 0
+_PICKLED = 1
+
+STATE_BYTES = 1 << 18
+DEFAULT_RING_BYTES = 8 << 20
+READ_LIMIT = 1 << 16  # bytes a reader takes per read(), so one call stays within a frame budget
+
+
+def ring_size(data_bytes=DEFAULT_RING_BYTES):
+    """Total shared-memory size for a ring with data_bytes of line storage."""
+    return _HEADER_BYTES + STATE_BYTES + data_bytes
+
+
+class _RingBase:
+    def __init__(self, buf):
+        self._buf = buf
+        self._words = buf[:_HEADER_BYTES].cast("Q")  # header counters as native u64 words
+        self._data_start = _HEADER_BYTES + STATE_BYTES
+        self.capacity = len(buf) - self._data_start
+        self.max_record = min(self.capacity // 4, READ_LIMIT)  # longer lines are truncated
+
+    def _header(self):
+        words = self._words
+        return words[0], words[1], words[2], words[3], words[4], struct.unpack_from("<I", self._buf, 40)[0]
+
+    def _set(self, index, value):
+        self._words[index] = value
+
+
+class SharedLineRing(_RingBase):
+    """The writing side, used by the shell host."""
+
+    def __init__(self, buf):
+        """
+        Initializes the ring over a zeroed shared-memory buffer.
+
+        Args:
+            buf: The SharedMemory's buf (memoryview) of ring_size() bytes.
+        """
+        super().__init__(buf)
+        self._head = 0
+        self._seq = 0
+        self._state_version = 0
+        self._records = deque()  # (position, seq) of each record still in the buffer
+
+    def append(self, lines, first_seq=None):
+        """
+        Appends lines (str or StyledLine) and publishes them.
+
+        Args:
+            lines: The lines to append.
+            first_seq: Sequence number of the first line, when lines before it
+                were dropped upstream (default: right after the previous line).
+        """
+        if first_seq is not None:
+            self._seq = max(self._seq, first_seq)
+        records = []
+        for line in lines:
+            if getattr(line, "runs", None):
+                payload, kind = pickle.dumps(line, protocol=pickle.HIGHEST_PROTOCOL), _PICKLED
+            else:
+                payload, kind = str(line).encode("utf-8", "replace"), _PLAIN
+            if len(payload) + _RECORD.size > self.max_record:
+                payload, kind = str(line)[:self.max_record // 4].encode("utf-8", "replace"), _PLAIN
+            records.append((payload, kind))
+        # Publish in chunks of at most half the buffer so a chunk never overwrites itself.
+        chunk = []
+        size = 0
+        for record in records:
+            size += _RECORD.size + len(record[0])
+            if size > self.capacity // 2 and chunk:
+                self._append_records(chunk)
+                chunk = []
+                size = _RECORD.size + len(record[0])
+            chunk.append(record)
+        if chunk:
+            self._append_records(chunk)
+
+    def _append_records(self, records):
+        capacity = self.capacity
+        # Lay the batch out first so `oldest` can be published before any byte is overwritten.
+        layout = []
+        head = self._head
+        for payload, kind in records:
+            need = _RECORD.size + len(payload)
+            offset = head % capacity
+            if offset + need > capacity:
+                layout.append((head, None, None))  # pad to the end of the buffer
+                head += capacity - offset
+            layout.append((head, payload, kind))
+            head += need
+        starts = self._records
+        seq = self._seq
+        for position, payload, _ in layout:
+            if payload is not None:
+                starts.append((position, seq))
+                seq += 1
+        while starts and starts[0][0] < head - capacity:
+            starts.popleft()
+        oldest, oldest_seq = starts[0]
+        self._set(3, oldest_seq)
+        self._set(1, oldest)
+        buf = self._buf
+        base = self._data_start
+        seq = self._seq
+        for position, payload, kind in layout:
+            offset = base + position % capacity
+            if payload is None:
+                if position % capacity + 4 <= capacity:
+                    struct.pack_into("<I", buf, offset, _PAD)
+                continue
+            _RECORD.pack_into(buf, offset, len(payload), kind, seq)
+            seq += 1
+            start = offset + _RECORD.size
+            buf[start:start + len(payload)] = payload
+        self._head = head
+        self._seq = seq
+        self._set(2, seq)
+        self._set(0, head)
+
+    def publish_state(self, state):
+        """
+        Replaces the state mailbox with a picklable object (too large states are dropped).
+        """
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > STATE_BYTES:
+            return
+        self._state_version += 1  # odd: writing
+        self._set(4, self._state_version)
+        self._buf[_HEADER_BYTES:_HEADER_BYTES + len(payload)] = payload
+        struct.pack_into("<I", self._buf, 40, len(payload))
+        self._state_version += 1
+        self._set(4, self._state_version)
+
+
+class SharedLineReader(_RingBase):
+    """The reading side, used by the UI process. Not thread-safe; one reader per ring."""
+
+    MAX_RETRIES = 8
+
+    def __init__(self, buf):
+        """
+        Initializes the reader at the start of the ring.
+
+        Args:
+            buf: The SharedMemory's buf of the ring.
+        """
+        super().__init__(buf)
+        self._position = 0
+        self._seq = 0
+        self._state_version = 0
+
+    def read(self, limit=READ_LIMIT):
+        """
+        Returns (lines, next_seq): lines appended since the last call, at most
+        about `limit` bytes of them, and the sequence number following the last
+        one. Sequence numbers skip lines that were overwritten before they could
+        be read or dropped by the writer.
+        """
+        for _ in range(self.MAX_RETRIES):
+            # Sequence numbers come only from record headers: oldest_seq is stored
+            # apart from oldest, so the pair read here may not belong together.
+            head, oldest, _, _, _, _ = self._header()
+            position = self._position
+            if position < oldest:
+                position = oldest
+            if position >= head:
+                self._position = position
+                return [], self._seq
+            data = self._copy(position, min(head, position + max(limit, self.max_record)))
+            if self._header()[1] > position:
+                continue  # overwritten while copying; resynchronize
+            lines, used, next_seq = self._parse(data, position)
+            self._position = position + used
+            self._seq = next_seq
+            return lines, self._seq
+        return [], self._seq
+
+    def read_state(self):
+        """
+        Returns the state object when it changed since the last call, else None.
+        """
+        for _ in range(self.MAX_RETRIES):
+            version = self._header()[4]
+            if version == self._state_version:
+                return None
+            if version & 1:
+                time.sleep(0)
+                continue
+            length = struct.unpack_from("<I", self._buf, 40)[0]
+            payload = bytes(self._buf[_HEADER_BYTES:_HEADER_BYTES + length])
+            if self._header()[4] != version:
+                continue
+            self._state_version = version
+            return pickle.loads(payload)
+        return None
+
+    def _copy(self, start, end):
+        """Copies data bytes [start, end) of the ring, which may wrap once."""
+        capacity = self.capacity
+        base = self._data_start
+        lo = start % capacity
+        length = end - start
+        if lo + length <= capacity:
+            return bytes(self._buf[base + lo:base + lo + length])
+        first = capacity - lo
+        return bytes(self._buf[base + lo:base + capacity]) + bytes(self._buf[base:base + length - first])
+
+    def _parse(self, data, position):
+        """Decodes the whole records in data. Returns (lines, bytes used, next seq)."""
+        lines = []
+        append = lines.append
+        unpack = _RECORD.unpack_from
+        header = _RECORD.size
+        capacity = self.capacity
+        loads = pickle.loads
+        next_seq = self._seq
+        i = 0
+        n = len(data)
+        while i < n:
+            offset = (position + i) % capacity
+            if capacity - offset < header or data[i:i + 4] == _PAD_BYTES:
+                i += capacity - offset  # the writer skipped to the start of the buffer
+                continue
+            if i + header > n:
+                break
+            length, kind, next_seq = unpack(data, i)
+            start = i + header
+            i = start + length
+            if i > n:
+                i = start - header  # the rest of the record is left for the next read
+                break
+            if kind:
+                append(loads(data[start:i]))
+            else:
+                append(data[start:i].decode("utf-8", "replace"))
+            next_seq += 1
+        return lines, i, next_seq  # i may point past data, at the record after a pad
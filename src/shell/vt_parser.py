@@ -0,0 +1,390 @@
+"""
+VT500-series escape sequence parser, after Paul Williams' DEC-compatible state
+machine (https://vt100.net/emu/dec_ansi_parser).
+
+VTParser consumes decoded terminal output exactly once and reports what it finds
+to a handler: printable runs, C0/C1 controls, and CSI, ESC, OSC and DCS
+sequences. All state, including half-received parameters and OSC strings, is
+kept between feed() calls, so escapes split across reads are never mangled.
+In the ground state, runs of printable text (and the CR/LF between lines) are
+matched with one regex and reported as a single text() call instead of
+character by character; handlers that don't need that can ignore it and get
+print()/execute() calls as usual.
+
+Parameters are accumulated as numbers: digits past MAX_PARAM_VALUE and
+parameters past MAX_PARAMS (or sub-parameters past MAX_SUBPARAMS) are
+dropped as they arrive, so an endless parameter string costs nothing.
+Sub-parameters separated by ":" (38:2::255:128:0, 4:3) stay with the
+parameter they belong to, as a Param. A sequence the parser or handler
+chokes on is logged and dropped, and parsing carries on in the ground
+state; the output after it is never lost.
+"""
+import logging
+import re
+
+GROUND = 0
+ESCAPE = 1
+ESCAPE_INTERMEDIATE = 2
+CSI_ENTRY = 3
+CSI_PARAM = 4
+CSI_INTERMEDIATE = 5
+CSI_IGNORE = 6
+OSC_STRING = 7
+DCS_ENTRY = 8
+DCS_PARAM = 9
+DCS_INTERMEDIATE = 10
+DCS_PASSTHROUGH = 11
+DCS_IGNORE = 12
+SOS_PM_APC_STRING = 13
+
+MAX_PARAMS = 32
+MAX_SUBPARAMS = 8
+MAX_PARAM_VALUE = 65535
+MAX_OSC_LENGTH = 4096
+
+_TEXT_BLOCK = re.compile(r"[^\x00-\x09\x0b\x0c\x0e-\x1f\x7f-\x9f]+")  # printable, CR, LF
+_TEXT_PARTS = re.compile(r"[\r\n]|[^\r\n]+")
+_OSC_END = re.compile(r"[\x07\x18\x1a\x1b\x9c]")     # BEL, CAN, SUB, ESC, ST
+_STRING_END = re.compile(r"[\x18\x1a\x1b\x9c]")       # DCS data / SOS / PM / APC
+
+logger = logging.getLogger(__name__)
+
+
+class Param(int):
+    """
+    A CSI parameter that had ":" sub-parameters: compares and computes as the
+    parameter itself, and carries the sub-parameters in `sub`.
+    """
+
+    def __new__(cls, value, sub):
+        obj = super().__new__(cls, value)
+        obj.sub = tuple(sub)
+        return obj
+
+
+class VTHandler:
+    """
+    Receives parser events. Every method is a no-op, so consumers only override
+    what they care about.
+    """
+
+    def text(self, text):
+        """
+        A block of printable characters mixed with CR and LF. The default splits
+        it into print() and execute() calls; line-oriented consumers can override
+        this to take whole lines at once.
+        """
+        for part in _TEXT_PARTS.findall(text):
+            if part == "\r" or part == "\n":
+                self.execute(part)
+            else:
+                self.print(part)
+
+    def print(self, text):
+        """A run of printable characters."""
+
+    def execute(self, ch):
+        """A C0 or C1 control character (CR, LF, BS, TAB, BEL, ...)."""
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        """
+        A complete control sequence, e.g. ESC [ 1 ; 32 m.
+
+        Args:
+            final: Final character ("m", "K", "H", ...).
+            params: List of ints; omitted parameters are 0. A parameter with
+                sub-parameters (separated by ":") is a Param, whose `sub`
+                holds them.
+            private: Private marker ("?", ">", "<", "=") or "".
+            intermediates: Intermediate characters (0x20-0x2F), usually "".
+        """
+
+    def esc_dispatch(self, final, intermediates):
+        """An escape sequence that is not CSI/OSC/DCS, e.g. ESC 7 or ESC ( B."""
+
+    def osc_dispatch(self, data):
+        """An operating system command string, e.g. "0;window title"."""
+
+    def dcs_hook(self, final, params, private, intermediates):
+        """Start of a device control string."""
+
+    def dcs_put(self, data):
+        """Data of a device control string."""
+
+    def dcs_unhook(self):
+        """End of a device control string."""
+
+
+class VTParser:
+    """
+    The state machine. feed() may be called with text of any length; partial
+    sequences at the end are completed by the next call.
+    """
+
+    def __init__(self, handler):
+        """
+        Initializes the VTParser.
+
+        Args:
+            handler: VTHandler receiving the parsed events.
+        """
+        self.handler = handler
+        self.state = GROUND
+        self._params = []  # finished parameters of the current sequence
+        self._param = None  # number being read; None until a digit or separator arrives
+        self._group = None  # earlier numbers of the parameter being read, when it has sub-parameters
+        self._private = ""
+        self._intermediates = ""
+        self._osc = []
+        self._osc_length = 0
+
+    def reset(self):
+        """
+        Returns to the ground state, dropping any partial sequence.
+        """
+        self.state = GROUND
+        self._clear()
+
+    def feed(self, text):
+        """
+        Parses a chunk of decoded terminal output.
+
+        Args:
+            text: Output text; may end in the middle of a sequence.
+        """
+        handler = self.handler
+        text_block = _TEXT_BLOCK.match
+        i = 0
+        n = len(text)
+        while i < n:
+            try:
+                while i < n:
+                    state = self.state
+                    if state == GROUND:
+                        m = text_block(text, i)
+                        if m is not None:
+                            i = m.end()
+                            handler.text(m.group())
+                            if i >= n:
+                                break
+                        ch = text[i]
+                        i += 1
+                        self._anywhere(ch)
+                    elif state == OSC_STRING:
+                        i = self._osc_string(text, i)
+                    elif state in (DCS_PASSTHROUGH, DCS_IGNORE, SOS_PM_APC_STRING):
+                        i = self._string(text, i)
+                    else:
+                        ch = text[i]
+                        i += 1
+                        code = ord(ch)
+                        if code < 0x20 or 0x7f <= code <= 0x9f:
+                            self._anywhere(ch)
+                        elif state == ESCAPE:
+                            self._escape(ch, code)
+                        elif state == ESCAPE_INTERMEDIATE:
+                            self._escape_intermediate(ch, code)
+                        elif state in (CSI_ENTRY, CSI_PARAM, CSI_INTERMEDIATE, CSI_IGNORE):
+                            self._csi(ch, code)
+                        else:
+                            self._dcs(ch, code)
+            except Exception:
+                # i is already past the offending character, so the rest is parsed as usual.
+                logger.warning("dropping malformed terminal sequence", exc_info=True)
+                self.reset()
+
+    def _clear(self):
+        self._params = []
+        self._param = None
+        self._group = None
+        self._private = ""
+        self._intermediates = ""
+
+    def _anywhere(self, ch):
+        """
+        Controls and the transitions that apply in every state.
+        """
+        code = ord(ch)
+        if ch == "\x1b":
+            self._end_string()
+            self.state = ESCAPE
+            self._clear()
+        elif code in (0x18, 0x1a):  # CAN, SUB abort any sequence
+            self._end_string()
+            self.state = GROUND
+            self.handler.execute(ch)
+        elif code == 0x9b:
+            self._end_string()
+            self.state = CSI_ENTRY
+            self._clear()
+        elif code == 0x9d:
+            self._end_string()
+            self._start_osc()
+        elif code == 0x90:
+            self._end_string()
+            self.state = DCS_ENTRY
+            self._clear()
+        elif code in (0x98, 0x9e, 0x9f):
+            self._end_string()
+            self.state = SOS_PM_APC_STRING
+        elif code == 0x9c:
+            self._end_string()
+            self.state = GROUND
+        elif code == 0x7f:
+            pass  # DEL is ignored
+        elif code < 0x20 or code >= 0x80:
+            if self.state in (DCS_PASSTHROUGH, DCS_IGNORE, SOS_PM_APC_STRING):
+                return  # controls inside strings are ignored
+            self.handler.execute(ch)
+            if code >= 0x80:
+                self.state = GROUND
+
+    def _end_string(self):
+        """
+        Finishes an OSC/DCS string when it is terminated (by ST, ESC, CAN or SUB).
+        """
+        if self.state == OSC_STRING:
+            self.handler.osc_dispatch("".join(self._osc))
+            self._osc = []
+        elif self.state == DCS_PASSTHROUGH:
+            self.handler.dcs_unhook()
+
+    def _escape(self, ch, code):
+        if code <= 0x2f:
+            self._intermediates += ch
+            self.state = ESCAPE_INTERMEDIATE
+        elif ch == "[":
+            self.state = CSI_ENTRY
+            self._clear()
+        elif ch == "]":
+            self._start_osc()
+        elif ch == "P":
+            self.state = DCS_ENTRY
+            self._clear()
+        elif ch in "X^_":
+            self.state = SOS_PM_APC_STRING
+        else:
+            self.state = GROUND
+            self.handler.esc_dispatch(ch, self._intermediates)
+
+    def _escape_intermediate(self, ch, code):
+        if code <= 0x2f:
+            self._intermediates += ch
+        else:
+            self.state = GROUND
+            self.handler.esc_dispatch(ch, self._intermediates)
+
+    def _csi(self, ch, code):
+        state = self.state
+        if 0x40 <= code <= 0x7e:
+            self.state = GROUND
+            if state != CSI_IGNORE:
+                self.handler.csi_dispatch(ch, self._parse_params(), self._private, self._intermediates)
+        elif state == CSI_IGNORE:
+            pass
+        elif code <= 0x2f:
+            self._intermediates += ch
+            self.state = CSI_INTERMEDIATE
+        elif state == CSI_INTERMEDIATE:
+            self.state = CSI_IGNORE  # parameter after an intermediate
+        elif code <= 0x3b:  # digits, ":" and ";"
+            self._add_param_char(code)
+            self.state = CSI_PARAM
+        elif state == CSI_ENTRY:
+            self._private += ch  # "<", "=", ">", "?"
+            self.state = CSI_PARAM
+        else:
+            self.state = CSI_IGNORE
+
+    def _dcs(self, ch, code):
+        state = self.state
+        if 0x40 <= code <= 0x7e:
+            self.state = DCS_PASSTHROUGH
+            self.handler.dcs_hook(ch, self._parse_params(), self._private, self._intermediates)
+        elif code <= 0x2f:
+            self._intermediates += ch
+            self.state = DCS_INTERMEDIATE
+        elif state == DCS_INTERMEDIATE:
+            self.state = DCS_IGNORE
+        elif code <= 0x3b:
+            self._add_param_char(code)
+            self.state = DCS_PARAM
+        elif state == DCS_ENTRY:
+            self._private += ch
+            self.state = DCS_PARAM
+        else:
+            self.state = DCS_IGNORE
+
+    def _start_osc(self):
+        self.state = OSC_STRING
+        self._osc = []
+        self._osc_length = 0
+
+    def _osc_string(self, text, i):
+        """
+        Collects OSC data up to the next terminator; returns the new position.
+        """
+        m = _OSC_END.search(text, i)
+        end = len(text) if m is None else m.start()
+        if end > i and self._osc_length < MAX_OSC_LENGTH:
+            part = text[i:min(end, i + MAX_OSC_LENGTH - self._osc_length)]
+            self._osc.append(part)
+            self._osc_length += len(part)
+        if m is None:
+            return end
+        if text[end] == "\x07":  # xterm also ends OSC with BEL
+            self._end_string()
+            self.state = GROUND
+        else:
+            self._anywhere(text[end])
+        return end + 1
+
+    def _string(self, text, i):
+        """
+        Passes DCS data to the handler (or skips SOS/PM/APC and ignored DCS) up to
+        the next terminator; returns the new position.
+        """
+        m = _STRING_END.search(text, i)
+        end = len(text) if m is None else m.start()
+        if end > i and self.state == DCS_PASSTHROUGH:
+            self.handler.dcs_put(text[i:end])
+        if m is None:
+            return end
+        self._anywhere(text[end])
+        return end + 1
+
+    def _add_param_char(self, code):
+        """
+        Adds a digit, ":" or ";" to the parameters, dropping what is over the limits.
+        """
+        value = self._param or 0
+        if code <= 0x39:
+            if value <= MAX_PARAM_VALUE:
+                self._param = value * 10 + code - 0x30
+        elif code == 0x3a:  # ":" starts a sub-parameter of the current parameter
+            group = self._group
+            if group is None:
+                self._group = [min(value, MAX_PARAM_VALUE)]
+            elif len(group) <= MAX_SUBPARAMS:
+                group.append(min(value, MAX_PARAM_VALUE))
+            self._param = 0
+        else:
+            if len(self._params) < MAX_PARAMS:
+                self._params.append(self._finish_param(value))
+            self._param = 0
+            self._group = None
+
+    def _finish_param(self, value):
+        value = min(value, MAX_PARAM_VALUE)
+        group = self._group
+        if group is None:
+            return value
+        if len(group) <= MAX_SUBPARAMS:
+            group.append(value)
+        return Param(group[0], group[1:])
+
+    def _parse_params(self):
+        if self._param is None:
+            return []
+        params = self._params + [self._finish_param(self._param)]
+        return params[:MAX_PARAMS]
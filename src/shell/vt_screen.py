@@ -0,0 +1,566 @@
+"""
+VT100/xterm screen emulation: a fixed rows x cols cell grid driven by VTParser
+events, for full-screen programs (top, htop, vim, less) that address the
+cursor instead of printing lines.
+
+Supports cursor movement, scroll regions, insert/delete of lines and
+characters, erase operations, SGR, the DEC line-drawing charset, the
+alternate screen (47/1047/1049), and the modes those programs toggle. Every
+change marks its row dirty, so a renderer only has to redraw the rows in
+take_dirty().
+
+AltScreenRouter decides which output the screen sees: full-screen programs
+either switch to the alternate screen (vim, less, htop) or clear the main
+screen and address it directly (procps top, watch, clear); everything else
+goes to the line-oriented scrollback.
+"""
+from itertools import groupby
+
+from src.shell.ansi import DEFAULT_STYLE, Style, apply_sgr, make_line
+from src.shell.vt_parser import VTHandler
+
+ALT_SCREEN_MODES = (47, 1047, 1049)
+
+# DEC special graphics (ESC ( 0), as used for boxes and borders.
+_DEC_GRAPHICS = str.maketrans({
+    "`": "◆", "a": "▒", "f": "°", "g": "±", "j": "┘", "k": "┐", "l": "┌", "m": "└",
+    "n": "┼", "o": "⎺", "p": "⎻", "q": "─", "r": "⎼", "s": "⎽", "t": "├", "u": "┤",
+    "v": "┴", "w": "┬", "x": "│", "y": "≤", "z": "≥", "{": "π", "|": "≠", "}": "£",
+    "~": "·",
+})
+
+
+class VTScreen(VTHandler):
+    """
+    The screen state. Rows are kept as two parallel lists per row (characters
+    and Styles) so runs of text are written with slice assignment. Replies the
+    program asked for (cursor position, device attributes) collect in
+    `responses` for the owner to send back.
+    """
+
+    TAB_WIDTH = 8
+
+    def __init__(self, rows=24, cols=80):
+        """
+        Initializes the VTScreen.
+
+        Args:
+            rows: Number of rows.
+            cols: Number of columns.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.responses = []
+        self.dirty = set()
+        self.active = False  # set by AltScreenRouter while the screen, not the scrollback, shows output
+        self.on_scroll_off = None  # called before LF scrolls a full-height main screen
+        self._main = self._blank_buffer()
+        self._alt = None
+        self.reset()
+
+    def reset(self):
+        """
+        Full reset (RIS): main screen, cleared, default modes.
+        """
+        self._chars, self._styles = self._main
+        self.alt_screen = False
+        self.style = DEFAULT_STYLE
+        self.x = 0
+        self.y = 0
+        self.top = 0
+        self.bottom = self.rows - 1
+        self.autowrap = True
+        self.insert_mode = False
+        self.origin_mode = False
+        self.cursor_visible = True
+        self.application_cursor_keys = False
+        self.bracketed_paste = False
+        self._wrap_pending = False
+        self._line_drawing = False
+        self._saved = None
+        self._erase_rows(0, self.rows)
+
+    # -- queries -----------------------------------------------------------
+
+    def take_dirty(self):
+        """
+        Returns and clears the set of rows changed since the last call.
+        """
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+    def row_line(self, y):
+        """
+        Returns row y as a str, or a StyledLine when it has attributes. Trailing
+        blank cells without a background are dropped.
+        """
+        chars = self._chars[y]
+        styles = self._styles[y]
+        text = "".join(chars)
+        if styles.count(DEFAULT_STYLE) == len(styles):
+            return text.rstrip(" ")
+        end = len(text)
+        while end > 0 and chars[end - 1] == " " and styles[end - 1].bg is None and not styles[end - 1].inverse:
+            end -= 1
+        runs = []
+        pos = 0
+        for style, group in groupby(styles[:end]):
+            length = sum(1 for _ in group)
+            runs.append((pos, pos + length, style))
+            pos += length
+        return make_line(text[:end], runs)
+
+    # -- VTHandler ---------------------------------------------------------
+
+    def print(self, text):
+        if self._line_drawing:
+            text = text.translate(_DEC_GRAPHICS)
+        cols = self.cols
+        i = 0
+        n = len(text)
+        while i < n:
+            if self._wrap_pending:
+                self._wrap_pending = False
+                if self.autowrap:
+                    self.x = 0
+                    self._linefeed()
+            x = self.x
+            chunk = text[i:i + cols - x]
+            k = len(chunk)
+            chars = self._chars[self.y]
+            styles = self._styles[self.y]
+            if self.insert_mode:
+                chars[x:x] = chunk
+                styles[x:x] = [self.style] * k
+                del chars[cols:]
+                del styles[cols:]
+                self.dirty.add(self.y)
+            else:
+                new_chars = list(chunk)
+                new_styles = [self.style] * k
+                # Programs like top rewrite whole rows each refresh; only real changes count.
+                if chars[x:x + k] != new_chars or styles[x:x + k] != new_styles:
+                    chars[x:x + k] = new_chars
+                    styles[x:x + k] = new_styles
+                    self.dirty.add(self.y)
+            i += k
+            if x + k >= cols:
+                self.x = cols - 1
+                self._wrap_pending = True
+            else:
+                self.x = x + k
+
+    def execute(self, ch):
+        if ch == "\r":
+            self.x = 0
+            self._wrap_pending = False
+        elif ch == "\n" or ch == "\x0b" or ch == "\x0c":
+            if (self.on_scroll_off is not None and self.y == self.bottom and not self.alt_screen
+                    and self.top == 0 and self.bottom == self.rows - 1):
+                self.on_scroll_off()
+            self._linefeed()
+        elif ch == "\b":
+            if self.x > 0:
+                self.x -= 1
+            self._wrap_pending = False
+        elif ch == "\t":
+            self.x = min(self.cols - 1, (self.x // self.TAB_WIDTH + 1) * self.TAB_WIDTH)
+            self._wrap_pending = False
+        elif ch == "\x84":  # IND
+            self._linefeed()
+        elif ch == "\x85":  # NEL
+            self.x = 0
+            self._linefeed()
+        elif ch == "\x8d":  # RI
+            self._reverse_index()
+
+    def esc_dispatch(self, final, intermediates):
+        if intermediates == "(":
+            self._line_drawing = final == "0"
+            return
+        if intermediates:
+            return
+        if final == "7":
+            self._save_cursor()
+        elif final == "8":
+            self._restore_cursor()
+        elif final == "D":
+            self._linefeed()
+        elif final == "E":
+            self.x = 0
+            self._linefeed()
+        elif final == "M":
+            self._reverse_index()
+        elif final == "c":
+            self.reset()
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        if intermediates:
+            return
+        if final in "hl":
+            self._set_modes(params, private, final == "h")
+            return
+        if private:
+            if private == ">" and final == "c":
+                self.responses.append("\x1b[>0;10;1c")
+            return
+        p0 = params[0] if params else 0
+        n = max(1, p0)
+        self._wrap_pending = False
+        if final == "m":
+            self.style = apply_sgr(self.style, params)
+        elif final == "A":
+            self.y = max(self.top if self.y >= self.top else 0, self.y - n)
+        elif final in "Be":
+            self.y = min(self.bottom if self.y <= self.bottom else self.rows - 1, self.y + n)
+        elif final in "Ca":
+            self.x = min(self.cols - 1, self.x + n)
+        elif final == "D":
+            self.x = max(0, self.x - n)
+        elif final == "E":
+            self.y = min(self.bottom if self.y <= self.bottom else self.rows - 1, self.y + n)
+            self.x = 0
+        elif final == "F":
+            self.y = max(self.top if self.y >= self.top else 0, self.y - n)
+            self.x = 0
+        elif final in "G`":
+            self.x = min(self.cols - 1, n - 1)
+        elif final in "Hf":
+            row = n
+            col = max(1, params[1]) if len(params) > 1 else 1
+            self._move_to(row - 1, col - 1)
+        elif final == "d":
+            self._move_to(n - 1, self.x)
+        elif final == "J":
+            self._erase_in_display(p0)
+        elif final == "K":
+            self._erase_in_line(p0)
+        elif final == "L":
+            if self.top <= self.y <= self.bottom:
+                self._scroll_down(n, self.y, self.bottom)
+                self.x = 0
+        elif final == "M":
+            if self.top <= self.y <= self.bottom:
+                self._scroll_up(n, self.y, self.bottom)
+                self.x = 0
+        elif final == "P":
+            self._delete_chars(n)
+        elif final == "@":
+            self._insert_chars(n)
+        elif final == "X":
+            self._erase_cells(self.y, self.x, min(self.cols, self.x + n))
+        elif final == "S":
+            self._scroll_up(n, self.top, self.bottom)
+        elif final == "T":
+            self._scroll_down(n, self.top, self.bottom)
+        elif final == "r":
+            top = max(1, p0) - 1
+            bottom = (params[1] if len(params) > 1 and params[1] else self.rows) - 1
+            bottom = min(bottom, self.rows - 1)
+            if top < bottom:
+                self.top, self.bottom = top, bottom
+                self._move_to(0, 0)
+        elif final == "s":
+            self._save_cursor()
+        elif final == "u":
+            self._restore_cursor()
+        elif final == "n":
+            if p0 == 5:
+                self.responses.append("\x1b[0n")
+            elif p0 == 6:
+                row = self.y - self.top + 1 if self.origin_mode else self.y + 1
+                self.responses.append(f"\x1b[{row};{self.x + 1}R")
+        elif final == "c" and p0 == 0:
+            self.responses.append("\x1b[?1;2c")
+
+    # -- size and screens --------------------------------------------------
+
+    def resize(self, rows, cols):
+        """
+        Changes the screen size, keeping the cursor row visible.
+        """
+        if (rows, cols) == (self.rows, self.cols):
+            return
+        for buffer in (self._main, self._alt):
+            if buffer is None:
+                continue
+            chars, styles = buffer
+            if len(chars) > rows:
+                drop = max(0, min(len(chars) - rows, self.y - rows + 1))
+                del chars[:drop]
+                del styles[:drop]
+                del chars[rows:]
+                del styles[rows:]
+            for row_chars, row_styles in zip(chars, styles):
+                del row_chars[cols:]
+                del row_styles[cols:]
+                row_chars.extend(" " * (cols - len(row_chars)))
+                row_styles.extend([DEFAULT_STYLE] * (cols - len(row_styles)))
+            while len(chars) < rows:
+                chars.append([" "] * cols)
+                styles.append([DEFAULT_STYLE] * cols)
+        self.y = min(self.y, rows - 1)
+        self.rows = rows
+        self.cols = cols
+        self.x = min(self.x, cols - 1)
+        self.top = 0
+        self.bottom = rows - 1
+        self._wrap_pending = False
+        self.dirty = set(range(rows))
+
+    def _set_modes(self, params, private, enable):
+        for mode in params:
+            if private == "?":
+                if mode == 1:
+                    self.application_cursor_keys = enable
+                elif mode == 6:
+                    self.origin_mode = enable
+                    self._move_to(0, 0)
+                elif mode == 7:
+                    self.autowrap = enable
+                elif mode == 25:
+                    self.cursor_visible = enable
+                elif mode in ALT_SCREEN_MODES:
+                    self._switch_screen(enable, mode)
+                elif mode == 1048:
+                    if enable:
+                        self._save_cursor()
+                    else:
+                        self._restore_cursor()
+                elif mode == 2004:
+                    self.bracketed_paste = enable
+            elif not private and mode == 4:
+                self.insert_mode = enable
+
+    def _switch_screen(self, enable, mode):
+        if enable == self.alt_screen:
+            return
+        if enable:
+            if mode == 1049:
+                self._save_cursor()
+            self._alt = self._blank_buffer()
+            self._chars, self._styles = self._alt
+            self.alt_screen = True
+        else:
+            if mode == 1047:
+                self._erase_rows(0, self.rows)
+            self._chars, self._styles = self._main
+            self._alt = None
+            self.alt_screen = False
+            if mode == 1049:
+                self._restore_cursor()
+        self.dirty = set(range(self.rows))
+
+    # -- helpers -----------------------------------------------------------
+
+    def _blank_buffer(self):
+        return (
+            [[" "] * self.cols for _ in range(self.rows)],
+            [[DEFAULT_STYLE] * self.cols for _ in range(self.rows)],
+        )
+
+    def _erase_style(self):
+        """Erased cells take the current background color, like xterm."""
+        bg = self.style.bg
+        return DEFAULT_STYLE if bg is None else Style(None, bg, False, False)
+
+    def _move_to(self, row, col):
+        if self.origin_mode:
+            row = min(self.bottom, row + self.top)
+        self.y = max(0, min(self.rows - 1, row))
+        self.x = max(0, min(self.cols - 1, col))
+        self._wrap_pending = False
+
+    def _linefeed(self):
+        if self.y == self.bottom:
+            self._scroll_up(1, self.top, self.bottom)
+        elif self.y < self.rows - 1:
+            self.y += 1
+        self._wrap_pending = False
+
+    def _reverse_index(self):
+        if self.y == self.top:
+            self._scroll_down(1, self.top, self.bottom)
+        elif self.y > 0:
+            self.y -= 1
+        self._wrap_pending = False
+
+    def _scroll_up(self, n, top, bottom):
+        n = min(n, bottom - top + 1)
+        style = self._erase_style()
+        for rows in (self._chars, self._styles):
+            del rows[top:top + n]
+        for _ in range(n):
+            self._chars.insert(bottom - n + 1, [" "] * self.cols)
+            self._styles.insert(bottom - n + 1, [style] * self.cols)
+        self.dirty.update(range(top, bottom + 1))
+
+    def _scroll_down(self, n, top, bottom):
+        n = min(n, bottom - top + 1)
+        style = self._erase_style()
+        for rows in (self._chars, self._styles):
+            del rows[bottom - n + 1:bottom + 1]
+        for _ in range(n):
+            self._chars.insert(top, [" "] * self.cols)
+            self._styles.insert(top, [style] * self.cols)
+        self.dirty.update(range(top, bottom + 1))
+
+    def _erase_cells(self, y, start, end):
+        if start >= end:
+            return
+        new_chars = [" "] * (end - start)
+        new_styles = [self._erase_style()] * (end - start)
+        if self._chars[y][start:end] != new_chars or self._styles[y][start:end] != new_styles:
+            self._chars[y][start:end] = new_chars
+            self._styles[y][start:end] = new_styles
+            self.dirty.add(y)
+
+    def _erase_rows(self, start, end):
+        for y in range(start, end):
+            self._erase_cells(y, 0, self.cols)
+
+    def _erase_in_line(self, mode):
+        if mode == 0:
+            self._erase_cells(self.y, self.x, self.cols)
+        elif mode == 1:
+            self._erase_cells(self.y, 0, self.x + 1)
+        elif mode == 2:
+            self._erase_cells(self.y, 0, self.cols)
+
+    def _erase_in_display(self, mode):
+        if mode == 0:
+            self._erase_cells(self.y, self.x, self.cols)
+            self._erase_rows(self.y + 1, self.rows)
+        elif mode == 1:
+            self._erase_rows(0, self.y)
+            self._erase_cells(self.y, 0, self.x + 1)
+        elif mode in (2, 3):
+            self._erase_rows(0, self.rows)
+
+    def _delete_chars(self, n):
+        x = self.x
+        n = min(n, self.cols - x)
+        chars = self._chars[self.y]
+        styles = self._styles[self.y]
+        del chars[x:x + n]
+        del styles[x:x + n]
+        chars.extend(" " * n)
+        styles.extend([self._erase_style()] * n)
+        self.dirty.add(self.y)
+
+    def _insert_chars(self, n):
+        x = self.x
+        n = min(n, self.cols - x)
+        chars = self._chars[self.y]
+        styles = self._styles[self.y]
+        chars[x:x] = " " * n
+        styles[x:x] = [self._erase_style()] * n
+        del chars[self.cols:]
+        del styles[self.cols:]
+        self.dirty.add(self.y)
+
+    def _save_cursor(self):
+        self._saved = (self.x, self.y, self.style, self._line_drawing, self.origin_mode, self.autowrap)
+
+    def _restore_cursor(self):
+        if self._saved is None:
+            self._move_to(0, 0)
+            return
+        x, y, self.style, self._line_drawing, self.origin_mode, self.autowrap = self._saved
+        self.x = min(x, self.cols - 1)
+        self.y = min(y, self.rows - 1)
+        self._wrap_pending = False
+
+
+class AltScreenRouter(VTHandler):
+    """
+    Sends parser events to the LineBuilder (scrollback) for ordinary output and
+    to the VTScreen while a full-screen program runs, so redraws of top or vim
+    never reach the scrollback.
+
+    The screen takes over when a program switches to the alternate screen, or
+    clears the whole main screen (ED 2). Main-screen emulation ends when output
+    scrolls past the bottom row, i.e. the display behaves like a line log again;
+    the rows on the screen then become scrollback lines, as in a terminal. Mode
+    changes always reach the screen, which tracks them for both views.
+    """
+
+    def __init__(self, lines, screen):
+        """
+        Initializes the AltScreenRouter.
+
+        Args:
+            lines: LineBuilder for ordinary output.
+            screen: VTScreen for full-screen programs.
+        """
+        self.lines = lines
+        self.screen = screen
+        self._main_screen = False
+        self._update_target()
+
+    def text(self, text):
+        if self.target is self.lines:
+            self.lines.text(text)
+            return
+        if self.screen.alt_screen:
+            self.screen.text(text)
+            return
+        # Main-screen emulation can end at any LF; the rest of the block is line output.
+        i = 0
+        n = len(text)
+        while i < n and self.target is self.screen:
+            end = text.find("\n", i)
+            end = n if end < 0 else end + 1
+            self.screen.text(text[i:end])
+            i = end
+        if i < n:
+            self.lines.text(text[i:])
+
+    def print(self, text):
+        self.target.print(text)
+
+    def execute(self, ch):
+        self.target.execute(ch)
+
+    def csi_dispatch(self, final, params, private, intermediates):
+        if intermediates:
+            self.target.csi_dispatch(final, params, private, intermediates)
+            return
+        if final in "hl":
+            self.screen.csi_dispatch(final, params, private, intermediates)
+            self._update_target()
+            return
+        if self.target is self.lines and not private:
+            if final == "J" and params[:1] == [2]:
+                self._enter_main_screen()
+            elif final == "n" and params == [6]:
+                # The line view has no rows; report the cursor on the bottom row.
+                self.screen.responses.append(f"\x1b[{self.screen.rows};{self.lines.column + 1}R")
+                return
+            elif final in "cn":
+                self.screen.csi_dispatch(final, params, private, intermediates)
+                return
+        self.target.csi_dispatch(final, params, private, intermediates)
+
+    def esc_dispatch(self, final, intermediates):
+        self.target.esc_dispatch(final, intermediates)
+
+    def _update_target(self):
+        self.screen.active = self.screen.alt_screen or self._main_screen
+        self.target = self.screen if self.screen.active else self.lines
+
+    def _enter_main_screen(self):
+        self.lines.finish()
+        self._main_screen = True
+        self.screen.csi_dispatch("H", [], "", "")  # the home that preceded the clear went to the line view
+        self.screen.on_scroll_off = self._leave_main_screen
+        self._update_target()
+
+    def _leave_main_screen(self):
+        screen = self.screen
+        rows = (screen.row_line(y) for y in range(screen.rows))
+        self.lines.lines.extend(line for line in rows if line)
+        screen.on_scroll_off = None
+        self._main_screen = False
+        self._update_target()